@@ -0,0 +1,306 @@
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import tensorflow as tf
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class CheckpointManager:
+    """Keeps the top-k training checkpoints in versioned directories, written by a background thread.
+
+    `save` copies the weights (a host-memory snapshot) and queues the write.
+    The training loop only waits when `max_pending` writes are still queued.
+    Each checkpoint is written to `<directory>/.v0007.tmp`, fsynced, and
+    renamed to `v0007`, so a crash never leaves a partial checkpoint under a
+    version name. `manifest.json` is replaced the same way. It lists the
+    kept checkpoints with their metrics and model metadata, plus the best
+    one under `monitor`. Checkpoints that fall out of the top `keep` are
+    deleted after the manifest stops listing them.
+
+    A checkpoint holds `weights.npz` and the model metadata. It also holds
+    `preprocessing.json` when the model has a fitted pipeline.
+    """
+
+    def __init__(self, directory: str, keep: int = 3, monitor: str = 'val_loss', mode: str = 'min',
+                 max_pending: int = 2):
+        if keep < 1:
+            raise ValueError("keep must be at least 1")
+        if mode not in ('min', 'max'):
+            raise ValueError(f"mode must be 'min' or 'max', got {mode!r}")
+        self.directory = directory
+        self.keep = keep
+        self.monitor = monitor
+        self.mode = mode
+        os.makedirs(directory, exist_ok=True)
+
+        self.checkpoints: List[Dict[str, Any]] = []
+        self.version = 0
+        self._load_manifest()
+        # Versions promised a slot when they were queued, before they are written
+        self._scores: Dict[int, float] = {c['version']: c['metrics'][monitor] for c in self.checkpoints}
+        self._lock = threading.Lock()
+        self._queue: 'queue.Queue[Optional[Dict[str, Any]]]' = queue.Queue(maxsize=max_pending)
+        self._writer: Optional[threading.Thread] = None
+
+        self.saved = 0
+        self.skipped = 0
+        self.failed = 0
+        self.stall_seconds = 0.0
+        self.write_seconds = 0.0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['CheckpointManager']:
+        if not config.get('directory'):
+            return None
+        return cls(
+            config['directory'],
+            keep=config.get('keep', 3),
+            monitor=config.get('monitor', 'val_loss'),
+            mode=config.get('mode', 'min'),
+            max_pending=config.get('max_pending', 2)
+        )
+
+    @classmethod
+    def open(cls, directory: str) -> 'CheckpointManager':
+        """A manager for an existing checkpoint directory, ranking as it was written"""
+        manifest = cls._read_manifest(directory)
+        if manifest is None:
+            raise ValueError(f"No checkpoint manifest in {directory}")
+        return cls(directory, keep=manifest['keep'], monitor=manifest['monitor'], mode=manifest['mode'])
+
+    @staticmethod
+    def _read_manifest(directory: str) -> Optional[Dict[str, Any]]:
+        manifest_path = os.path.join(directory, 'manifest.json')
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, 'r') as f:
+            return json.load(f)
+
+    def _load_manifest(self):
+        manifest = self._read_manifest(self.directory)
+        if manifest is not None:
+            if (manifest['monitor'], manifest['mode']) != (self.monitor, self.mode):
+                raise ValueError(f"{self.directory} ranks checkpoints by {manifest['mode']} {manifest['monitor']}, "
+                                 f"not {self.mode} {self.monitor}; use another directory")
+            self.checkpoints = manifest.get('checkpoints', [])
+            self.version = manifest.get('latest_version', 0)
+        # Leftovers from writes interrupted by a crash
+        for name in os.listdir(self.directory):
+            if name.startswith('.') and name.endswith('.tmp'):
+                shutil.rmtree(os.path.join(self.directory, name), ignore_errors=True)
+
+    def _better(self, a: float, b: float) -> bool:
+        return a < b if self.mode == 'min' else a > b
+
+    def _admits(self, score: float) -> bool:
+        """Whether a checkpoint scoring `score` would make the top `keep`"""
+        if len(self._scores) < self.keep:
+            return True
+        worst = max(self._scores.values()) if self.mode == 'min' else min(self._scores.values())
+        return self._better(score, worst)
+
+    def save(self, weights: List[np.ndarray], metrics: Dict[str, float], metadata: Optional[Dict[str, Any]] = None,
+             preprocessing: Optional[Dict[str, Any]] = None, epoch: Optional[int] = None) -> Optional[int]:
+        """Queue a checkpoint if it makes the top `keep`; returns its version, or None if skipped"""
+        if self.monitor not in metrics:
+            raise ValueError(f"Metrics have no {self.monitor!r}: {sorted(metrics)}")
+        score = float(metrics[self.monitor])
+        if not np.isfinite(score):
+            self.skipped += 1
+            return None
+        with self._lock:
+            if not self._admits(score):
+                self.skipped += 1
+                return None
+            self.version += 1
+            version = self.version
+            self._scores[version] = score
+            if len(self._scores) > self.keep:
+                worst = max(self._scores, key=self._scores.get) if self.mode == 'min' \
+                    else min(self._scores, key=self._scores.get)
+                del self._scores[worst]
+
+        job = {
+            'version': version,
+            'epoch': epoch,
+            # Copied now; the training loop keeps updating the live variables
+            'weights': [np.array(w, copy=True) for w in weights],
+            'metrics': {k: float(v) for k, v in metrics.items()},
+            'metadata': metadata or {},
+            'preprocessing': preprocessing
+        }
+        self._start_writer()
+        started = time.perf_counter()
+        self._queue.put(job)
+        self.stall_seconds += time.perf_counter() - started
+        return version
+
+    def _start_writer(self):
+        if self._writer is None or not self._writer.is_alive():
+            self._writer = threading.Thread(target=self._write_loop, name='checkpoint-writer', daemon=True)
+            self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                started = time.perf_counter()
+                self._write(job)
+                self.write_seconds += time.perf_counter() - started
+                self.saved += 1
+            except Exception as e:
+                self.failed += 1
+                with self._lock:
+                    self._scores.pop(job['version'], None)
+                logger.error(f"Failed to write checkpoint v{job['version']:04d}: {e}")
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def _fsync(path: str):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _write(self, job: Dict[str, Any]):
+        name = f"v{job['version']:04d}"
+        tmp_dir = os.path.join(self.directory, f".{name}.tmp")
+        final_dir = os.path.join(self.directory, name)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        try:
+            with open(os.path.join(tmp_dir, 'weights.npz'), 'wb') as f:
+                np.savez(f, *job['weights'])
+                f.flush()
+                os.fsync(f.fileno())
+            with open(os.path.join(tmp_dir, 'metadata.json'), 'w') as f:
+                json.dump(job['metadata'], f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            if job['preprocessing'] is not None:
+                with open(os.path.join(tmp_dir, 'preprocessing.json'), 'w') as f:
+                    json.dump(job['preprocessing'], f)
+                    f.flush()
+                    os.fsync(f.fileno())
+            self._fsync(tmp_dir)
+            os.replace(tmp_dir, final_dir)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        self._fsync(self.directory)
+
+        with self._lock:
+            self.checkpoints.append({
+                'version': job['version'],
+                'path': name,
+                'epoch': job['epoch'],
+                'metrics': job['metrics'],
+                'metadata': job['metadata'],
+                'saved_at': time.time()
+            })
+            self.checkpoints.sort(key=lambda c: c['metrics'][self.monitor], reverse=self.mode == 'max')
+            evicted = self.checkpoints[self.keep:]
+            self.checkpoints = self.checkpoints[:self.keep]
+            self._write_manifest()
+        # Only once the manifest no longer points at them
+        for checkpoint in evicted:
+            shutil.rmtree(os.path.join(self.directory, checkpoint['path']), ignore_errors=True)
+
+    def _write_manifest(self):
+        manifest = {
+            'latest_version': self.version,
+            'monitor': self.monitor,
+            'mode': self.mode,
+            'keep': self.keep,
+            'best': self.checkpoints[0]['version'] if self.checkpoints else None,
+            'checkpoints': self.checkpoints
+        }
+        manifest_path = os.path.join(self.directory, 'manifest.json')
+        with open(manifest_path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(manifest_path + '.tmp', manifest_path)
+
+    def wait(self):
+        """Block until every queued checkpoint is written"""
+        self._queue.join()
+
+    def close(self):
+        """Finish queued writes and stop the writer thread"""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(None)
+            self._writer.join()
+        self._writer = None
+
+    def best(self) -> Optional[Dict[str, Any]]:
+        """Manifest entry of the best written checkpoint"""
+        with self._lock:
+            return dict(self.checkpoints[0]) if self.checkpoints else None
+
+    def load(self, version: Optional[int] = None) -> Dict[str, Any]:
+        """Weights, metadata and preprocessing of `version`, or of the best checkpoint"""
+        with self._lock:
+            entries = [c for c in self.checkpoints if version is None or c['version'] == version]
+        if not entries:
+            label = f"checkpoint v{version:04d}" if version is not None else "checkpoints"
+            raise ValueError(f"No {label} in {self.directory}")
+        entry = entries[0]
+        path = os.path.join(self.directory, entry['path'])
+        with np.load(os.path.join(path, 'weights.npz')) as data:
+            weights = [data[f'arr_{i}'] for i in range(len(data.files))]
+        with open(os.path.join(path, 'metadata.json'), 'r') as f:
+            metadata = json.load(f)
+        preprocessing = None
+        preprocessing_path = os.path.join(path, 'preprocessing.json')
+        if os.path.exists(preprocessing_path):
+            with open(preprocessing_path, 'r') as f:
+                preprocessing = json.load(f)
+        return dict(entry, weights=weights, metadata=metadata, preprocessing=preprocessing)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'kept': len(self.checkpoints),
+            'latest_version': self.version,
+            'pending': self._queue.unfinished_tasks,
+            'saved': self.saved,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'stall_seconds': round(self.stall_seconds, 4),
+            'write_seconds': round(self.write_seconds, 4)
+        }
+
+
+class CheckpointCallback(tf.keras.callbacks.Callback):
+    """Hands each epoch's weights and logs to a CheckpointManager; waits for pending writes when training ends"""
+
+    def __init__(self, manager: CheckpointManager, metadata_fn: Optional[Callable[[], Dict[str, Any]]] = None,
+                 preprocessing: Optional[Dict[str, Any]] = None):
+        super().__init__()
+        self.manager = manager
+        self.metadata_fn = metadata_fn
+        self.preprocessing = preprocessing
+
+    def on_epoch_end(self, epoch, logs=None):
+        logs = logs or {}
+        if self.manager.monitor not in logs:
+            logger.warning(f"Checkpoint metric {self.manager.monitor} is not available, skipping epoch {epoch + 1}")
+            return
+        metadata = self.metadata_fn() if self.metadata_fn is not None else None
+        self.manager.save(self.model.get_weights(), logs, metadata, self.preprocessing, epoch=epoch + 1)
+
+    def on_train_end(self, logs=None):
+        self.manager.wait()
@@ -0,0 +1,245 @@
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from eth_account import Account
+from eth_utils import to_checksum_address
+from web3 import AsyncWeb3, AsyncHTTPProvider
+
+from src.ai.log_decoder import LogDecoder, schemas_from_abi
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Answers kept for requests nobody is waiting for yet
+ANSWER_CACHE_SIZE = 10000
+
+
+def encode_input(input_data: Any, deadline: Optional[int] = None) -> bytes:
+    """inputData bytes the bridge understands: JSON features, optionally wrapped with a deadline"""
+    if isinstance(input_data, (bytes, bytearray)):
+        if deadline is not None:
+            raise ValueError("A deadline can't be attached to pre-encoded input")
+        return bytes(input_data)
+    if deadline is not None:
+        input_data = {'input': input_data, 'deadline': int(deadline)}
+    return json.dumps(input_data, separators=(',', ':')).encode()
+
+
+class PredictionClient:
+    """Async client that requests predictions from AIContract and waits for the oracle's answers.
+
+    Each input is sent as its own requestPrediction transaction, paying
+    `predictionFee`. Nonces are tracked locally, so concurrent requests go
+    out back to back without waiting for earlier ones to be mined. One watcher task polls the
+    oracle's PredictionFulfilled logs and resolves every waiting caller.
+    With AsyncHTTPProvider, all calls share one keep-alive session.
+    """
+
+    def __init__(self, w3: AsyncWeb3, ai_contract_address: str, oracle_address: str,
+                 private_key: Union[str, bytes], ai_contract_abi: List[Dict[str, Any]],
+                 oracle_abi: List[Dict[str, Any]], chain_id: Optional[int] = None,
+                 gas_multiplier: float = 1.2, gas_price: Optional[int] = None,
+                 poll_interval: float = 1.0, timeout: float = 300.0):
+        self.w3 = w3
+        self.account = Account.from_key(private_key)
+        self.address = self.account.address
+        self.ai_contract = w3.eth.contract(address=to_checksum_address(ai_contract_address), abi=ai_contract_abi)
+        self.oracle_address = to_checksum_address(oracle_address)
+        self.chain_id = chain_id
+        self.gas_multiplier = gas_multiplier
+        self.gas_price = gas_price
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+        self.requested_logs = LogDecoder([schemas_from_abi(ai_contract_abi)['PredictionRequested']])
+        self.fulfilled_logs = LogDecoder([schemas_from_abi(oracle_abi)['PredictionFulfilled']])
+
+        self.prediction_fee: Optional[int] = None
+        self._next_nonce: Optional[int] = None
+        self._send_lock: Optional[asyncio.Lock] = None
+
+        # request id -> future resolved with (prediction, confidence)
+        self._waiting: Dict[bytes, asyncio.Future] = {}
+        # Recent answers nobody was waiting for yet, e.g. fulfilled before the request's receipt came back
+        self._answered: 'OrderedDict[bytes, Tuple[int, int]]' = OrderedDict()
+        self._last_block: Optional[int] = None
+        self._watcher: Optional[asyncio.Task] = None
+
+        self.requests = 0
+        self.gas_used = 0
+        self.fulfilled = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], private_key: Union[str, bytes],
+                    ai_contract_abi: Optional[List[Dict[str, Any]]] = None) -> 'PredictionClient':
+        client_config = config.get('client', {})
+        blockchain = config['blockchain']
+        if ai_contract_abi is None:
+            with open(client_config.get('ai_contract_artifact', 'contracts/contracts/AIContract.json')) as f:
+                ai_contract_abi = json.load(f)['abi']
+        w3 = AsyncWeb3(AsyncHTTPProvider(client_config.get('rpc_url') or blockchain['rpc_url']))
+        return cls(
+            w3,
+            blockchain['ai_contract_address'],
+            blockchain['oracle_address'],
+            private_key,
+            ai_contract_abi,
+            blockchain['oracle_abi'],
+            chain_id=blockchain.get('chain_id'),
+            gas_multiplier=client_config.get('gas_multiplier', 1.2),
+            gas_price=client_config.get('gas_price'),
+            poll_interval=client_config.get('poll_interval', 1.0),
+            timeout=client_config.get('timeout', 300.0)
+        )
+
+    async def start(self):
+        """Read the fee, chain id and nonce, and start watching for fulfillments"""
+        if self._watcher is not None:
+            return
+        self._send_lock = asyncio.Lock()
+        self.prediction_fee = await self.ai_contract.functions.predictionFee().call()
+        if self.chain_id is None:
+            self.chain_id = await self.w3.eth.chain_id
+        self._next_nonce = await self.w3.eth.get_transaction_count(self.address, 'pending')
+        self._last_block = await self.w3.eth.block_number
+        self._watcher = asyncio.create_task(self._watch())
+
+    async def close(self):
+        """Stop watching and cancel callers still waiting for an answer"""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+        for future in self._waiting.values():
+            if not future.done():
+                future.cancel()
+        self._waiting.clear()
+        if isinstance(self.w3.provider, AsyncHTTPProvider):
+            await self.w3.provider.disconnect()
+
+    async def __aenter__(self) -> 'PredictionClient':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def predict(self, input_data: Any, deadline: Optional[int] = None,
+                      timeout: Optional[float] = None) -> Tuple[int, int]:
+        """Request one prediction and wait for it: (prediction, confidence) as fulfilled on-chain"""
+        request_id = await self.request(input_data, deadline)
+        return await self.wait(request_id, timeout)
+
+    async def predict_many(self, inputs: Sequence[Any], timeout: Optional[float] = None) -> List[Tuple[int, int]]:
+        request_ids = await self.submit(inputs)
+        return await asyncio.gather(*(self.wait(request_id, timeout) for request_id in request_ids))
+
+    async def submit(self, inputs: Sequence[Any]) -> List[bytes]:
+        """Send a request for each of `inputs` concurrently; returns their request ids in order"""
+        return list(await asyncio.gather(*(self.request(input_data) for input_data in inputs)))
+
+    async def request(self, input_data: Any, deadline: Optional[int] = None) -> bytes:
+        """Send one requestPrediction transaction; returns its request id once mined"""
+        if self._watcher is None:
+            await self.start()
+        function = self.ai_contract.functions.requestPrediction(encode_input(input_data, deadline))
+        value = self.prediction_fee
+        gas_estimate = await function.estimate_gas({'from': self.address, 'value': value})
+        gas_price = self.gas_price if self.gas_price is not None else await self.w3.eth.gas_price
+
+        # Reserve nonces and send in order; mining is awaited outside the lock
+        async with self._send_lock:
+            transaction = await function.build_transaction({
+                'from': self.address,
+                'value': value,
+                'gas': int(gas_estimate * self.gas_multiplier),
+                'gasPrice': gas_price,
+                'nonce': self._next_nonce,
+                'chainId': self.chain_id
+            })
+            signed = self.account.sign_transaction(transaction)
+            try:
+                tx_hash = await self.w3.eth.send_raw_transaction(signed.raw_transaction)
+            except Exception:
+                # Whatever the node rejected, resume from its view of the nonce
+                self._next_nonce = await self.w3.eth.get_transaction_count(self.address, 'pending')
+                raise
+            self._next_nonce += 1
+
+        receipt = await self.w3.eth.wait_for_transaction_receipt(tx_hash, timeout=self.timeout,
+                                                                 poll_latency=self.poll_interval)
+        if receipt.status != 1:
+            raise RuntimeError(f"Prediction request failed: {tx_hash.hex()}")
+        self.requests += 1
+        self.gas_used += receipt.gasUsed
+
+        events = [event for event in self.requested_logs.decode(receipt.logs)
+                  if event['address'] == self.ai_contract.address]
+        return bytes(events[0]['args']['requestId'])
+
+    async def wait(self, request_id: bytes, timeout: Optional[float] = None) -> Tuple[int, int]:
+        """Wait for the oracle to fulfill `request_id`: (prediction, confidence)"""
+        request_id = bytes(request_id)
+        if self._watcher is None:
+            await self.start()
+        if request_id in self._answered:
+            self.fulfilled += 1
+            return self._answered.pop(request_id)
+        future = self._waiting.get(request_id)
+        if future is None:
+            future = self._waiting[request_id] = asyncio.get_running_loop().create_future()
+        timeout = timeout or self.timeout
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self._waiting.pop(request_id, None)
+            raise TimeoutError(f"Request {request_id.hex()} not fulfilled after {timeout}s")
+
+    async def _watch(self):
+        while True:
+            try:
+                await self._poll_fulfillments()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Polling fulfillments failed: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _poll_fulfillments(self):
+        head = await self.w3.eth.block_number
+        if head <= self._last_block:
+            return
+        logs = await self.w3.eth.get_logs({
+            'address': self.oracle_address,
+            'topics': [self.fulfilled_logs.topics],
+            'fromBlock': self._last_block + 1,
+            'toBlock': head
+        })
+        self._last_block = head
+        for event in self.fulfilled_logs.decode(logs):
+            request_id = bytes(event['args']['requestId'])
+            answer = (event['args']['prediction'], event['args']['confidence'])
+            future = self._waiting.pop(request_id, None)
+            if future is not None:
+                self.fulfilled += 1
+                if not future.done():
+                    future.set_result(answer)
+            else:
+                self._answered[request_id] = answer
+                if len(self._answered) > ANSWER_CACHE_SIZE:
+                    self._answered.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'address': self.address,
+            'requests': self.requests,
+            'gas_per_request': self.gas_used / self.requests if self.requests else None,
+            'fulfilled': self.fulfilled,
+            'waiting': len(self._waiting)
+        }
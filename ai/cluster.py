@@ -0,0 +1,252 @@
+import bisect
+import hashlib
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _hash(key: str) -> int:
+    """Stable 64-bit hash (Python's hash() is salted per process)"""
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+
+class LeaseLost(RuntimeError):
+    """This node no longer holds the lease on a request's partition"""
+
+
+class HashRing:
+    """Consistent hash ring with virtual nodes"""
+
+    def __init__(self, nodes: Iterable[str], vnodes: int = 64):
+        self.nodes = sorted(set(nodes))
+        points = sorted((_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(vnodes))
+        self._keys = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    def node_for(self, key: str) -> Optional[str]:
+        if not self._keys:
+            return None
+        index = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._owners[index]
+
+
+class ClusterCoordinator:
+    """Leader-less partitioning of the request stream across bridge nodes.
+
+    Request ids map to a fixed number of partitions. Every node heartbeats
+    into a shared SQLite lease table, builds the same consistent hash ring
+    from the nodes whose lease is current, and claims the partitions the
+    ring gives it. Claims are compare-and-set on the partitions table, so a
+    partition is only handed over once its previous owner has released it or
+    its lease has expired. Each partition carries the last block its owner
+    fully processed; a node that acquires a partition replays from that
+    checkpoint, which covers whatever a failed peer left unfinished.
+
+    Leases are renewed by a heartbeat thread (`start_heartbeat`), so a
+    node whose event loop is stuck in a blocking RPC call keeps them. A node
+    that still cannot heartbeat in time stops submitting: `holds` is False
+    once less than one heartbeat interval of its lease is left, before a
+    peer may claim the partition.
+
+    SQLite is meant for nodes sharing a host or a local file system; the
+    same table layout works on any store with conditional updates.
+    """
+
+    def __init__(self, db_path: str = 'cluster.db', node_id: Optional[str] = None, partitions: int = 64,
+                 lease_seconds: float = 10.0, heartbeat_interval: float = 2.0, vnodes: int = 64):
+        self.db_path = db_path
+        self.node_id = node_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.partitions = partitions
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = heartbeat_interval
+        self.vnodes = vnodes
+
+        self.owned: Set[int] = set()
+        self.live_nodes: List[str] = []
+        self.takeovers = 0
+        self._last_heartbeat = 0.0
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._heartbeat_thread: Optional[threading.Thread] = None
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'ClusterCoordinator':
+        return cls(
+            db_path=config.get('db_path', 'cluster.db'),
+            node_id=config.get('node_id'),
+            partitions=config.get('partitions', 64),
+            lease_seconds=config.get('lease_seconds', 10.0),
+            heartbeat_interval=config.get('heartbeat_interval', 2.0),
+            vnodes=config.get('vnodes', 64)
+        )
+
+    def _create_tables(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS nodes (
+                    node_id TEXT PRIMARY KEY,
+                    heartbeat REAL NOT NULL
+                )""")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS partitions (
+                    partition INTEGER PRIMARY KEY,
+                    owner TEXT,
+                    checkpoint_block INTEGER,
+                    updated REAL
+                )""")
+            self.conn.executemany("INSERT OR IGNORE INTO partitions (partition) VALUES (?)",
+                                  [(p,) for p in range(self.partitions)])
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def partition_of(self, request_id: bytes) -> int:
+        # Leading bytes, so partitioning is independent of SenderPool's sharding on the trailing ones
+        return int.from_bytes(bytes(request_id)[:8], 'big') % self.partitions
+
+    def owns(self, request_id: bytes) -> bool:
+        return self.partition_of(request_id) in self.owned
+
+    def holds(self, request_id: bytes) -> bool:
+        """Whether this node owns the request's partition with enough lease left to act on it"""
+        with self._lock:
+            if self.partition_of(request_id) not in self.owned:
+                return False
+            return time.time() < self._last_heartbeat + self.lease_seconds - self.heartbeat_interval
+
+    def refresh(self) -> Dict[int, Optional[int]]:
+        """Heartbeat and rebalance; returns newly acquired partitions with their checkpoints"""
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> Dict[int, Optional[int]]:
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute("INSERT INTO nodes (node_id, heartbeat) VALUES (?, ?) "
+                              "ON CONFLICT(node_id) DO UPDATE SET heartbeat = excluded.heartbeat",
+                              (self.node_id, now))
+            live = [row[0] for row in self.conn.execute(
+                "SELECT node_id FROM nodes WHERE heartbeat >= ?", (now - self.lease_seconds,))]
+
+            ring = HashRing(live, self.vnodes)
+            desired = {p for p in range(self.partitions) if ring.node_for(f"partition-{p}") == self.node_id}
+
+            # Hand back partitions the ring now gives to someone else
+            released = self.owned - desired
+            self.conn.executemany("UPDATE partitions SET owner = NULL, updated = ? WHERE partition = ? AND owner = ?",
+                                  [(now, p, self.node_id) for p in released])
+
+            placeholders = ','.join('?' * len(live))
+            acquired = {}
+            owned = set()
+            for p in sorted(desired):
+                claimed = self.conn.execute(
+                    f"UPDATE partitions SET owner = ?, updated = ? WHERE partition = ? AND "
+                    f"(owner IS NULL OR owner = ? OR owner NOT IN ({placeholders}))",
+                    (self.node_id, now, p, self.node_id, *live)
+                ).rowcount
+                if claimed:
+                    owned.add(p)
+                    if p not in self.owned:
+                        acquired[p] = self.conn.execute(
+                            "SELECT checkpoint_block FROM partitions WHERE partition = ?", (p,)).fetchone()[0]
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+        if set(live) != set(self.live_nodes):
+            logger.info(f"Cluster membership: {len(live)} live node(s) {sorted(live)}")
+        if acquired or released:
+            logger.info(f"Node {self.node_id} owns {len(owned)}/{self.partitions} partitions "
+                        f"(+{len(acquired)} -{len(released)})")
+        self.live_nodes = live
+        self.owned = owned
+        self._last_heartbeat = now
+        self.takeovers += sum(1 for checkpoint in acquired.values() if checkpoint is not None)
+        return acquired
+
+    def start_heartbeat(self, on_acquired: Callable[[Dict[int, Optional[int]]], None]):
+        """Refresh every `heartbeat_interval` on a background thread.
+
+        `on_acquired` runs on that thread with each non-empty refresh result;
+        event-loop callers should hand it over with `call_soon_threadsafe`.
+        """
+        if self._heartbeat_thread is not None and self._heartbeat_thread.is_alive():
+            return
+        self._stop.clear()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, args=(on_acquired,),
+                                                  name=f'cluster-heartbeat-{self.node_id}', daemon=True)
+        self._heartbeat_thread.start()
+
+    def _heartbeat_loop(self, on_acquired: Callable[[Dict[int, Optional[int]]], None]):
+        while not self._stop.wait(self.heartbeat_interval):
+            try:
+                acquired = self.refresh()
+                if acquired:
+                    on_acquired(acquired)
+            except Exception as e:
+                logger.error(f"Cluster heartbeat failed: {e}")
+
+    def stop_heartbeat(self):
+        self._stop.set()
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join()
+            self._heartbeat_thread = None
+
+    def checkpoint(self, block: int, partitions: Optional[Iterable[int]] = None):
+        """Record that every owned partition (or the given ones) is processed up to `block`"""
+        with self._lock:
+            partitions = self.owned if partitions is None else partitions
+            self.conn.executemany(
+                "UPDATE partitions SET checkpoint_block = MAX(COALESCE(checkpoint_block, -1), ?), updated = ? "
+                "WHERE partition = ? AND owner = ?",
+                [(block, time.time(), p, self.node_id) for p in partitions]
+            )
+
+    def leave(self):
+        """Release partitions and drop out of the ring so peers take over immediately"""
+        self.stop_heartbeat()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute("UPDATE partitions SET owner = NULL WHERE owner = ?", (self.node_id,))
+                self.conn.execute("DELETE FROM nodes WHERE node_id = ?", (self.node_id,))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.owned = set()
+        logger.info(f"Node {self.node_id} left the cluster")
+
+    def close(self):
+        self.stop_heartbeat()
+        self.conn.close()
+
+    def get_stats(self) -> Dict:
+        return {
+            'node_id': self.node_id,
+            'live_nodes': self.live_nodes,
+            'owned_partitions': len(self.owned),
+            'partitions': self.partitions,
+            'takeovers': self.takeovers
+        }
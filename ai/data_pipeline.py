@@ -0,0 +1,208 @@
+import glob
+import logging
+import os
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import tensorflow as tf
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SHARD_EXTENSIONS = ('.npz', '.npy', '.parquet')
+
+
+class StreamingDataset:
+    """tf.data input pipeline over chunked generators or on-disk shards.
+
+    Only one chunk per reader is held in memory at a time, so the total
+    dataset size is bounded by disk rather than RAM. The exception is
+    ``.npz`` shards: they can't be memory-mapped, so each one is loaded whole
+    while it is read. Keep them small, or use ``.npy`` (what ``write_shards``
+    writes by default).
+
+    Supported shard formats:
+      - ``.npy`` 2D array (memory-mapped) whose ``label_column`` holds the target
+      - ``.npz`` with ``X`` (n, input_dim) and ``y`` arrays, loaded a shard at a time
+      - ``.parquet`` with feature columns plus ``label_column`` (requires pyarrow)
+
+    Generators must yield ``(X_chunk, y_chunk)`` tuples of NumPy arrays.
+    """
+
+    def __init__(self, source: Union[Sequence[str], Callable[[], Iterator[Tuple[np.ndarray, np.ndarray]]]],
+                 input_dim: int, label_column: Union[int, str] = -1, chunk_size: int = 4096,
+                 shuffle_buffer: int = 10000, cycle_length: int = 4,
+                 map_fn: Optional[Callable] = None, seed: Optional[int] = None):
+        self.source = source
+        self.input_dim = input_dim
+        self.label_column = label_column
+        self.chunk_size = chunk_size
+        self.shuffle_buffer = shuffle_buffer
+        self.cycle_length = cycle_length
+        self.map_fn = map_fn
+        self.seed = seed
+
+    @classmethod
+    def from_shards(cls, shards: Union[str, Sequence[str]], input_dim: int, **kwargs) -> 'StreamingDataset':
+        """Create a dataset from a glob pattern, a directory, or a list of shard paths"""
+        if isinstance(shards, str):
+            pattern = os.path.join(shards, '*') if os.path.isdir(shards) else shards
+            paths = sorted(p for p in glob.glob(pattern) if p.endswith(SHARD_EXTENSIONS))
+        else:
+            paths = list(shards)
+
+        if not paths:
+            raise ValueError(f"No shards found for {shards}")
+
+        logger.info(f"Streaming dataset over {len(paths)} shard(s)")
+        return cls(paths, input_dim, **kwargs)
+
+    @classmethod
+    def from_generator(cls, generator_fn: Callable[[], Iterator[Tuple[np.ndarray, np.ndarray]]],
+                       input_dim: int, **kwargs) -> 'StreamingDataset':
+        """Create a dataset from a callable returning a fresh chunk generator"""
+        return cls(generator_fn, input_dim, **kwargs)
+
+    @property
+    def is_sharded(self) -> bool:
+        return not callable(self.source)
+
+    def _output_signature(self):
+        return (
+            tf.TensorSpec(shape=(None, self.input_dim), dtype=tf.float32),
+            tf.TensorSpec(shape=(None,), dtype=tf.float32)
+        )
+
+    def _read_shard(self, path) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield (X, y) chunks from a single shard without loading it whole"""
+        if isinstance(path, bytes):
+            path = path.decode('utf-8')
+
+        if path.endswith('.npz'):
+            # npz members are compressed/zipped, so the whole shard is decoded here
+            with np.load(path) as shard:
+                X, y = shard['X'], shard['y']
+                for start in range(0, len(X), self.chunk_size):
+                    stop = start + self.chunk_size
+                    yield X[start:stop].astype(np.float32), y[start:stop].astype(np.float32)
+
+        elif path.endswith('.npy'):
+            data = np.load(path, mmap_mode='r')
+            label_idx = self.label_column if isinstance(self.label_column, int) else -1
+            label_idx = label_idx % data.shape[1]
+            feature_idx = [i for i in range(data.shape[1]) if i != label_idx]
+            for start in range(0, len(data), self.chunk_size):
+                chunk = np.asarray(data[start:start + self.chunk_size], dtype=np.float32)
+                yield chunk[:, feature_idx], chunk[:, label_idx]
+
+        elif path.endswith('.parquet'):
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("Parquet shards require pyarrow: pip install pyarrow")
+
+            parquet_file = pq.ParquetFile(path)
+            for batch in parquet_file.iter_batches(batch_size=self.chunk_size):
+                columns = batch.schema.names
+                label = self.label_column if isinstance(self.label_column, str) else columns[self.label_column]
+                features = [c for c in columns if c != label]
+                X = np.column_stack([batch.column(c).to_numpy(zero_copy_only=False) for c in features])
+                y = batch.column(label).to_numpy(zero_copy_only=False)
+                yield X.astype(np.float32), y.astype(np.float32)
+
+        else:
+            raise ValueError(f"Unsupported shard format: {path}")
+
+    def _generator_chunks(self) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        for X, y in self.source():
+            yield np.asarray(X, dtype=np.float32).reshape(-1, self.input_dim), np.asarray(y, dtype=np.float32).reshape(-1)
+
+    def count_rows(self) -> Optional[int]:
+        """Count rows from shard headers; returns None for generator sources"""
+        if not self.is_sharded:
+            return None
+
+        total = 0
+        for path in self.source:
+            if path.endswith('.npz'):
+                # Reads y in full; npz has no header-only row count
+                with np.load(path) as shard:
+                    total += len(shard['y'])
+            elif path.endswith('.npy'):
+                total += np.load(path, mmap_mode='r').shape[0]
+            elif path.endswith('.parquet'):
+                import pyarrow.parquet as pq
+                total += pq.ParquetFile(path).metadata.num_rows
+        return total
+
+    def sample(self, max_rows: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Read up to `max_rows` leading rows, e.g. to fit preprocessing"""
+        chunks = self._generator_chunks() if not self.is_sharded else (
+            chunk for path in self.source for chunk in self._read_shard(path)
+        )
+        X_parts, y_parts, rows = [], [], 0
+        for X, y in chunks:
+            X_parts.append(X)
+            y_parts.append(y)
+            rows += len(X)
+            if rows >= max_rows:
+                break
+        return np.concatenate(X_parts)[:max_rows], np.concatenate(y_parts)[:max_rows]
+
+    def build(self, batch_size: int = 32, shuffle: bool = True, repeat: bool = False,
+              preprocess_fn: Optional[Callable] = None) -> tf.data.Dataset:
+        """Build the tf.data pipeline: interleaved reads, shuffle, batch, parallel map, prefetch"""
+        signature = self._output_signature()
+
+        if self.is_sharded:
+            paths = tf.data.Dataset.from_tensor_slices(list(self.source))
+            if shuffle:
+                paths = paths.shuffle(len(self.source), seed=self.seed, reshuffle_each_iteration=True)
+            dataset = paths.interleave(
+                lambda path: tf.data.Dataset.from_generator(
+                    self._read_shard, args=(path,), output_signature=signature
+                ),
+                cycle_length=self.cycle_length,
+                num_parallel_calls=tf.data.AUTOTUNE,
+                deterministic=not shuffle
+            )
+        else:
+            dataset = tf.data.Dataset.from_generator(self._generator_chunks, output_signature=signature)
+
+        dataset = dataset.unbatch()
+        if shuffle and self.shuffle_buffer > 1:
+            dataset = dataset.shuffle(self.shuffle_buffer, seed=self.seed, reshuffle_each_iteration=True)
+        if repeat:
+            dataset = dataset.repeat()
+
+        dataset = dataset.batch(batch_size)
+        if preprocess_fn is not None:
+            dataset = dataset.map(preprocess_fn, num_parallel_calls=tf.data.AUTOTUNE)
+        if self.map_fn is not None:
+            dataset = dataset.map(self.map_fn, num_parallel_calls=tf.data.AUTOTUNE)
+
+        return dataset.prefetch(tf.data.AUTOTUNE)
+
+
+def write_shards(chunks: Iterator[Tuple[np.ndarray, np.ndarray]], output_dir: str,
+                 prefix: str = 'shard', fmt: str = 'npy') -> List[str]:
+    """Write (X, y) chunks to numbered shards and return their paths.
+
+    ``npy`` shards hold the features with the label as the last column and
+    are memory-mapped when read; ``npz`` shards are loaded whole.
+    """
+    if fmt not in ('npy', 'npz'):
+        raise ValueError(f"Unsupported shard format: {fmt}")
+    os.makedirs(output_dir, exist_ok=True)
+    paths = []
+    for i, (X, y) in enumerate(chunks):
+        X = np.asarray(X, dtype=np.float32)
+        y = np.asarray(y, dtype=np.float32).reshape(-1, 1)
+        path = os.path.join(output_dir, f"{prefix}-{i:05d}.{fmt}")
+        if fmt == 'npy':
+            np.save(path, np.hstack([X.reshape(len(y), -1), y]))
+        else:
+            np.savez(path, X=X, y=y.reshape(-1))
+        paths.append(path)
+    logger.info(f"Wrote {len(paths)} shard(s) to {output_dir}")
+    return paths
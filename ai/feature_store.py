@@ -0,0 +1,243 @@
+import json
+import logging
+import os
+from typing import Dict, Iterator, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+META_FILE = 'meta.json'
+FEATURES_FILE = 'features.f32'
+TIMESTAMPS_FILE = 'timestamps.i64'
+SYMBOLS_FILE = 'symbols.i32'
+LATEST_FILE = 'latest.npy'
+
+
+class FeatureStore:
+    """Columnar, memory-mapped store for time-series feature rows.
+
+    Features live in one float32 memmap laid out column by column, shape
+    (n_columns, capacity), so each column is contiguous on disk and a row
+    range is returned as a zero-copy (rows, columns) view. A dense
+    symbol-code -> last-row index gives O(1) lookup of the latest vector
+    per symbol for inference.
+    """
+
+    def __init__(self, path: str, columns: Optional[Sequence[str]] = None, initial_capacity: int = 1 << 20):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            if columns is not None and list(columns) != meta['columns']:
+                raise ValueError(f"Store columns {meta['columns']} do not match {list(columns)}")
+            self.columns = meta['columns']
+            self.capacity = meta['capacity']
+            self.n_rows = meta['n_rows']
+            self.symbols = meta['symbols']
+            self._latest = np.load(os.path.join(path, LATEST_FILE))
+            mode = 'r+'
+        else:
+            if not columns:
+                raise ValueError("Columns are required to create a new feature store")
+            self.columns = list(columns)
+            self.capacity = max(int(initial_capacity), 1)
+            self.n_rows = 0
+            self.symbols = []
+            self._latest = np.full(0, -1, dtype=np.int64)
+            mode = 'w+'
+
+        self._column_index = {name: i for i, name in enumerate(self.columns)}
+        self._symbol_codes = {symbol: code for code, symbol in enumerate(self.symbols)}
+        self._open_arrays(mode)
+        if mode == 'w+':
+            self.flush()
+
+    def _open_arrays(self, mode: str):
+        self._features = np.memmap(os.path.join(self.path, FEATURES_FILE), dtype=np.float32,
+                                   mode=mode, shape=(len(self.columns), self.capacity))
+        self._timestamps = np.memmap(os.path.join(self.path, TIMESTAMPS_FILE), dtype=np.int64,
+                                     mode=mode, shape=(self.capacity,))
+        self._symbols = np.memmap(os.path.join(self.path, SYMBOLS_FILE), dtype=np.int32,
+                                  mode=mode, shape=(self.capacity,))
+
+    def _grow(self, required: int):
+        """Double capacity until `required` rows fit, rewriting files atomically"""
+        new_capacity = self.capacity
+        while new_capacity < required:
+            new_capacity *= 2
+
+        logger.info(f"Growing feature store from {self.capacity} to {new_capacity} rows")
+        n = self.n_rows
+        grown = [
+            (FEATURES_FILE, np.float32, (len(self.columns), new_capacity), self._features),
+            (TIMESTAMPS_FILE, np.int64, (new_capacity,), self._timestamps),
+            (SYMBOLS_FILE, np.int32, (new_capacity,), self._symbols),
+        ]
+        for filename, dtype, shape, old in grown:
+            target = os.path.join(self.path, filename)
+            tmp = np.memmap(target + '.tmp', dtype=dtype, mode='w+', shape=shape)
+            tmp[..., :n] = old[..., :n]
+            tmp.flush()
+            del tmp
+            os.replace(target + '.tmp', target)
+
+        self.capacity = new_capacity
+        self._open_arrays('r+')
+
+    def _encode_symbols(self, symbols: Sequence[str]) -> np.ndarray:
+        """Map symbol names to dense integer codes, registering new ones"""
+        unique, inverse = np.unique(np.asarray(symbols), return_inverse=True)
+        unique_codes = np.empty(len(unique), dtype=np.int32)
+        for i, symbol in enumerate(unique.tolist()):
+            code = self._symbol_codes.get(symbol)
+            if code is None:
+                code = len(self.symbols)
+                self.symbols.append(symbol)
+                self._symbol_codes[symbol] = code
+            unique_codes[i] = code
+
+        if len(self.symbols) > len(self._latest):
+            self._latest = np.concatenate([
+                self._latest, np.full(len(self.symbols) - len(self._latest), -1, dtype=np.int64)
+            ])
+        return unique_codes[inverse.reshape(-1)]
+
+    def append(self, symbols: Sequence[str], timestamps: Sequence[int],
+               features: Union[np.ndarray, Dict[str, np.ndarray]]) -> int:
+        """Append a batch of rows in arrival order and return the new row count.
+
+        `features` is either an (n, n_columns) array or a mapping of column
+        name to 1D array. Rows appended later win the per-symbol latest lookup.
+        """
+        if isinstance(features, dict):
+            matrix = np.column_stack([np.asarray(features[c], dtype=np.float32) for c in self.columns])
+        else:
+            matrix = np.asarray(features, dtype=np.float32)
+        if matrix.ndim != 2 or matrix.shape[1] != len(self.columns):
+            raise ValueError(f"Expected features of shape (n, {len(self.columns)}), got {matrix.shape}")
+
+        n = len(matrix)
+        if n == 0:
+            return self.n_rows
+        if len(symbols) != n or len(timestamps) != n:
+            raise ValueError("symbols, timestamps and features must have the same length")
+
+        if self.n_rows + n > self.capacity:
+            self._grow(self.n_rows + n)
+
+        codes = self._encode_symbols(symbols)
+        start, stop = self.n_rows, self.n_rows + n
+
+        self._features[:, start:stop] = matrix.T
+        self._timestamps[start:stop] = np.asarray(timestamps, dtype=np.int64)
+        self._symbols[start:stop] = codes
+
+        # Last occurrence of each symbol in this batch
+        reversed_codes = codes[::-1]
+        batch_codes, first_in_reversed = np.unique(reversed_codes, return_index=True)
+        self._latest[batch_codes] = stop - 1 - first_in_reversed
+
+        self.n_rows = stop
+        return self.n_rows
+
+    def _column_selector(self, columns: Optional[Sequence[str]]):
+        """Slice for contiguous column ranges (view), index list otherwise (copy)"""
+        if columns is None:
+            return slice(None)
+        idx = [self._column_index[c] for c in columns]
+        if idx == list(range(idx[0], idx[0] + len(idx))):
+            return slice(idx[0], idx[0] + len(idx))
+        return idx
+
+    def slice(self, start: int = 0, stop: Optional[int] = None,
+              columns: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Return rows [start, stop) as a (rows, columns) array.
+
+        Zero-copy view into the memmap when `columns` is None or a contiguous
+        run of column names; otherwise a copy of the selected columns.
+        """
+        stop = self.n_rows if stop is None else min(stop, self.n_rows)
+        return self._features[self._column_selector(columns), start:stop].T
+
+    def column(self, name: str, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Zero-copy contiguous view of a single column"""
+        stop = self.n_rows if stop is None else min(stop, self.n_rows)
+        return self._features[self._column_index[name], start:stop]
+
+    def timestamps(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        stop = self.n_rows if stop is None else min(stop, self.n_rows)
+        return self._timestamps[start:stop]
+
+    def training_arrays(self, feature_columns: Sequence[str], label_column: str,
+                        start: int = 0, stop: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(X, y) for a contiguous row range, read directly from the memmap"""
+        return self.slice(start, stop, feature_columns), self.column(label_column, start, stop)
+
+    def iter_chunks(self, feature_columns: Sequence[str], label_column: str,
+                    chunk_size: int = 65536) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yield (X, y) chunks for out-of-core training via StreamingDataset.from_generator"""
+        for start in range(0, self.n_rows, chunk_size):
+            yield self.training_arrays(feature_columns, label_column, start, start + chunk_size)
+
+    def latest_row(self, symbol: str) -> int:
+        """Row index of the latest entry for `symbol`, or -1 if unknown"""
+        code = self._symbol_codes.get(symbol)
+        return -1 if code is None else int(self._latest[code])
+
+    def latest(self, symbol: str, columns: Optional[Sequence[str]] = None) -> Optional[np.ndarray]:
+        """Latest feature vector for `symbol` in O(1)"""
+        row = self.latest_row(symbol)
+        if row < 0:
+            return None
+        return np.array(self._features[self._column_selector(columns), row])
+
+    def latest_batch(self, symbols: Sequence[str], columns: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Latest feature vectors for several symbols; unknown symbols give NaN rows"""
+        rows = np.array([self.latest_row(s) for s in symbols], dtype=np.int64)
+        result = self._features[:, np.maximum(rows, 0)][self._column_selector(columns)].T
+        result[rows < 0] = np.nan
+        return result
+
+    def flush(self):
+        """Flush memmaps and atomically persist metadata and the latest index"""
+        self._features.flush()
+        self._timestamps.flush()
+        self._symbols.flush()
+
+        latest_tmp = os.path.join(self.path, LATEST_FILE + '.tmp')
+        with open(latest_tmp, 'wb') as f:
+            np.save(f, self._latest)
+        os.replace(latest_tmp, os.path.join(self.path, LATEST_FILE))
+
+        meta = {
+            'columns': self.columns,
+            'capacity': self.capacity,
+            'n_rows': self.n_rows,
+            'symbols': self.symbols
+        }
+        meta_tmp = os.path.join(self.path, META_FILE + '.tmp')
+        with open(meta_tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_tmp, os.path.join(self.path, META_FILE))
+
+    def close(self):
+        self.flush()
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    def get_stats(self) -> Dict[str, object]:
+        """Get store statistics"""
+        return {
+            'path': self.path,
+            'columns': self.columns,
+            'rows': self.n_rows,
+            'capacity': self.capacity,
+            'symbols': len(self.symbols),
+            'size_bytes': self.capacity * (4 * len(self.columns) + 8 + 4)
+        }
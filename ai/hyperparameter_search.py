@@ -0,0 +1,229 @@
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_PARAM_GRID = {
+    'hidden_units': [(128, 64, 32), (64, 32), (256, 128, 64)],
+    'dropout_rates': [(0.3, 0.2, 0.1), 0.2],
+    'learning_rate': [0.001, 0.0003]
+}
+
+# Per-process state set up by _init_worker
+_worker_data = {}
+
+
+def _init_worker(threads_per_worker: int, core_sets, data_path: str):
+    """Pin a search worker to a few CPU threads before TensorFlow starts"""
+    for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS',
+                'TF_NUM_INTRAOP_THREADS'):
+        os.environ[var] = str(threads_per_worker)
+    os.environ['TF_NUM_INTEROP_THREADS'] = '1'
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '2')
+
+    if core_sets is not None and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, core_sets.get_nowait())
+        except Exception:
+            pass  # Affinity is best effort; thread limits still apply
+
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads_per_worker)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+    data = np.load(data_path)
+    _worker_data['X'], _worker_data['y'] = data['X'], data['y']
+
+
+def _fold_indices(n_samples: int, n_folds: int, fold: int, seed: int):
+    order = np.random.default_rng(seed).permutation(n_samples)
+    folds = np.array_split(order, n_folds)
+    val_idx = folds[fold]
+    train_idx = np.concatenate([f for i, f in enumerate(folds) if i != fold])
+    return train_idx, val_idx
+
+
+def _run_fold(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Train one configuration on one CV fold and return its validation loss"""
+    from src.ai.model import AIModel
+
+    start = time.perf_counter()
+    X, y = _worker_data['X'], _worker_data['y']
+    train_idx, val_idx = _fold_indices(len(X), task['n_folds'], task['fold'], task['seed'])
+
+    model = AIModel(task['input_dim'], task['output_dim'], task['model_type'],
+                    **task['base_params'], **task['params'])
+    history = model.train(X[train_idx], y[train_idx], X[val_idx], y[val_idx],
+                          epochs=task['epochs'], batch_size=task['batch_size'],
+                          checkpoint_path=None, verbose=0)
+
+    return {
+        'trial_id': task['trial_id'],
+        'fold': task['fold'],
+        'val_loss': float(min(history.history['val_loss'])),
+        'seconds': time.perf_counter() - start
+    }
+
+
+class HyperparameterSearch:
+    """Parallel k-fold hyperparameter search over AIModel with successive halving.
+
+    Each rung trains every surviving configuration on every fold for the
+    rung's epoch budget across a spawn-based process pool, then keeps the
+    best 1/reduction_factor by mean validation loss for the next, larger
+    budget. The winner is retrained on all data and saved with
+    AIModel.save_model alongside a leaderboard.
+    """
+
+    def __init__(self, input_dim: int, output_dim: int, model_type: str = 'classification',
+                 param_grid: Optional[Dict[str, Sequence[Any]]] = None, base_params: Optional[Dict[str, Any]] = None,
+                 n_folds: int = 3, max_workers: Optional[int] = None, threads_per_worker: int = 1,
+                 min_epochs: int = 5, max_epochs: int = 45, reduction_factor: int = 3,
+                 batch_size: int = 32, seed: int = 42):
+        self.input_dim = input_dim
+        self.output_dim = output_dim
+        self.model_type = model_type
+        self.param_grid = param_grid or DEFAULT_PARAM_GRID
+        self.base_params = base_params or {}
+        self.n_folds = n_folds
+        self.threads_per_worker = max(1, threads_per_worker)
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 1) // self.threads_per_worker)
+        self.min_epochs = min_epochs
+        self.max_epochs = max_epochs
+        self.reduction_factor = max(2, reduction_factor)
+        self.batch_size = batch_size
+        self.seed = seed
+        self.leaderboard: List[Dict[str, Any]] = []
+        self.stats: Dict[str, Any] = {}
+
+    def candidates(self) -> List[Dict[str, Any]]:
+        """Expand the parameter grid into a list of configurations.
+
+        Combinations that AIModel would reject, a per-layer dropout_rates
+        tuple whose length differs from hidden_units, are skipped.
+        """
+        keys = sorted(self.param_grid)
+        candidates, skipped = [], 0
+        for values in itertools.product(*(self.param_grid[k] for k in keys)):
+            params = dict(zip(keys, values))
+            merged = {**self.base_params, **params}
+            dropout_rates = merged.get('dropout_rates')
+            if 'hidden_units' in merged and isinstance(dropout_rates, (list, tuple)) \
+                    and len(dropout_rates) != len(merged['hidden_units']):
+                skipped += 1
+                continue
+            candidates.append(params)
+        if skipped:
+            logger.info(f"Skipped {skipped} configuration(s) whose dropout_rates don't match hidden_units")
+        if not candidates:
+            raise ValueError("The parameter grid has no valid configuration")
+        return candidates
+
+    def _core_sets(self, ctx):
+        """Disjoint CPU sets, one per worker, for affinity pinning"""
+        if not hasattr(os, 'sched_getaffinity'):
+            return None
+        cores = sorted(os.sched_getaffinity(0))
+        if len(cores) < self.max_workers * self.threads_per_worker:
+            return None
+        queue = ctx.Queue()
+        for w in range(self.max_workers):
+            queue.put(set(cores[w * self.threads_per_worker:(w + 1) * self.threads_per_worker]))
+        return queue
+
+    def run(self, X, y, output_dir: str = 'search_results') -> List[Dict[str, Any]]:
+        """Run the search, write leaderboard.json and the best model, return the leaderboard"""
+        os.makedirs(output_dir, exist_ok=True)
+        X = np.asarray(X, dtype=np.float32)
+        y = np.asarray(y, dtype=np.float32)
+
+        trials = [{'trial_id': i, 'params': params, 'rung': -1, 'epochs': 0, 'fold_losses': []}
+                  for i, params in enumerate(self.candidates())]
+        logger.info(f"Searching {len(trials)} configurations with {self.n_folds}-fold CV "
+                    f"on {self.max_workers} worker(s) x {self.threads_per_worker} thread(s)")
+
+        start = time.perf_counter()
+        task_seconds = 0.0
+        ctx = multiprocessing.get_context('spawn')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = os.path.join(tmp, 'data.npz')
+            np.savez(data_path, X=X, y=y)
+
+            with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx, initializer=_init_worker,
+                                     initargs=(self.threads_per_worker, self._core_sets(ctx), data_path)) as pool:
+                survivors = trials
+                rung, epochs = 0, self.min_epochs
+                while True:
+                    epochs = min(epochs, self.max_epochs)
+                    logger.info(f"Rung {rung}: {len(survivors)} configuration(s) at {epochs} epoch(s)")
+
+                    tasks = [{
+                        'trial_id': trial['trial_id'], 'params': trial['params'], 'fold': fold,
+                        'n_folds': self.n_folds, 'seed': self.seed, 'epochs': epochs,
+                        'batch_size': self.batch_size, 'input_dim': self.input_dim,
+                        'output_dim': self.output_dim, 'model_type': self.model_type,
+                        'base_params': self.base_params
+                    } for trial in survivors for fold in range(self.n_folds)]
+
+                    losses = {trial['trial_id']: [] for trial in survivors}
+                    for result in pool.map(_run_fold, tasks):
+                        losses[result['trial_id']].append(result['val_loss'])
+                        task_seconds += result['seconds']
+
+                    for trial in survivors:
+                        trial.update(rung=rung, epochs=epochs, fold_losses=losses[trial['trial_id']])
+                        trial['mean_val_loss'] = float(np.mean(trial['fold_losses']))
+                        trial['std_val_loss'] = float(np.std(trial['fold_losses']))
+
+                    survivors = sorted(survivors, key=lambda t: t['mean_val_loss'])
+                    if len(survivors) == 1 or epochs >= self.max_epochs:
+                        break
+                    survivors = survivors[:max(1, len(survivors) // self.reduction_factor)]
+                    rung += 1
+                    epochs *= self.reduction_factor
+
+        wall_seconds = time.perf_counter() - start
+
+        # Trials that reached later rungs rank first, then by loss
+        self.leaderboard = sorted(trials, key=lambda t: (-t['rung'], t.get('mean_val_loss', np.inf)))
+        best = self.leaderboard[0]
+        self.stats = {
+            'configurations': len(trials),
+            'workers': self.max_workers,
+            'threads_per_worker': self.threads_per_worker,
+            'wall_seconds': round(wall_seconds, 3),
+            'task_seconds': round(task_seconds, 3),
+            'speedup_vs_serial_estimate': round(task_seconds / wall_seconds, 2) if wall_seconds else 0.0
+        }
+        logger.info(f"Best configuration: {best['params']} (val_loss {best['mean_val_loss']:.4f})")
+        logger.info(f"Search took {wall_seconds:.1f}s wall for {task_seconds:.1f}s of training "
+                    f"({self.stats['speedup_vs_serial_estimate']}x)")
+
+        best_path = self._train_best(best, X, y, output_dir)
+        with open(os.path.join(output_dir, 'leaderboard.json'), 'w') as f:
+            json.dump({'stats': self.stats, 'best_model': best_path, 'trials': self.leaderboard},
+                      f, indent=2, default=list)
+
+        return self.leaderboard
+
+    def _train_best(self, best: Dict[str, Any], X: np.ndarray, y: np.ndarray, output_dir: str) -> str:
+        """Refit the winning configuration on all data and save it like AIModel.save_model"""
+        from src.ai.model import AIModel
+
+        model = AIModel(self.input_dim, self.output_dim, self.model_type, **self.base_params, **best['params'])
+        model.train(X, y, epochs=best['epochs'], batch_size=self.batch_size, checkpoint_path=None, verbose=0)
+
+        model_path = os.path.join(output_dir, 'best_model.h5')
+        model.save_model(model_path)
+        return model_path
@@ -0,0 +1,421 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Union
+
+from eth_utils import to_checksum_address
+
+from src.ai.log_decoder import EventSchema, LogDecoder, schemas_from_abi
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Events followed on each contract, used when the configured ABI does not carry them
+CONTRACT_EVENTS = [
+    EventSchema('PredictionRequested', [
+        {'name': 'requestId', 'type': 'bytes32', 'indexed': True},
+        {'name': 'requester', 'type': 'address', 'indexed': True},
+        {'name': 'inputData', 'type': 'bytes', 'indexed': False}
+    ]),
+    EventSchema('PredictionFulfilled', [
+        {'name': 'requestId', 'type': 'bytes32', 'indexed': True},
+        {'name': 'result', 'type': 'int256', 'indexed': False}
+    ])
+]
+ORACLE_EVENTS = [
+    EventSchema('PredictionRequested', [
+        {'name': 'requestId', 'type': 'bytes32', 'indexed': True},
+        {'name': 'inputData', 'type': 'bytes', 'indexed': False}
+    ]),
+    EventSchema('PredictionFulfilled', [
+        {'name': 'requestId', 'type': 'bytes32', 'indexed': True},
+        {'name': 'prediction', 'type': 'int256', 'indexed': False},
+        {'name': 'confidence', 'type': 'uint256', 'indexed': False}
+    ])
+]
+
+
+def _request_id(value: Union[bytes, str]) -> bytes:
+    if isinstance(value, str):
+        value = bytes.fromhex(value[2:] if value.startswith('0x') else value)
+    if len(value) != 32:
+        raise ValueError(f"Request ids are 32 bytes, got {len(value)}")
+    return bytes(value)
+
+
+class PredictionIndexer:
+    """Local, queryable copy of prediction state from AIOracle and AIContract events.
+
+    Follows PredictionRequested/PredictionFulfilled on both contracts with
+    one eth_getLogs call per block range and stores them in SQLite (WAL),
+    indexed for point lookups by request id, listings by requester and
+    pending requests by age (a partial index over unfulfilled rows).
+
+    Hashes of the last `confirmations` indexed blocks are kept. Every sync
+    first compares them with the chain: on a mismatch the index rolls back
+    to the newest block that still matches (or, if the fork is deeper than
+    the window, to the confirmed depth) and re-indexes from there. Blocks
+    older than the window are treated as final.
+    """
+
+    def __init__(self, w3, oracle_address: str, ai_contract_address: Optional[str] = None,
+                 db_path: str = 'indexer.db', start_block: int = 0, confirmations: int = 12,
+                 batch_blocks: int = 2000, timestamps: bool = True,
+                 oracle_abi: Optional[List[Dict[str, Any]]] = None,
+                 ai_contract_abi: Optional[List[Dict[str, Any]]] = None):
+        self.w3 = w3
+        self.oracle_address = to_checksum_address(oracle_address)
+        self.ai_contract_address = to_checksum_address(ai_contract_address) if ai_contract_address else None
+        self.start_block = start_block
+        self.confirmations = max(confirmations, 1)
+        self.batch_blocks = batch_blocks
+        self.timestamps = timestamps
+
+        oracle_schemas = schemas_from_abi(oracle_abi or [])
+        contract_schemas = schemas_from_abi(ai_contract_abi or [])
+        self._oracle_schemas = [oracle_schemas.get(s.name, s) for s in ORACLE_EVENTS]
+        self._contract_schemas = [contract_schemas.get(s.name, s) for s in CONTRACT_EVENTS] if ai_contract_address else []
+        self.decoder = LogDecoder(self._oracle_schemas + self._contract_schemas)
+
+        self.indexed_events = 0
+        self.reorgs = 0
+        self.rolled_back_blocks = 0
+        self.last_sync: Optional[float] = None
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        # One connection shared by the follower and query threads, serialized by a lock
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._lock = threading.RLock()
+        self._create_tables()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], w3) -> 'PredictionIndexer':
+        indexer_config = config.get('indexer', {})
+        blockchain = config['blockchain']
+        return cls(
+            w3,
+            blockchain['oracle_address'],
+            blockchain.get('ai_contract_address'),
+            db_path=indexer_config.get('db_path', 'indexer.db'),
+            start_block=indexer_config.get('start_block', 0),
+            confirmations=indexer_config.get('confirmations', 12),
+            batch_blocks=indexer_config.get('batch_blocks', 2000),
+            timestamps=indexer_config.get('timestamps', True),
+            oracle_abi=blockchain.get('oracle_abi')
+        )
+
+    def _create_tables(self):
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS requests (
+                request_id BLOB PRIMARY KEY,
+                requester TEXT,
+                input_data BLOB,
+                block_number INTEGER NOT NULL,
+                timestamp INTEGER,
+                transaction_hash BLOB,
+                fulfilled INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS requests_by_requester ON requests (requester, block_number);
+            CREATE INDEX IF NOT EXISTS requests_by_block ON requests (block_number);
+            CREATE INDEX IF NOT EXISTS requests_pending ON requests (block_number) WHERE fulfilled = 0;
+            CREATE TABLE IF NOT EXISTS fulfillments (
+                request_id BLOB NOT NULL,
+                source TEXT NOT NULL,
+                prediction INTEGER,
+                confidence INTEGER,
+                block_number INTEGER NOT NULL,
+                transaction_hash BLOB,
+                PRIMARY KEY (request_id, source)
+            );
+            CREATE INDEX IF NOT EXISTS fulfillments_by_block ON fulfillments (block_number);
+            CREATE TABLE IF NOT EXISTS blocks (
+                number INTEGER PRIMARY KEY,
+                hash BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER
+            );
+        """)
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    @property
+    def cursor(self) -> int:
+        """Last block whose events are all indexed"""
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'cursor'").fetchone()
+        return row[0] if row else self.start_block - 1
+
+    # Following the chain
+
+    def _find_fork(self) -> Optional[int]:
+        """Newest indexed block still on the canonical chain, or None if the indexed tip is canonical"""
+        with self._lock:
+            rows = self.conn.execute("SELECT number, hash FROM blocks ORDER BY number DESC").fetchall()
+        head = self.w3.eth.block_number
+        for i, (number, stored_hash) in enumerate(rows):
+            # Blocks past the head were dropped by a reorg to a shorter chain
+            if number <= head and bytes(self.w3.eth.get_block(number)['hash']) == bytes(stored_hash):
+                return None if i == 0 else number
+        # Forked below the whole window: fall back to the confirmed depth
+        return rows[-1][0] - 1 if rows else None
+
+    def rollback(self, to_block: int):
+        """Drop everything indexed after `to_block`"""
+        with self._transaction():
+            reverted = [row[0] for row in self.conn.execute(
+                "SELECT request_id FROM fulfillments WHERE source = 'oracle' AND block_number > ?", (to_block,))]
+            self.conn.execute("DELETE FROM fulfillments WHERE block_number > ?", (to_block,))
+            self.conn.executemany("UPDATE requests SET fulfilled = 0 WHERE request_id = ?",
+                                  [(rid,) for rid in reverted])
+            self.conn.execute("DELETE FROM requests WHERE block_number > ?", (to_block,))
+            self.conn.execute("DELETE FROM blocks WHERE number > ?", (to_block,))
+            previous = self.conn.execute("SELECT value FROM meta WHERE key = 'cursor'").fetchone()
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('cursor', ?) "
+                              "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (to_block,))
+        rolled_back = (previous[0] if previous else to_block) - to_block
+        self.reorgs += 1
+        self.rolled_back_blocks += rolled_back
+        logger.warning(f"Chain reorganization: rolled the index back {rolled_back} block(s) to {to_block}")
+
+    def _headers(self, numbers) -> Dict[int, Any]:
+        return {n: self.w3.eth.get_block(n) for n in sorted(set(numbers))}
+
+    def _index_range(self, from_block: int, to_block: int, head: int) -> int:
+        addresses = [self.oracle_address] + ([self.ai_contract_address] if self.ai_contract_address else [])
+        events = self.decoder.get_logs(self.w3, addresses, from_block, to_block)
+
+        # Hashes of blocks that could still be reorganized, and timestamps of blocks with requests
+        window = range(max(from_block, head - self.confirmations + 1), to_block + 1)
+        request_blocks = [e['blockNumber'] for e in events if e['event'] == 'PredictionRequested'] \
+            if self.timestamps else []
+        headers = self._headers(list(window) + request_blocks)
+        for event in events:
+            header = headers.get(event['blockNumber'])
+            if header is not None and event['blockHash'] is not None and bytes(header['hash']) != event['blockHash']:
+                raise RuntimeError(f"Block {event['blockNumber']} changed while indexing; retrying")
+
+        requests, fulfillments, fulfilled_ids = [], [], []
+        for event in events:
+            args = event['args']
+            from_oracle = event['address'] == self.oracle_address
+            if event['event'] == 'PredictionRequested':
+                header = headers.get(event['blockNumber'])
+                requests.append((bytes(args['requestId']), args.get('requester'), bytes(args['inputData']),
+                                 event['blockNumber'], header['timestamp'] if header is not None else None,
+                                 event['transactionHash']))
+            elif from_oracle:
+                fulfillments.append((bytes(args['requestId']), 'oracle', args['prediction'], args['confidence'],
+                                     event['blockNumber'], event['transactionHash']))
+                fulfilled_ids.append((bytes(args['requestId']),))
+            else:
+                fulfillments.append((bytes(args['requestId']), 'contract', args['result'], None,
+                                     event['blockNumber'], event['transactionHash']))
+
+        with self._transaction():
+            # Both contracts log the same request in one transaction; merge their fields
+            self.conn.executemany(
+                "INSERT INTO requests (request_id, requester, input_data, block_number, timestamp, transaction_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(request_id) DO UPDATE SET "
+                "requester = COALESCE(excluded.requester, requester)", requests)
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO fulfillments "
+                "(request_id, source, prediction, confidence, block_number, transaction_hash) "
+                "VALUES (?, ?, ?, ?, ?, ?)", fulfillments)
+            self.conn.executemany("UPDATE requests SET fulfilled = 1 WHERE request_id = ?", fulfilled_ids)
+            self.conn.executemany("INSERT OR REPLACE INTO blocks (number, hash) VALUES (?, ?)",
+                                  [(n, bytes(headers[n]['hash'])) for n in window])
+            self.conn.execute("DELETE FROM blocks WHERE number <= ?", (head - self.confirmations,))
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('cursor', ?) "
+                              "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (to_block,))
+        self.indexed_events += len(events)
+        return len(events)
+
+    def sync(self) -> int:
+        """Roll back any reorganized blocks and index up to the current head; returns events indexed"""
+        head = self.w3.eth.block_number
+        fork = self._find_fork()
+        if fork is not None:
+            self.rollback(fork)
+        indexed = 0
+        cursor = self.cursor
+        while cursor < head:
+            to_block = min(cursor + self.batch_blocks, head)
+            indexed += self._index_range(cursor + 1, to_block, head)
+            cursor = to_block
+        self.last_sync = time.time()
+        return indexed
+
+    async def follow(self, poll_interval: float = 5.0):
+        """Keep the index at the chain head until cancelled"""
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                indexed = await loop.run_in_executor(None, self.sync)
+                if indexed:
+                    logger.info(f"Indexed {indexed} event(s) up to block {self.cursor}")
+            except Exception as e:
+                logger.error(f"Indexer sync failed: {e}")
+            await asyncio.sleep(poll_interval)
+
+    # Queries
+
+    _SELECT = (
+        "SELECT r.request_id, r.requester, r.input_data, r.block_number, r.timestamp, r.transaction_hash, "
+        "r.fulfilled, o.prediction, o.confidence, o.block_number, c.prediction "
+        "FROM requests r "
+        "LEFT JOIN fulfillments o ON o.request_id = r.request_id AND o.source = 'oracle' "
+        "LEFT JOIN fulfillments c ON c.request_id = r.request_id AND c.source = 'contract' "
+    )
+
+    @staticmethod
+    def _row_to_request(row, now: Optional[float] = None) -> Dict[str, Any]:
+        (request_id, requester, input_data, block_number, timestamp, tx_hash,
+         fulfilled, prediction, confidence, fulfilled_block, contract_result) = row
+        request = {
+            'request_id': '0x' + bytes(request_id).hex(),
+            'requester': requester,
+            'input_data': bytes(input_data).decode('utf-8', errors='replace') if input_data is not None else None,
+            'block_number': block_number,
+            'timestamp': timestamp,
+            'transaction_hash': '0x' + bytes(tx_hash).hex() if tx_hash is not None else None,
+            'pending': not fulfilled,
+            'prediction': prediction,
+            'confidence': confidence,
+            'fulfilled_block': fulfilled_block,
+            'contract_result': contract_result
+        }
+        if now is not None and timestamp is not None:
+            request['age_seconds'] = now - timestamp
+        return request
+
+    def get_request(self, request_id: Union[bytes, str]) -> Optional[Dict[str, Any]]:
+        """One request with its fulfillment, as AIOracle.getPrediction/isRequestPending would report it"""
+        with self._lock:
+            row = self.conn.execute(self._SELECT + "WHERE r.request_id = ?", (_request_id(request_id),)).fetchone()
+        return self._row_to_request(row) if row else None
+
+    def requests_by_requester(self, requester: str, limit: int = 100,
+                              before_block: Optional[int] = None) -> List[Dict[str, Any]]:
+        """A requester's requests, newest first; page with before_block"""
+        with self._lock:
+            rows = self.conn.execute(
+                self._SELECT + "WHERE r.requester = ? AND r.block_number < ? ORDER BY r.block_number DESC LIMIT ?",
+                (to_checksum_address(requester), before_block if before_block is not None else 2 ** 62, limit)
+            ).fetchall()
+        return [self._row_to_request(row) for row in rows]
+
+    def pending(self, min_age_seconds: float = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Unfulfilled requests at least `min_age_seconds` old (by block time), oldest first"""
+        now = time.time()
+        query = self._SELECT + "WHERE r.fulfilled = 0 "
+        params: List[Any] = []
+        if min_age_seconds > 0:
+            query += "AND r.timestamp <= ? "
+            params.append(now - min_age_seconds)
+        with self._lock:
+            rows = self.conn.execute(query + "ORDER BY r.block_number LIMIT ?", params + [limit]).fetchall()
+        return [self._row_to_request(row, now) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'cursor': self.cursor,
+            'indexed_events': self.indexed_events,
+            'reorgs': self.reorgs,
+            'rolled_back_blocks': self.rolled_back_blocks,
+            'last_sync': self.last_sync
+        }
+
+
+def create_app(indexer: PredictionIndexer, cors_origins: Optional[List[str]] = None,
+               poll_interval: Optional[float] = None):
+    """FastAPI app serving the index; follows the chain in the background when poll_interval is set"""
+    from fastapi import FastAPI, HTTPException
+
+    app = FastAPI(title="AI Oracle prediction index")
+    if cors_origins:
+        from fastapi.middleware.cors import CORSMiddleware
+        app.add_middleware(CORSMiddleware, allow_origins=cors_origins, allow_methods=['GET'])
+
+    if poll_interval:
+        @app.on_event('startup')
+        async def start_following():
+            app.state.follower = asyncio.create_task(indexer.follow(poll_interval))
+
+        @app.on_event('shutdown')
+        async def stop_following():
+            app.state.follower.cancel()
+
+    # Plain `def` handlers run in FastAPI's thread pool, off the event loop
+    @app.get('/requests/{request_id}')
+    def get_request(request_id: str):
+        try:
+            request = indexer.get_request(request_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="request_id must be 32 bytes of hex")
+        if request is None:
+            raise HTTPException(status_code=404, detail="Unknown request")
+        return request
+
+    @app.get('/requesters/{requester}/requests')
+    def requests_by_requester(requester: str, limit: int = 100, before_block: Optional[int] = None):
+        try:
+            return indexer.requests_by_requester(requester, min(limit, 1000), before_block)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid address")
+
+    @app.get('/pending')
+    def pending(min_age: float = 0, limit: int = 100):
+        return indexer.pending(min_age, min(limit, 1000))
+
+    @app.get('/stats')
+    def stats():
+        return indexer.get_stats()
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Index prediction events and serve them over HTTP')
+    parser.add_argument('--config', default='config.json')
+    args = parser.parse_args()
+
+    import uvicorn
+    from web3 import Web3
+
+    with open(args.config, 'r') as f:
+        config = json.load(f)
+    w3 = Web3(Web3.HTTPProvider(config['blockchain']['rpc_url']))
+    indexer = PredictionIndexer.from_config(config, w3)
+    api = config.get('api', {})
+    app = create_app(indexer, api.get('cors_origins'), config.get('indexer', {}).get('poll_interval', 5))
+    uvicorn.run(app, host=api.get('host', '0.0.0.0'), port=api.get('port', 8000))
+
+
+if __name__ == '__main__':
+    main()
@@ -2,19 +2,36 @@ import joblib
 import numpy as np
 import json
 import logging
-from typing import Dict, List, Tuple, Any
+from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime
 import hashlib
+import os
+
+from src.ai.confidence import ConfidenceEstimator
+from src.ai.preprocessing import PreprocessingPipeline
+from src.ai.quantized import load_quantized
+from src.ai.shared_cache import SharedPredictionCache, model_version
+from src.ai.tf_serving import TracedKerasModel, configure_threads
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class InferenceModel:
-    def __init__(self, model_path: str, model_type: str = 'sklearn'):
+    def __init__(self, model_path: str, model_type: str = 'sklearn',
+                 feature_store=None, feature_columns: Optional[List[str]] = None, quantized: bool = False,
+                 tf_serving: Optional[Dict[str, Any]] = None, shared_cache: Optional[Dict[str, Any]] = None):
         self.model_path = model_path
         self.model_type = model_type
+        self.tf_serving_config = tf_serving if tf_serving is not None else {}
         self.model = self.load_model(model_path)
+        self.serving = self._setup_serving()
+        self.feature_store = feature_store
+        self.feature_columns = feature_columns
+        self.preprocessing = self._load_preprocessing(model_path)
+        self.confidence = self._load_confidence(model_path)
+        self.quantized = self._load_quantized(model_path) if quantized else None
         self.prediction_cache = {}
+        self.shared_cache = self._setup_shared_cache(shared_cache or {})
         self.request_history = []
         
     def load_model(self, model_path: str):
@@ -23,6 +40,9 @@ class InferenceModel:
             if self.model_type == 'sklearn':
                 return joblib.load(model_path)
             elif self.model_type == 'tensorflow':
+                # Thread pools can only be sized before the TensorFlow runtime starts
+                configure_threads(self.tf_serving_config.get('intra_op_threads'),
+                                  self.tf_serving_config.get('inter_op_threads'))
                 from tensorflow.keras.models import load_model
                 return load_model(model_path)
             else:
@@ -31,63 +51,136 @@ class InferenceModel:
             logger.error(f"Failed to load model: {e}")
             raise
 
+    def _setup_serving(self) -> Optional[TracedKerasModel]:
+        """Traced, pre-warmed serving graphs in place of Keras predict for TensorFlow models"""
+        if self.model_type != 'tensorflow' or not self.tf_serving_config.get('enabled', True):
+            return None
+        return TracedKerasModel.from_config(self.model, self.tf_serving_config)
+
+    def _setup_shared_cache(self, config: Dict[str, Any]) -> Optional[SharedPredictionCache]:
+        """Host-wide second cache tier behind prediction_cache, keyed by this model's version"""
+        if not config.get('enabled'):
+            return None
+        return SharedPredictionCache.from_config(config, model_version(self.model_path))
+
+    def _load_preprocessing(self, model_path: str) -> PreprocessingPipeline:
+        """Load the pipeline fitted at training time, or a pass-through one"""
+        preprocessing_path = f"{model_path}_preprocessing.json"
+        if os.path.exists(preprocessing_path):
+            logger.info(f"Loading preprocessing pipeline from {preprocessing_path}")
+            return PreprocessingPipeline.load(preprocessing_path)
+        return PreprocessingPipeline()
+
+    def _load_confidence(self, model_path: str) -> Optional[ConfidenceEstimator]:
+        """Calibrated confidence fitted at training time, if one was saved with the model"""
+        confidence_path = f"{model_path}_confidence.json"
+        if os.path.exists(confidence_path):
+            logger.info(f"Loading confidence calibration from {confidence_path}")
+            return ConfidenceEstimator.load(confidence_path)
+        return None
+
+    def _load_quantized(self, model_path: str):
+        """Fixed-point copy of the model exported next to it"""
+        quantized_path = f"{model_path}_quantized.npz"
+        if not os.path.exists(quantized_path):
+            raise FileNotFoundError(f"No quantized model at {quantized_path}; export one with src.ai.quantized")
+        logger.info(f"Loading quantized model from {quantized_path}")
+        return load_quantized(quantized_path)
+
+    def preprocess_batch(self, input_batch) -> Tuple[np.ndarray, np.ndarray, Dict[int, str]]:
+        """Validate and transform a whole batch in vectorized passes.
+        
+        Returns (model-ready matrix, indices of the rows it holds, errors by row index).
+        """
+        valid, row_index, errors = self.preprocessing.validate(input_batch)
+        return self.preprocessing.transform(valid), row_index, errors
+
     def preprocess_input(self, input_data: List[float]) -> np.ndarray:
         """Preprocess input data for prediction"""
         try:
-            # Convert to numpy array and reshape
-            input_array = np.array(input_data, dtype=np.float32)
-            if input_array.ndim == 1:
-                input_array = input_array.reshape(1, -1)
-            
-            # Basic validation
-            if np.any(np.isnan(input_array)) or np.any(np.isinf(input_array)):
-                raise ValueError("Input contains NaN or infinite values")
-                
-            return input_array
+            processed, _, errors = self.preprocess_batch([input_data] if np.ndim(input_data) == 1 else input_data)
+            if errors:
+                raise ValueError(next(iter(errors.values())))
+            return processed
         except Exception as e:
             logger.error(f"Input preprocessing failed: {e}")
             raise
 
+    def _predict_array(self, processed_input: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Run the model on a preprocessed batch; returns (predictions per row, confidences)"""
+        if self.confidence is not None:
+            predictions, confidences = self.confidence.predict(self.model, processed_input)
+            return predictions.reshape(len(processed_input), -1), confidences
+        
+        if self.model_type == 'sklearn':
+            predictions = self.model.predict(processed_input)
+            
+            # Calculate confidence for sklearn models
+            if hasattr(self.model, 'predict_proba'):
+                probabilities = self.model.predict_proba(processed_input)
+                confidences = np.max(probabilities, axis=1) * 100
+            else:
+                confidences = np.full(len(processed_input), 85.0)  # Default confidence for regression
+                
+        elif self.model_type == 'tensorflow':
+            if self.serving is not None:
+                predictions = self.serving.predict(processed_input)
+            else:
+                predictions = self.model.predict(processed_input)
+            
+            # Calculate confidence for neural networks
+            if predictions.shape[1] > 1:  # Classification
+                confidences = np.max(predictions, axis=1) * 100
+            else:  # Regression
+                confidences = np.full(len(processed_input), 90.0)  # Default confidence
+        
+        return predictions.reshape(len(processed_input), -1), confidences
+
+    def predict_scaled_batch(self, processed_input: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """On-chain integers (prediction * 1000, confidence) for every row of a preprocessed batch"""
+        if self.quantized is not None:
+            return self.quantized.predict_scaled(processed_input)
+        predictions, confidences = self._predict_array(processed_input)
+        return ((predictions[:, 0].astype(np.float64) * 1000).astype(np.int64),
+                np.asarray(confidences).astype(np.int64))
+
+    @staticmethod
+    def _cache_key(input_data) -> str:
+        return hashlib.md5(str(input_data).encode()).hexdigest()
+
     def predict_with_confidence(self, input_data: List[float]) -> Tuple[List[float], float]:
         """Make prediction with confidence score"""
         try:
             # Create cache key
-            cache_key = hashlib.md5(str(input_data).encode()).hexdigest()
+            cache_key = self._cache_key(input_data)
             
             # Check cache first
             if cache_key in self.prediction_cache:
                 logger.info("Returning cached prediction")
                 return self.prediction_cache[cache_key]
             
+            # Then the cache shared with other processes on this host
+            if self.shared_cache is not None:
+                result = self.shared_cache.get(input_data)
+                if result is not None:
+                    self.prediction_cache[cache_key] = result
+                    return result
+            
             # Preprocess input
             processed_input = self.preprocess_input(input_data)
             
             # Make prediction
-            if self.model_type == 'sklearn':
-                prediction = self.model.predict(processed_input)
-                
-                # Calculate confidence for sklearn models
-                if hasattr(self.model, 'predict_proba'):
-                    probabilities = self.model.predict_proba(processed_input)
-                    confidence = float(np.max(probabilities) * 100)
-                else:
-                    confidence = 85.0  # Default confidence for regression
-                    
-            elif self.model_type == 'tensorflow':
-                prediction = self.model.predict(processed_input)
-                
-                # Calculate confidence for neural networks
-                if prediction.shape[1] > 1:  # Classification
-                    confidence = float(np.max(prediction) * 100)
-                else:  # Regression
-                    confidence = 90.0  # Default confidence
+            predictions, confidences = self._predict_array(processed_input)
+            confidence = float(np.max(confidences))
             
             # Convert prediction to list
-            prediction_list = prediction.flatten().tolist()
+            prediction_list = predictions.flatten().tolist()
             
             # Cache the result
             result = (prediction_list, confidence)
             self.prediction_cache[cache_key] = result
+            if self.shared_cache is not None:
+                self.shared_cache.put(input_data, prediction_list, confidence)
             
             # Log the prediction
             self._log_prediction(input_data, prediction_list, confidence)
@@ -98,22 +191,89 @@ class InferenceModel:
             logger.error(f"Prediction failed: {e}")
             raise
 
+    def predict_scaled(self, input_data: List[float]) -> Tuple[int, int]:
+        """(prediction * 1000, confidence) integers as submitted on chain.
+        
+        With a quantized model these come straight from integer arithmetic,
+        identical on every replica; otherwise they are truncated from the
+        float path.
+        """
+        if self.quantized is None:
+            prediction, confidence = self.predict_with_confidence(input_data)
+            return int(prediction[0] * 1000), int(confidence)
+        
+        predictions, confidences = self.quantized.predict_scaled(self.preprocess_input(input_data))
+        return int(predictions[0]), int(confidences[0])
+
     def predict(self, input_data: List[float]) -> List[float]:
         """Simple prediction without confidence (backward compatibility)"""
         prediction, _ = self.predict_with_confidence(input_data)
         return prediction
 
-    def batch_predict(self, input_batch: List[List[float]]) -> List[Tuple[List[float], float]]:
-        """Make predictions for a batch of inputs"""
-        results = []
-        for input_data in input_batch:
+    def predict_symbol(self, symbol: str) -> Tuple[List[float], float]:
+        """Predict from the latest feature vector stored for a symbol"""
+        if self.feature_store is None:
+            raise ValueError("No feature store configured")
+        
+        features = self.feature_store.latest(symbol, self.feature_columns)
+        if features is None:
+            raise KeyError(f"No features stored for symbol: {symbol}")
+        
+        return self.predict_with_confidence(features.tolist())
+
+    def batch_predict(self, input_batch: List[List[float]], return_errors: bool = False):
+        """Make predictions for a batch of inputs in one vectorized model call.
+        
+        Invalid rows yield ([], 0.0) and are reported per row instead of failing
+        the batch; pass return_errors=True to also get {row index: error}.
+        """
+        results: List[Tuple[List[float], float]] = [([], 0.0)] * len(input_batch)
+        errors: Dict[int, str] = {}
+        
+        # Serve cached rows, collect misses
+        cache_keys = [self._cache_key(input_data) for input_data in input_batch]
+        misses = []
+        for i, cache_key in enumerate(cache_keys):
+            cached = self.prediction_cache.get(cache_key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                misses.append(i)
+        
+        if misses and self.shared_cache is not None:
+            shared = self.shared_cache.get_many([input_batch[i] for i in misses])
+            for i, result in zip(misses, shared):
+                if result is not None:
+                    results[i] = self.prediction_cache[cache_keys[i]] = result
+            misses = [i for i, result in zip(misses, shared) if result is None]
+        
+        if misses:
             try:
-                result = self.predict_with_confidence(input_data)
-                results.append(result)
+                processed, valid_rows, row_errors = self.preprocess_batch([input_batch[i] for i in misses])
+                for j, error in row_errors.items():
+                    errors[misses[j]] = error
+                
+                if len(processed):
+                    predictions, confidences = self._predict_array(processed)
+                    computed = []
+                    for j, prediction, confidence in zip(valid_rows, predictions.tolist(), confidences.tolist()):
+                        i = misses[j]
+                        result = (prediction, float(confidence))
+                        results[i] = result
+                        self.prediction_cache[cache_keys[i]] = result
+                        computed.append((input_batch[i], prediction, float(confidence)))
+                        self._log_prediction(input_batch[i], prediction, float(confidence))
+                    if self.shared_cache is not None:
+                        self.shared_cache.put_many(computed)
             except Exception as e:
-                logger.error(f"Batch prediction failed for input {input_data}: {e}")
-                results.append(([], 0.0))
-        return results
+                logger.error(f"Batch prediction failed: {e}")
+                for i in misses:
+                    errors.setdefault(i, str(e))
+        
+        for i, error in errors.items():
+            logger.error(f"Batch prediction failed for input {input_batch[i]}: {error}")
+        
+        return (results, errors) if return_errors else results
 
     def _log_prediction(self, input_data: List[float], prediction: List[float], confidence: float):
         """Log prediction for audit trail"""
@@ -135,7 +295,10 @@ class InferenceModel:
         return {
             'model_path': self.model_path,
             'model_type': self.model_type,
+            'quantized': self.quantized is not None,
+            'tf_serving': self.serving.get_stats() if self.serving is not None else None,
             'cache_size': len(self.prediction_cache),
+            'shared_cache': self.shared_cache.get_stats() if self.shared_cache is not None else None,
             'total_predictions': len(self.request_history),
             'avg_confidence': np.mean([entry['confidence'] for entry in self.request_history]) if self.request_history else 0
         }
@@ -0,0 +1,222 @@
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from eth_utils import keccak, to_checksum_address
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_STATIC_TYPE = re.compile(r'^(uint|int)(\d*)$|^bool$|^address$|^bytes([1-9]|[12]\d|3[0-2])$')
+_DYNAMIC_TYPES = ('bytes', 'string')
+
+
+def _to_bytes(value) -> bytes:
+    """Raw RPC results carry 0x-hex strings; already-formatted ones carry bytes"""
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value.startswith('0x') else value)
+    return bytes(value)
+
+
+def _to_int(value) -> int:
+    return value if isinstance(value, int) else int(value, 16)
+
+
+# Log fields copied onto decoded events: (JSON-RPC key, eth-tester's raw key, converter)
+_LOG_FIELDS = (
+    ('blockNumber', 'block_number', _to_int),
+    ('blockHash', 'block_hash', _to_bytes),
+    ('transactionHash', 'transaction_hash', _to_bytes),
+    ('transactionIndex', 'transaction_index', _to_int),
+    ('logIndex', 'log_index', _to_int)
+)
+
+
+class EventSchema:
+    """Topic hash and ABI layout of one event, computed once and cacheable as JSON"""
+
+    def __init__(self, name: str, inputs: List[Dict[str, Any]], topic: Optional[str] = None,
+                 anonymous: bool = False):
+        self.name = name
+        self.inputs = [{'name': i['name'], 'type': i['type'], 'indexed': bool(i.get('indexed'))} for i in inputs]
+        self.anonymous = anonymous
+        self.signature = f"{name}({','.join(i['type'] for i in self.inputs)})"
+        self.topic = topic or '0x' + keccak(text=self.signature).hex()
+        self.indexed = [(i['name'], i['type']) for i in self.inputs if i['indexed']]
+        self.data = [(i['name'], i['type']) for i in self.inputs if not i['indexed']]
+
+    @classmethod
+    def from_abi(cls, entry: Dict[str, Any]) -> 'EventSchema':
+        return cls(entry['name'], entry.get('inputs', []), anonymous=entry.get('anonymous', False))
+
+    @property
+    def supported(self) -> bool:
+        """Whether the raw decoder handles every field (no arrays or tuples)"""
+        return all(_STATIC_TYPE.match(t) or t in _DYNAMIC_TYPES for _, t in self.indexed + self.data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'name': self.name, 'inputs': self.inputs, 'topic': self.topic, 'anonymous': self.anonymous}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'EventSchema':
+        return cls(data['name'], data['inputs'], topic=data['topic'], anonymous=data.get('anonymous', False))
+
+
+def schemas_from_abi(abi: Iterable[Dict[str, Any]]) -> Dict[str, EventSchema]:
+    """Event schemas by name from an ABI (list of entries)"""
+    return {entry['name']: EventSchema.from_abi(entry) for entry in abi if entry.get('type') == 'event'}
+
+
+def load_event_schemas(artifact_path: str, cache_path: Optional[str] = None) -> Dict[str, EventSchema]:
+    """Event schemas from a Truffle artifact, via a small JSON cache keyed by the artifact's size/mtime.
+
+    The artifact (ABI, bytecode, AST, source maps) is only parsed when the
+    cache is missing or stale.
+    """
+    stat = os.stat(artifact_path)
+    source = {'artifact': os.path.abspath(artifact_path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path, 'r') as f:
+                cached = json.load(f)
+            if cached.get('source') == source:
+                return {name: EventSchema.from_dict(data) for name, data in cached['events'].items()}
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable event schema cache {cache_path}: {e}")
+
+    with open(artifact_path, 'r') as f:
+        schemas = schemas_from_abi(json.load(f)['abi'])
+    if cache_path:
+        directory = os.path.dirname(cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(cache_path, 'w') as f:
+            json.dump({'source': source, 'events': {name: s.to_dict() for name, s in schemas.items()}}, f)
+        logger.info(f"Cached {len(schemas)} event schema(s) from {artifact_path} in {cache_path}")
+    return schemas
+
+
+class LogDecoder:
+    """Decodes raw eth_getLogs results for a fixed set of events.
+
+    Logs are matched on topic0 with a dict lookup; indexed fields come from
+    the remaining topics and data fields are read from 32-byte ABI words,
+    with dynamic `bytes`/`string` sliced out of a memoryview at their
+    offsets. Decoded events are plain dicts shaped like web3's
+    (event, args, address, blockNumber, transactionHash, logIndex, ...).
+    """
+
+    def __init__(self, schemas: Iterable[EventSchema]):
+        self.schemas = list(schemas)
+        for schema in self.schemas:
+            if not schema.supported:
+                raise ValueError(f"Event {schema.signature} has types the raw decoder does not handle")
+            if schema.anonymous:
+                raise ValueError(f"Anonymous event {schema.name} has no topic to match on")
+        # Per-field converters are resolved once per schema, not per log
+        self._by_topic: Dict[Any, Any] = {}
+        for schema in self.schemas:
+            plan = (schema,
+                    [(name, self._converter(abi_type, indexed=True)) for name, abi_type in schema.indexed],
+                    [(name, abi_type, self._converter(abi_type)) for name, abi_type in schema.data])
+            self._by_topic[schema.topic] = plan
+            self._by_topic[bytes.fromhex(schema.topic[2:])] = plan
+        self._addresses: Dict[Any, str] = {}
+        self.decoded = 0
+        self.skipped = 0
+
+    @property
+    def topics(self) -> List[str]:
+        return [schema.topic for schema in self.schemas]
+
+    def _converter(self, abi_type: str, indexed: bool = False):
+        """Function turning one 32-byte ABI word (or a dynamic value's bytes) into a Python value"""
+        if abi_type in _DYNAMIC_TYPES:
+            if indexed:
+                return bytes  # Indexed dynamic values are only present as their hash
+            return (lambda value: value.decode('utf-8', errors='replace')) if abi_type == 'string' else None
+        if abi_type.startswith('uint'):
+            return lambda word: int.from_bytes(word, 'big')
+        if abi_type.startswith('int'):
+            return lambda word: int.from_bytes(word, 'big', signed=True)
+        if abi_type == 'bool':
+            return lambda word: word[-1] != 0
+        if abi_type == 'address':
+            return lambda word: self._checksum(bytes(word[12:]))
+        size = int(abi_type[5:])
+        return lambda word: bytes(word[:size])  # bytesN, left-aligned
+
+    def _checksum(self, address) -> Optional[str]:
+        """Checksummed address, memoized: a contract's logs repeat the same few addresses"""
+        if address is None:
+            return None
+        checksummed = self._addresses.get(address)
+        if checksummed is None:
+            checksummed = self._addresses[address] = to_checksum_address(address)
+        return checksummed
+
+    def decode_log(self, log: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """One raw log as a web3-style event dict, or None if it is not one of our events"""
+        topics = log['topics']
+        if not topics:
+            return None
+        plan = self._by_topic.get(topics[0].lower() if isinstance(topics[0], str) else bytes(topics[0]))
+        if plan is None:
+            return None
+        schema, indexed, fields = plan
+
+        args = {}
+        for (name, convert), topic in zip(indexed, topics[1:]):
+            args[name] = convert(_to_bytes(topic))
+
+        data = memoryview(_to_bytes(log['data']))
+        for i, (name, abi_type, convert) in enumerate(fields):
+            head = data[32 * i:32 * i + 32]
+            if abi_type in _DYNAMIC_TYPES:
+                offset = int.from_bytes(head, 'big')
+                length = int.from_bytes(data[offset:offset + 32], 'big')
+                value = bytes(data[offset + 32:offset + 32 + length])
+                args[name] = convert(value) if convert is not None else value
+            else:
+                args[name] = convert(head)
+
+        event = {'event': schema.name, 'args': args, 'address': self._checksum(log.get('address'))}
+        for key, raw_key, convert in _LOG_FIELDS:
+            value = log.get(key, log.get(raw_key))
+            event[key] = convert(value) if value is not None else None
+        return event
+
+    def decode(self, logs: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Decode a batch of raw logs, dropping any that match none of the schemas"""
+        events = []
+        for log in logs:
+            event = self.decode_log(log)
+            if event is None:
+                self.skipped += 1
+            else:
+                events.append(event)
+        self.decoded += len(events)
+        return events
+
+    def get_logs(self, w3, address: Union[str, List[str]], from_block: int, to_block: int) -> List[Dict[str, Any]]:
+        """eth_getLogs for our events at `address` (one or several), decoded without web3's result formatters"""
+        if hasattr(w3.provider, 'ethereum_tester'):
+            # The in-process test provider takes its backend's snake_case filter directly
+            params = {'address': address, 'from_block': from_block, 'to_block': to_block, 'topics': [self.topics]}
+        else:
+            params = {'address': address, 'fromBlock': hex(from_block), 'toBlock': hex(to_block),
+                      'topics': [self.topics]}
+        response = w3.provider.make_request('eth_getLogs', [params])
+        if response.get('error'):
+            error = response['error']
+            raise ValueError(error.get('message', error) if isinstance(error, dict) else error)
+        return self.decode(response['result'])
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'events': [schema.signature for schema in self.schemas],
+            'decoded': self.decoded,
+            'skipped': self.skipped
+        }
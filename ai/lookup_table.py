@@ -0,0 +1,168 @@
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class LookupTable:
+    """Precomputed on-chain answers for a bounded, quantized input domain.
+
+    Every grid point lower + k * step (per feature, up to upper) is run
+    through the model once, in vectorized batches, and the integers the
+    bridges submit (prediction * 1000 and confidence, truncated as they are
+    on the live path) are stored in dense arrays. A request on the grid is
+    then answered by computing its flat index; anything else returns None
+    so the caller falls back to the model. With snap=True, in-bounds inputs
+    are rounded to the nearest grid point instead of missing.
+    """
+
+    def __init__(self, lower: Sequence[float], upper: Sequence[float], step: Union[float, Sequence[float]],
+                 snap: bool = False, max_cells: int = 10_000_000):
+        self.lower = np.asarray(lower, dtype=np.float64)
+        self.upper = np.asarray(upper, dtype=np.float64)
+        self.step = np.broadcast_to(np.asarray(step, dtype=np.float64), self.lower.shape).copy()
+        if self.lower.shape != self.upper.shape or self.lower.ndim != 1:
+            raise ValueError("lower and upper must be 1-d and the same length")
+        if np.any(self.step <= 0) or np.any(self.upper < self.lower):
+            raise ValueError("Steps must be positive and upper bounds >= lower bounds")
+
+        self.shape = tuple(int(n) for n in np.floor((self.upper - self.lower) / self.step + 1e-9).astype(np.int64) + 1)
+        self.n_cells = int(np.prod(self.shape))
+        if self.n_cells > max_cells:
+            raise ValueError(f"Grid has {self.n_cells} cells, more than max_cells={max_cells}")
+        self.snap = snap
+
+        self.predictions: Optional[np.ndarray] = None
+        self.confidences: Optional[np.ndarray] = None
+        self.build_seconds = 0.0
+        self.hits = 0
+        self.misses = 0
+
+        # Plain Python copies: per-request indexing on a handful of floats is faster without numpy
+        self._lower = self.lower.tolist()
+        self._step = self.step.tolist()
+        self._dims = list(self.shape)
+        self._strides = [int(np.prod(self.shape[i + 1:])) for i in range(len(self.shape))]
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], model=None) -> 'LookupTable':
+        """Load the table cached at config['path'] if it matches, else build it from `model` (and cache it)"""
+        table = cls(config['lower'], config['upper'], config['step'],
+                    snap=config.get('snap', False), max_cells=config.get('max_cells', 10_000_000))
+        path = config.get('path')
+        source = table._model_signature(model)
+        if path and os.path.exists(path):
+            try:
+                table.load(path, expected_source=source)
+                return table
+            except ValueError as e:
+                logger.info(f"Rebuilding lookup table: {e}")
+        if model is None:
+            raise ValueError("A model is required to build the lookup table")
+        table.build(model, batch_size=config.get('batch_size', 65536))
+        if path:
+            table.save(path, source=source)
+        return table
+
+    def grid_points(self, flat_indices: np.ndarray) -> np.ndarray:
+        """Feature rows for the given flat cell indices"""
+        coords = np.stack(np.unravel_index(flat_indices, self.shape), axis=1)
+        return self.lower + coords * self.step
+
+    def build(self, model, batch_size: int = 65536) -> 'LookupTable':
+        """Evaluate `model` (an InferenceModel) over the whole grid"""
+        start = time.perf_counter()
+        predictions = np.empty(self.n_cells, dtype=np.int64)
+        confidences = np.empty(self.n_cells, dtype=np.uint8)
+        for begin in range(0, self.n_cells, batch_size):
+            indices = np.arange(begin, min(begin + batch_size, self.n_cells))
+            # Same float32 rows and preprocessing the live path produces
+            rows = self.grid_points(indices).astype(np.float32)
+            predictions[indices], confidences[indices] = model.predict_scaled_batch(model.preprocessing.transform(rows))
+        self.predictions, self.confidences = predictions, confidences
+        self.build_seconds = time.perf_counter() - start
+        logger.info(f"Built lookup table: {self.n_cells} cells {self.shape} in {self.build_seconds:.2f}s, "
+                    f"{self.nbytes / 1e6:.1f} MB")
+        return self
+
+    def index_of(self, input_values) -> Optional[int]:
+        """Flat cell index for an input, or None if it is off the grid"""
+        try:
+            if len(input_values) != len(self._dims):
+                return None
+            index = 0
+            for value, lower, step, n, stride in zip(input_values, self._lower, self._step, self._dims, self._strides):
+                position = (float(value) - lower) / step
+                k = round(position)
+                if not 0 <= k < n or (not self.snap and abs(position - k) > 1e-6):
+                    return None
+                index += k * stride
+            return index
+        except (TypeError, ValueError):
+            return None
+
+    def lookup(self, input_values) -> Optional[Tuple[int, int]]:
+        """(prediction * 1000, confidence) as submitted on chain, or None to fall back to the model"""
+        index = self.index_of(input_values) if self.predictions is not None else None
+        if index is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return int(self.predictions[index]), int(self.confidences[index])
+
+    @property
+    def nbytes(self) -> int:
+        if self.predictions is None:
+            return 0
+        return self.predictions.nbytes + self.confidences.nbytes
+
+    @staticmethod
+    def _model_signature(model) -> Optional[Dict[str, Any]]:
+        """Identifies the model file a table was built from, so a retrained model invalidates it"""
+        if model is None or not os.path.exists(model.model_path):
+            return None
+        stat = os.stat(model.model_path)
+        return {'model_path': os.path.abspath(model.model_path), 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+    def _grid_spec(self) -> Dict[str, List[float]]:
+        return {'lower': self.lower.tolist(), 'upper': self.upper.tolist(), 'step': self.step.tolist()}
+
+    def save(self, path: str, source: Optional[Dict[str, Any]] = None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        meta = dict(self._grid_spec(), source=source, build_seconds=self.build_seconds)
+        with open(path, 'wb') as f:
+            np.savez(f, predictions=self.predictions, confidences=self.confidences, meta=json.dumps(meta))
+        logger.info(f"Lookup table saved to {path}")
+
+    def load(self, path: str, expected_source: Optional[Dict[str, Any]] = None) -> 'LookupTable':
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            if {key: meta[key] for key in ('lower', 'upper', 'step')} != self._grid_spec():
+                raise ValueError(f"{path} was built for a different grid")
+            if expected_source is not None and meta.get('source') != expected_source:
+                raise ValueError(f"{path} was built from a different model")
+            self.predictions = data['predictions']
+            self.confidences = data['confidences']
+        self.build_seconds = meta.get('build_seconds', 0.0)
+        logger.info(f"Loaded lookup table from {path} ({self.n_cells} cells)")
+        return self
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'cells': self.n_cells,
+            'shape': list(self.shape),
+            'memory_bytes': self.nbytes,
+            'build_seconds': round(self.build_seconds, 3),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
@@ -1,57 +1,115 @@
 import tensorflow as tf
 from tensorflow.keras.models import Sequential, load_model
 from tensorflow.keras.layers import Dense, Dropout, BatchNormalization
-from tensorflow.keras.callbacks import ModelCheckpoint, EarlyStopping, ReduceLROnPlateau
+from tensorflow.keras.callbacks import EarlyStopping, ReduceLROnPlateau
 from tensorflow.keras.optimizers import Adam
 import numpy as np
 import joblib
 import logging
+import os
+from datetime import datetime
+
+from src.ai.checkpointing import CheckpointCallback, CheckpointManager
+from src.ai.confidence import ConfidenceEstimator
+from src.ai.preprocessing import PreprocessingPipeline
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class AIModel:
-    def __init__(self, input_dim, output_dim, model_type='classification'):
+    def __init__(self, input_dim, output_dim, model_type='classification', preprocessing=None,
+                 hidden_units=(128, 64, 32), dropout_rates=(0.3, 0.2, 0.1), learning_rate=0.001,
+                 calibration='isotonic', mc_samples=20):
         self.input_dim = input_dim
         self.output_dim = output_dim
         self.model_type = model_type
+        self.hidden_units = tuple(hidden_units)
+        if isinstance(dropout_rates, (int, float)):
+            dropout_rates = (dropout_rates,) * len(self.hidden_units)
+        if len(dropout_rates) != len(self.hidden_units):
+            raise ValueError("dropout_rates must have one entry per hidden layer")
+        self.dropout_rates = tuple(dropout_rates)
+        self.learning_rate = learning_rate
+        self.calibration = calibration
+        self.mc_samples = mc_samples
+        self.confidence = None
+        self.checkpoints = None
+        self.preprocessing = PreprocessingPipeline.coerce(preprocessing)
         self.model = self._build_model()
         self.is_trained = False
         self.version = "1.0.0"
         
+    @property
+    def feature_dim(self):
+        """Width of the network input after preprocessing"""
+        if self.preprocessing is None:
+            return self.input_dim
+        return self.preprocessing.output_dim(self.input_dim)
+
+    def _transform(self, X):
+        """Apply the fitted preprocessing pipeline, if any"""
+        if X is None or self.preprocessing is None:
+            return X
+        return self.preprocessing.transform(X)
+
     def _build_model(self):
         """Build the neural network architecture"""
-        model = Sequential([
-            Dense(128, input_dim=self.input_dim, activation='relu'),
-            BatchNormalization(),
-            Dropout(0.3),
-            
-            Dense(64, activation='relu'),
-            BatchNormalization(),
-            Dropout(0.2),
+        layers = []
+        for i, (units, rate) in enumerate(zip(self.hidden_units, self.dropout_rates)):
+            if i == 0:
+                layers.append(Dense(units, input_dim=self.feature_dim, activation='relu'))
+            else:
+                layers.append(Dense(units, activation='relu'))
             
-            Dense(32, activation='relu'),
-            Dropout(0.1),
-            
-            Dense(self.output_dim, activation='sigmoid' if self.model_type == 'classification' else 'linear')
-        ])
+            # Batch normalization on all but the last hidden layer
+            if i < len(self.hidden_units) - 1:
+                layers.append(BatchNormalization())
+            layers.append(Dropout(rate))
+        
+        layers.append(Dense(self.output_dim, activation='sigmoid' if self.model_type == 'classification' else 'linear'))
+        model = Sequential(layers)
         
-        optimizer = Adam(learning_rate=0.001)
+        optimizer = Adam(learning_rate=self.learning_rate)
         loss = 'binary_crossentropy' if self.model_type == 'classification' else 'mse'
         metrics = ['accuracy'] if self.model_type == 'classification' else ['mae']
         
         model.compile(optimizer=optimizer, loss=loss, metrics=metrics)
         return model
 
-    def train(self, X_train, y_train, X_val=None, y_val=None, epochs=100, batch_size=32):
-        """Train the model with validation and callbacks"""
-        logger.info(f"Starting training for {epochs} epochs...")
-        
+    def _build_callbacks(self, checkpoint_path='checkpoints', keep_checkpoints=3, monitor='val_loss'):
+        """Training callbacks shared by in-memory and streaming training.
+
+        checkpoint_path holds one run_<timestamp> directory of versioned top-k
+        checkpoints per training run, written in the background (see
+        CheckpointManager), so runs never rank against each other; call after
+        preprocessing is fitted so checkpoints carry it.
+        """
         callbacks = [
-            ModelCheckpoint('best_model.h5', save_best_only=True, monitor='val_loss'),
             EarlyStopping(patience=10, restore_best_weights=True),
             ReduceLROnPlateau(factor=0.5, patience=5, min_lr=1e-7)
         ]
+        if checkpoint_path:
+            if self.checkpoints is not None:
+                self.checkpoints.close()
+            run_dir = os.path.join(checkpoint_path, f"run_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+            self.checkpoints = CheckpointManager(run_dir, keep=keep_checkpoints, monitor=monitor)
+            logger.info(f"Checkpointing to {run_dir}")
+            preprocessing = self.preprocessing.to_dict() if self.preprocessing is not None else None
+            callbacks.insert(0, CheckpointCallback(self.checkpoints, lambda: dict(self._metadata(), is_trained=True),
+                                                   preprocessing))
+        return callbacks
+
+    def train(self, X_train, y_train, X_val=None, y_val=None, epochs=100, batch_size=32,
+              checkpoint_path='checkpoints', keep_checkpoints=3, verbose=1):
+        """Train the model with validation and callbacks"""
+        logger.info(f"Starting training for {epochs} epochs...")
+        
+        if self.preprocessing is not None:
+            X_train = self.preprocessing.fit_transform(X_train)
+            X_val = self._transform(X_val)
+        
+        callbacks = self._build_callbacks(checkpoint_path, keep_checkpoints,
+                                          monitor='val_loss' if X_val is not None else 'loss')
         
         validation_data = (X_val, y_val) if X_val is not None else None
         
@@ -61,19 +119,88 @@ class AIModel:
             epochs=epochs,
             batch_size=batch_size,
             callbacks=callbacks,
-            verbose=1
+            verbose=verbose
         )
         
         self.is_trained = True
+        if X_val is not None and self.calibration:
+            self._fit_confidence(X_val, y_val)
         logger.info("Training completed successfully!")
         return history
 
+    def _preprocessing_map_fn(self):
+        """tf.data map function running the fitted pipeline on each batch"""
+        pipeline = self.preprocessing
+        feature_dim = self.feature_dim
+        
+        def preprocess(X, y):
+            X = tf.numpy_function(pipeline.transform, [X], tf.float32)
+            X.set_shape([None, feature_dim])
+            return X, y
+        
+        return preprocess
+
+    def train_streaming(self, train_data, val_data=None, epochs=100, batch_size=32, steps_per_epoch=None,
+                        fit_sample_rows=100000, checkpoint_path='checkpoints', keep_checkpoints=3):
+        """Train from a StreamingDataset (generator or on-disk shards) via tf.data"""
+        logger.info(f"Starting streaming training for {epochs} epochs...")
+        
+        preprocess_fn = None
+        if self.preprocessing is not None:
+            # Fit on a leading sample; the full stream is never materialized
+            X_sample, _ = train_data.sample(fit_sample_rows)
+            self.preprocessing.fit(X_sample)
+            preprocess_fn = self._preprocessing_map_fn()
+        
+        train_dataset = train_data.build(batch_size=batch_size, shuffle=True, repeat=steps_per_epoch is not None,
+                                         preprocess_fn=preprocess_fn)
+        validation_dataset = None
+        if val_data is not None:
+            validation_dataset = val_data.build(batch_size=batch_size, shuffle=False, preprocess_fn=preprocess_fn)
+        
+        history = self.model.fit(
+            train_dataset,
+            validation_data=validation_dataset,
+            epochs=epochs,
+            steps_per_epoch=steps_per_epoch,
+            callbacks=self._build_callbacks(checkpoint_path, keep_checkpoints,
+                                            monitor='val_loss' if val_data is not None else 'loss'),
+            verbose=1
+        )
+        
+        self.is_trained = True
+        if val_data is not None and self.calibration:
+            X_val, y_val = val_data.sample(fit_sample_rows)
+            self._fit_confidence(self._transform(X_val), y_val)
+        logger.info("Streaming training completed successfully!")
+        return history
+
+    def _fit_confidence(self, X_val, y_val):
+        """Calibrate MC-dropout confidence on preprocessed validation data"""
+        self.confidence = ConfidenceEstimator(self.model_type, self.calibration, self.mc_samples)
+        self.confidence.fit(self.model, X_val, y_val)
+
+    def train_from_feature_store(self, store, feature_columns, label_column, start=0, stop=None,
+                                 val_fraction=0.2, epochs=100, batch_size=32):
+        """Train on a contiguous row range of a FeatureStore, holding out the most recent rows"""
+        stop = len(store) if stop is None else min(stop, len(store))
+        split = stop - int((stop - start) * val_fraction)
+        
+        X_train, y_train = store.training_arrays(feature_columns, label_column, start, split)
+        X_val, y_val = store.training_arrays(feature_columns, label_column, split, stop) if split < stop else (None, None)
+        
+        logger.info(f"Training from feature store rows {start}-{stop} ({split - start} train, {stop - split} validation)")
+        return self.train(X_train, y_train, X_val, y_val, epochs=epochs, batch_size=batch_size)
+
     def predict_with_confidence(self, X):
         """Make prediction with confidence score"""
         if not self.is_trained:
             logger.warning("Model not trained yet!")
+        
+        if self.confidence is not None:
+            return self.confidence.predict(self.model, self._transform(X))
             
-        predictions = self.model.predict(X)
+        predictions = self.model.predict(self._transform(X))
         
         # Calculate confidence based on prediction probability
         if self.model_type == 'classification':
@@ -89,23 +216,37 @@ class AIModel:
         if not self.is_trained:
             raise ValueError("Model must be trained before evaluation")
             
-        loss, metric = self.model.evaluate(X_test, y_test, verbose=0)
+        loss, metric = self.model.evaluate(self._transform(X_test), y_test, verbose=0)
         logger.info(f"Test Loss: {loss:.4f}, Test Metric: {metric:.4f}")
         return loss, metric
 
-    def save_model(self, filepath):
-        """Save the trained model"""
-        self.model.save(filepath)
-        
-        # Save metadata
-        metadata = {
+    def _metadata(self):
+        """What save_model records next to the weights, and checkpoints record in their manifest"""
+        return {
             'input_dim': self.input_dim,
             'output_dim': self.output_dim,
             'model_type': self.model_type,
             'is_trained': self.is_trained,
-            'version': self.version
+            'version': self.version,
+            'preprocessing': self.preprocessing is not None,
+            'hidden_units': list(self.hidden_units),
+            'dropout_rates': list(self.dropout_rates),
+            'learning_rate': self.learning_rate,
+            'calibration': self.calibration,
+            'mc_samples': self.mc_samples
         }
-        joblib.dump(metadata, f"{filepath}_metadata.pkl")
+
+    def save_model(self, filepath):
+        """Save the trained model"""
+        self.model.save(filepath)
+        
+        # Save metadata
+        joblib.dump(self._metadata(), f"{filepath}_metadata.pkl")
+        
+        if self.preprocessing is not None:
+            self.preprocessing.save(f"{filepath}_preprocessing.json")
+        if self.confidence is not None:
+            self.confidence.save(f"{filepath}_confidence.json")
         logger.info(f"Model saved to {filepath}")
 
     def load_model(self, filepath):
@@ -114,17 +255,58 @@ class AIModel:
         
         # Load metadata
         try:
-            metadata = joblib.load(f"{filepath}_metadata.pkl")
-            self.input_dim = metadata['input_dim']
-            self.output_dim = metadata['output_dim']
-            self.model_type = metadata['model_type']
-            self.is_trained = metadata['is_trained']
-            self.version = metadata['version']
+            self._apply_metadata(joblib.load(f"{filepath}_metadata.pkl"))
         except FileNotFoundError:
             logger.warning("Metadata file not found, using defaults")
+        
+        preprocessing_path = f"{filepath}_preprocessing.json"
+        self.preprocessing = PreprocessingPipeline.load(preprocessing_path) if os.path.exists(preprocessing_path) else None
+        confidence_path = f"{filepath}_confidence.json"
+        self.confidence = ConfidenceEstimator.load(confidence_path) if os.path.exists(confidence_path) else None
             
         logger.info(f"Model loaded from {filepath}")
 
+    def _apply_metadata(self, metadata):
+        self.input_dim = metadata['input_dim']
+        self.output_dim = metadata['output_dim']
+        self.model_type = metadata['model_type']
+        self.is_trained = metadata['is_trained']
+        self.version = metadata['version']
+        self.hidden_units = tuple(metadata.get('hidden_units', self.hidden_units))
+        self.dropout_rates = tuple(metadata.get('dropout_rates', self.dropout_rates))
+        self.learning_rate = metadata.get('learning_rate', self.learning_rate)
+        self.calibration = metadata.get('calibration', self.calibration)
+        self.mc_samples = metadata.get('mc_samples', self.mc_samples)
+
+    @staticmethod
+    def _latest_run(directory):
+        """The most recent run directory under a training checkpoint_path"""
+        runs = sorted(name for name in os.listdir(directory)
+                      if name.startswith('run_') and os.path.exists(os.path.join(directory, name, 'manifest.json')))
+        if not runs:
+            raise ValueError(f"No checkpoint runs in {directory}")
+        return os.path.join(directory, runs[-1])
+
+    def load_checkpoint(self, directory, version=None):
+        """Restore a training checkpoint (the best one unless `version` is given); returns its manifest entry.
+
+        `directory` is either one run's directory or a checkpoint_path, in
+        which case the latest run is used.
+        """
+        if not os.path.exists(os.path.join(directory, 'manifest.json')):
+            directory = self._latest_run(directory)
+        manager = CheckpointManager.open(directory)
+        checkpoint = manager.load(version)
+        self._apply_metadata(checkpoint['metadata'])
+        self.preprocessing = PreprocessingPipeline.from_dict(checkpoint['preprocessing']) \
+            if checkpoint['preprocessing'] is not None else None
+        # Confidence is calibrated after training, so checkpoints never carry it
+        self.confidence = None
+        self.model = self._build_model()
+        self.model.set_weights(checkpoint['weights'])
+        logger.info(f"Restored checkpoint v{checkpoint['version']:04d} (epoch {checkpoint['epoch']}) from {directory}")
+        return {key: value for key, value in checkpoint.items() if key != 'weights'}
+
     def get_model_info(self):
         """Get model information"""
         return {
@@ -0,0 +1,235 @@
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+from sklearn.base import is_classifier
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ReplayBuffer:
+    """Fixed-capacity reservoir of labeled samples used to rehearse old data"""
+
+    def __init__(self, capacity: int, input_dim: int, seed: Optional[int] = None):
+        self.capacity = capacity
+        self.X = np.empty((capacity, input_dim), dtype=np.float32)
+        self.y = np.empty(capacity, dtype=np.float32)
+        self.size = 0
+        self.seen = 0
+        self.rng = np.random.default_rng(seed)
+
+    def add(self, X: np.ndarray, y: np.ndarray):
+        """Reservoir sampling, so the buffer stays a uniform sample of everything seen"""
+        X = np.asarray(X, dtype=np.float32)
+        y = np.asarray(y, dtype=np.float32).reshape(-1)
+
+        free = min(self.capacity - self.size, len(X))
+        if free > 0:
+            self.X[self.size:self.size + free] = X[:free]
+            self.y[self.size:self.size + free] = y[:free]
+            self.size += free
+
+        rest = len(X) - free
+        if rest > 0:
+            positions = self.seen + free + np.arange(rest)
+            slots = (self.rng.random(rest) * (positions + 1)).astype(np.int64)
+            keep = slots < self.capacity
+            self.X[slots[keep]] = X[free:][keep]
+            self.y[slots[keep]] = y[free:][keep]
+
+        self.seen += len(X)
+
+    def sample(self, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        if self.size == 0 or n <= 0:
+            return self.X[:0], self.y[:0]
+        idx = self.rng.integers(0, self.size, min(n, self.size))
+        return self.X[idx], self.y[idx]
+
+    def __len__(self) -> int:
+        return self.size
+
+
+class IncrementalTrainer:
+    """Applies mini-batches of newly labeled outcomes to a trained model.
+
+    sklearn estimators must implement ``partial_fit`` and are updated in
+    place; AIModel (Keras) models are warm-start fine-tuned on the new batch
+    mixed with samples from a replay buffer. Every update writes a new
+    versioned artifact that InferenceModel can load directly, and records
+    refresh latency plus prequential accuracy (scored on each batch before
+    learning from it) to track drift.
+    """
+
+    def __init__(self, model, output_dir: str = 'models/online', input_dim: Optional[int] = None,
+                 classes: Optional[List[Any]] = None, min_batch_size: int = 32, replay_capacity: int = 50000,
+                 replay_ratio: float = 1.0, fine_tune_epochs: int = 2, batch_size: int = 32, seed: int = 42):
+        self.model = model
+        self.is_keras = hasattr(model, 'model') and hasattr(model, 'save_model')
+        if not self.is_keras and not hasattr(model, 'partial_fit'):
+            raise ValueError(f"{type(model).__name__} does not support partial_fit")
+
+        self.output_dir = output_dir
+        self.input_dim = input_dim or (model.input_dim if self.is_keras else model.n_features_in_)
+        self.classes = classes
+        self.min_batch_size = min_batch_size
+        self.replay = ReplayBuffer(replay_capacity, self.input_dim, seed)
+        self.replay_ratio = replay_ratio
+        self.fine_tune_epochs = fine_tune_epochs
+        self.batch_size = batch_size
+
+        self._pending_X: List[List[float]] = []
+        self._pending_y: List[float] = []
+        self.updates: List[Dict[str, Any]] = []
+        self.baseline_score: Optional[float] = None
+        self.version = self._load_manifest_version()
+
+    def _load_manifest_version(self) -> int:
+        manifest_path = os.path.join(self.output_dir, 'manifest.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+            self.updates = manifest.get('updates', [])
+            self.baseline_score = manifest.get('baseline_score')
+            return manifest.get('latest_version', 0)
+        return 0
+
+    @property
+    def is_classifier(self) -> bool:
+        if self.is_keras:
+            return self.model.model_type == 'classification'
+        # predict_proba is no test: hinge-loss SGDClassifier has none
+        if hasattr(self.model, '__sklearn_tags__'):
+            return is_classifier(self.model)
+        # Duck-typed partial_fit wrappers carry no sklearn tags, and
+        # is_classifier raises on them in recent sklearn
+        if getattr(self.model, '_estimator_type', None) is not None:
+            return self.model._estimator_type == 'classifier'
+        return hasattr(self.model, 'classes_')
+
+    def add_outcome(self, input_data: List[float], label: float) -> Optional[Dict[str, Any]]:
+        """Queue a fulfilled prediction's input with its ground truth; updates once a mini-batch is ready"""
+        self._pending_X.append(list(input_data))
+        self._pending_y.append(label)
+        if len(self._pending_y) >= self.min_batch_size:
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        """Apply any queued outcomes as one update"""
+        if not self._pending_y:
+            return None
+        X, y = np.array(self._pending_X, dtype=np.float32), np.array(self._pending_y, dtype=np.float32)
+        self._pending_X, self._pending_y = [], []
+        return self.update(X, y)
+
+    def _score(self, X: np.ndarray, y: np.ndarray) -> float:
+        """Accuracy for classifiers, negative MAE for regressors (higher is better)"""
+        if self.is_keras:
+            predictions = self.model.model.predict(self.model._transform(X), verbose=0).reshape(len(X), -1)
+            if self.is_classifier:
+                labels = (predictions[:, 0] > 0.5) if predictions.shape[1] == 1 else predictions.argmax(axis=1)
+                return float(np.mean(labels == y))
+            return float(-np.mean(np.abs(predictions[:, 0] - y)))
+
+        predictions = self.model.predict(X)
+        if self.is_classifier:
+            return float(np.mean(predictions == y))
+        return float(-np.mean(np.abs(predictions - y)))
+
+    def update(self, X_new, y_new) -> Dict[str, Any]:
+        """Learn from a labeled mini-batch and publish a new versioned artifact"""
+        X_new = np.asarray(X_new, dtype=np.float32).reshape(-1, self.input_dim)
+        y_new = np.asarray(y_new, dtype=np.float32).reshape(-1)
+        start = time.perf_counter()
+
+        # Prequential evaluation: score on data the model has not learned from yet
+        score_before = self._score(X_new, y_new)
+        if self.baseline_score is None:
+            self.baseline_score = score_before
+
+        replay_X, replay_y = self.replay.sample(int(len(X_new) * self.replay_ratio))
+        X_fit = np.concatenate([X_new, replay_X])
+        y_fit = np.concatenate([y_new, replay_y])
+
+        if self.is_keras:
+            self.model.model.fit(self.model._transform(X_fit), y_fit, epochs=self.fine_tune_epochs,
+                                 batch_size=self.batch_size, shuffle=True, verbose=0)
+        else:
+            kwargs = {}
+            if self.is_classifier and not hasattr(self.model, 'classes_'):
+                kwargs['classes'] = self.classes if self.classes is not None else np.unique(y_fit)
+            # sklearn keeps the dtype it was first fitted with (float64 by default)
+            self.model.partial_fit(X_fit.astype(np.float64), y_fit, **kwargs)
+
+        self.replay.add(X_new, y_new)
+        train_seconds = time.perf_counter() - start
+
+        artifact_path = self._save_version()
+        refresh_seconds = time.perf_counter() - start
+
+        record = {
+            'version': self.version,
+            'artifact': artifact_path,
+            'samples': int(len(X_new)),
+            'replay_samples': int(len(replay_X)),
+            'train_seconds': round(train_seconds, 4),
+            'refresh_seconds': round(refresh_seconds, 4),
+            'score_before_update': score_before,
+            'drift': round(self.baseline_score - score_before, 4),
+            'timestamp': datetime.now().isoformat()
+        }
+        self.updates.append(record)
+        self._write_manifest()
+
+        logger.info(f"Model updated to v{self.version:04d} on {len(X_new)} sample(s) in {refresh_seconds:.2f}s "
+                    f"(score {score_before:.3f}, drift {record['drift']:+.3f})")
+        return record
+
+    def _save_version(self) -> str:
+        """Write the model into a new vNNNN directory in the InferenceModel format"""
+        self.version += 1
+        version_dir = os.path.join(self.output_dir, f"v{self.version:04d}")
+        os.makedirs(version_dir, exist_ok=True)
+
+        if self.is_keras:
+            major, minor, _ = self.model.version.split('.')
+            self.model.version = f"{major}.{minor}.{self.version}"
+            artifact_path = os.path.join(version_dir, 'model.h5')
+            self.model.save_model(artifact_path)
+        else:
+            artifact_path = os.path.join(version_dir, 'model.pkl')
+            joblib.dump(self.model, artifact_path)
+        return artifact_path
+
+    def _write_manifest(self):
+        manifest = {
+            'latest_version': self.version,
+            'latest_artifact': self.updates[-1]['artifact'] if self.updates else None,
+            'model_type': 'tensorflow' if self.is_keras else 'sklearn',
+            'baseline_score': self.baseline_score,
+            'updates': self.updates
+        }
+        manifest_path = os.path.join(self.output_dir, 'manifest.json')
+        with open(manifest_path + '.tmp', 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(manifest_path + '.tmp', manifest_path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Refresh latency and drift summary"""
+        latencies = [u['refresh_seconds'] for u in self.updates]
+        return {
+            'version': self.version,
+            'updates': len(self.updates),
+            'replay_size': len(self.replay),
+            'pending_outcomes': len(self._pending_y),
+            'mean_refresh_seconds': float(np.mean(latencies)) if latencies else 0.0,
+            'max_refresh_seconds': float(np.max(latencies)) if latencies else 0.0,
+            'baseline_score': self.baseline_score,
+            'latest_drift': self.updates[-1]['drift'] if self.updates else 0.0
+        }
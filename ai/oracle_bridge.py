@@ -2,11 +2,13 @@ import asyncio
 import json
 import logging
 from web3 import Web3
+from web3.exceptions import TransactionNotFound
 from eth_account import Account
 import numpy as np
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Optional, Tuple
 import os
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
@@ -18,7 +20,17 @@ load_dotenv()
 project_root = Path(__file__).parent.parent.parent
 sys.path.append(str(project_root))
 
+from src.ai.cluster import ClusterCoordinator, LeaseLost
 from src.ai.inference import InferenceModel
+from src.ai.log_decoder import EventSchema, LogDecoder, schemas_from_abi
+from src.ai.lookup_table import LookupTable
+from src.ai.replay import ShadowEvaluator
+from src.ai.scheduler import PriorityScheduler, request_deadline
+from src.ai.profiler import SamplingProfiler
+from src.ai.sender_pool import SenderPool, load_sender_keys
+from src.ai.speculative import SpeculativeExecutor
+from src.ai.tx_signer import TransactionSigner
+from src.ai.work_queue import WorkQueue
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,15 +38,34 @@ logger = logging.getLogger(__name__)
 class AIOraculeBridge:
     """Bridge service connecting AI models to blockchain oracle"""
     
-    def __init__(self, config_path: str = "config.json"):
-        self.config = self._load_config(config_path)
-        self.w3 = self._setup_web3()
+    def __init__(self, config_path: str = "config.json", config: Optional[Dict[str, Any]] = None,
+                 w3: Optional[Web3] = None):
+        self.config = config if config is not None else self._load_config(config_path)
+        self.w3 = w3 if w3 is not None else self._setup_web3()
         self.account = self._setup_account()
         self.oracle_contract = self._setup_oracle_contract()
+        self.request_logs = self._setup_request_logs()
         self.ai_model = InferenceModel(
             self.config['model']['path'], 
-            self.config['model']['type']
+            self.config['model']['type'],
+            quantized=self.config['model'].get('quantized', False),
+            tf_serving=self.config['model'].get('tf_serving'),
+            shared_cache=self.config['model'].get('shared_cache')
         )
+        self.lookup_table = self._setup_lookup_table()
+        self.shadow = ShadowEvaluator.from_config(self.config.get('shadow', {}))
+        self.profiler = SamplingProfiler.from_config(self.config.get('profiler', {}))
+        self.sender_pool = self._setup_sender_pool()
+        self.signer = self._setup_signer() if self.sender_pool is None else None
+        self.cluster = self._setup_cluster()
+        self._acquired_partitions: Dict[int, int] = {}
+        # Cluster mode: request id -> (partition, block) of requests seen but not yet fulfilled
+        self._unfinished: Dict[bytes, Tuple[int, int]] = {}
+        self.lease_lost_skips = 0
+        self.queue = self._setup_queue()
+        self.scheduler = self._setup_scheduler()
+        self.speculative = self._setup_speculative()
+        self._queue_ready: Optional[asyncio.Event] = None
         self.is_running = False
         
     def _load_config(self, config_path: str) -> Dict[str, Any]:
@@ -72,11 +103,72 @@ class AIOraculeBridge:
     
     def _setup_account(self) -> Account:
         """Setup blockchain account"""
-        private_key = os.getenv('ORACLE_PRIVATE_KEY')
+        sender_keys = load_sender_keys()
+        private_key = os.getenv('ORACLE_PRIVATE_KEY') or (sender_keys[0] if sender_keys else None)
         if not private_key:
             raise ValueError("ORACLE_PRIVATE_KEY environment variable not set")
         return Account.from_key(private_key)
     
+    def _setup_lookup_table(self) -> Optional[LookupTable]:
+        """Precomputed answers for a quantized input domain, built (or loaded) at start-up"""
+        lookup_config = self.config.get('lookup_table', {})
+        if not lookup_config.get('enabled'):
+            return None
+        return LookupTable.from_config(lookup_config, self.ai_model)
+    
+    def _setup_signer(self) -> Optional[TransactionSigner]:
+        """Pool-based signer when configured; otherwise transactions are signed inline"""
+        signer_config = self.config['bridge'].get('signer')
+        if not signer_config:
+            return None
+        return TransactionSigner.from_config(self.w3, bytes(self.account.key), signer_config)
+    
+    def _setup_sender_pool(self) -> Optional[SenderPool]:
+        """Shard fulfillments across ORACLE_PRIVATE_KEYS when more than one fulfiller is configured"""
+        if not os.getenv('ORACLE_PRIVATE_KEYS'):
+            return None
+        return SenderPool.from_config(self.w3, load_sender_keys(), self.config['bridge'].get('signer') or {})
+    
+    def _signer_for(self, request_id: bytes) -> Optional[TransactionSigner]:
+        if self.sender_pool is not None:
+            return self.sender_pool.signer_for(request_id)
+        return self.signer
+    
+    def _setup_cluster(self) -> Optional[ClusterCoordinator]:
+        """Cluster mode: split the request stream with peers sharing the coordination store"""
+        cluster_config = self.config.get('cluster', {})
+        if not cluster_config.get('enabled'):
+            return None
+        return ClusterCoordinator.from_config(cluster_config)
+    
+    def _setup_queue(self) -> Optional[WorkQueue]:
+        """Durable queue between the block scanner and fulfillment workers"""
+        queue_config = self.config.get('queue', {})
+        if not queue_config.get('enabled'):
+            return None
+        return WorkQueue.from_config(queue_config)
+    
+    def _setup_scheduler(self) -> Optional[PriorityScheduler]:
+        """In-memory fee/age/deadline ordering of requests, with load shedding"""
+        scheduler = PriorityScheduler.from_config(self.config.get('scheduler', {}))
+        if scheduler is not None and self.queue is not None:
+            logger.warning("The work queue is enabled; requests are taken in queue order and the scheduler is unused")
+            return None
+        if scheduler is not None:
+            # Shedding is final; don't hold the partition checkpoint behind it
+            scheduler.on_shed = lambda job: self._finish(job['request_id'])
+        return scheduler
+    
+    def _setup_speculative(self) -> Optional[SpeculativeExecutor]:
+        """Predict for requestPrediction transactions while they are still pending"""
+        speculative_config = self.config.get('speculative', {})
+        if speculative_config.get('enabled') and not self.config['blockchain'].get('ai_contract_address'):
+            raise ValueError("Speculative execution needs blockchain.ai_contract_address")
+        return SpeculativeExecutor.from_config(
+            speculative_config, self.w3, self.config['blockchain'].get('ai_contract_address'),
+            self.oracle_contract.address, self.request_logs, self._predict
+        )
+    
     def _setup_oracle_contract(self):
         """Setup oracle contract instance"""
         contract_address = self.config['blockchain']['oracle_address']
@@ -86,6 +178,16 @@ class AIOraculeBridge:
             abi=contract_abi
         )
     
+    def _setup_request_logs(self) -> LogDecoder:
+        """Raw-log decoder for AIOracle's PredictionRequested(bytes32 indexed requestId, bytes inputData)"""
+        schema = schemas_from_abi(self.config['blockchain']['oracle_abi']).get('PredictionRequested')
+        if schema is None:
+            schema = EventSchema('PredictionRequested', [
+                {'name': 'requestId', 'type': 'bytes32', 'indexed': True},
+                {'name': 'inputData', 'type': 'bytes', 'indexed': False}
+            ])
+        return LogDecoder([schema])
+    
     async def start_listening(self):
         """Start listening for prediction requests"""
         logger.info("Starting AI Oracle Bridge...")
@@ -94,33 +196,226 @@ class AIOraculeBridge:
         # Get the latest block to start from
         last_processed_block = self.w3.eth.block_number
         
-        while self.is_running:
-            try:
-                # Get current block
-                current_block = self.w3.eth.block_number
-                
-                # Only process if there are new blocks
-                if current_block > last_processed_block:
-                    await self._process_new_requests(last_processed_block + 1, current_block)
-                    last_processed_block = current_block
-                    logger.info(f"Processed blocks {last_processed_block + 1} to {current_block}")
-                
-                # Wait before next poll
-                await asyncio.sleep(self.config['bridge']['poll_interval'])                  except Exception as e:
-                logger.error(f"Error in main loop: {e}")
-                await asyncio.sleep(self.config['bridge']['poll_interval'])
+        await self._start_profiler()
+        if self.sender_pool is not None:
+            await self.sender_pool.start()
+        elif self.signer is not None:
+            await self.signer.start()
+        
+        if self.cluster is not None:
+            self._queue_takeovers(self.cluster.refresh())
+            # Leases are renewed off the loop, so blocking RPC calls here can't let them lapse
+            loop = asyncio.get_running_loop()
+            self.cluster.start_heartbeat(lambda acquired: loop.call_soon_threadsafe(self._queue_takeovers, acquired))
+        
+        workers = []
+        if self.speculative is not None:
+            workers.append(asyncio.create_task(self.speculative.run(
+                self._release_speculative, self.config['speculative'].get('poll_interval', 0.25)
+            )))
+        if self.queue is not None:
+            last_processed_block = self._resume_queue(last_processed_block)
+            # Inline signing reads the nonce from the node, so it can't run concurrently
+            pooled = self.signer is not None or self.sender_pool is not None
+            concurrency = self.config['queue'].get('workers', 4) if pooled else 1
+            self._queue_ready = asyncio.Event()
+            workers += [asyncio.create_task(self._queue_worker()) for _ in range(concurrency)]
+        elif self.scheduler is not None:
+            # Inline signing reads the nonce from the node, so it can't run concurrently
+            pooled = self.signer is not None or self.sender_pool is not None
+            concurrency = self.scheduler.max_in_flight if pooled else 1
+            workers += [asyncio.create_task(self._scheduler_worker()) for _ in range(concurrency)]
+        
+        try:
+            while self.is_running:
+                try:
+                    # Replay partitions taken over from a peer before moving on
+                    if self._acquired_partitions:
+                        await self._take_over_partitions(last_processed_block)
+                    
+                    # Get current block
+                    current_block = self.w3.eth.block_number
+                    
+                    # Only process if there are new blocks; a range is only skipped past
+                    # once its requests were handled (or queued)
+                    if current_block > last_processed_block and \
+                            await self._process_new_requests(last_processed_block + 1, current_block):
+                        last_processed_block = current_block
+                        logger.info(f"Processed blocks {last_processed_block + 1} to {current_block}")
+                    
+                    # Wait before next poll
+                    await asyncio.sleep(self.config['bridge']['poll_interval'])
+                    
+                except Exception as e:
+                    logger.error(f"Error in main loop: {e}")
+                    await asyncio.sleep(self.config['bridge']['poll_interval'])
+        finally:
+            if self.cluster is not None:
+                self.cluster.stop_heartbeat()
+            for worker in workers:
+                worker.cancel()
+            if self.sender_pool is not None:
+                await self.sender_pool.close()
+            elif self.signer is not None:
+                await self.signer.close()
+    
+    async def _start_profiler(self):
+        """Attach the sampling profiler to this loop and expose its triggers"""
+        profiler_config = self.config.get('profiler', {})
+        self.profiler.attach_loop()
+        self.profiler.install_signal_handler()
+        
+        if profiler_config.get('admin_port'):
+            self.profiler_server = await self.profiler.start_admin_server(
+                profiler_config.get('admin_host', '127.0.0.1'), profiler_config['admin_port']
+            )
+    
+    async def _lease_held(self, request_id: bytes) -> bool:
+        """Wait for a lease that is about to run out to be renewed; False once the partition is lost"""
+        deadline = time.monotonic() + self.cluster.lease_seconds
+        while not self.cluster.holds(request_id):
+            if not self.cluster.owns(request_id) or time.monotonic() > deadline:
+                return False
+            await asyncio.sleep(self.cluster.heartbeat_interval / 4)
+        return True
+    
+    def _track(self, request_id: bytes, block_number: Optional[int]):
+        """Hold the request's partition checkpoint behind it until it is fulfilled (cluster mode)"""
+        if self.cluster is not None and block_number is not None:
+            self._unfinished.setdefault(bytes(request_id), (self.cluster.partition_of(request_id), block_number))
+    
+    def _finish(self, request_id: bytes):
+        """The request is fulfilled, or will never be; its partition checkpoint may move past it"""
+        self._unfinished.pop(bytes(request_id), None)
+    
+    def _checkpoint(self, to_block: int, partitions: Iterable[int]):
+        """Checkpoint partitions up to `to_block`, but never past a request this node has yet to fulfill.
+
+        A request that failed without being retried keeps its partition's
+        checkpoint behind it, so whichever node takes the partition over next
+        replays it.
+        """
+        owned = self.cluster.owned
+        # Requests in partitions a peer took over are replayed by that peer
+        self._unfinished = {rid: entry for rid, entry in self._unfinished.items() if entry[0] in owned}
+        held: Dict[int, int] = {}
+        for partition, block in self._unfinished.values():
+            held[partition] = min(held.get(partition, block), block)
+        by_block: Dict[int, list] = {}
+        for partition in partitions:
+            block = min(to_block, held[partition] - 1) if partition in held else to_block
+            by_block.setdefault(block, []).append(partition)
+        for block, group in by_block.items():
+            self.cluster.checkpoint(block, group)
+    
+    def _queue_takeovers(self, acquired: Dict[int, Optional[int]]):
+        # Partitions nobody has processed yet (no checkpoint) have nothing to replay
+        self._acquired_partitions.update({p: block for p, block in acquired.items() if block is not None})
+    
+    async def _take_over_partitions(self, to_block: int):
+        """Replay acquired partitions from their previous owner's checkpoint"""
+        acquired, self._acquired_partitions = self._acquired_partitions, {}
+        from_block = min(acquired.values()) + 1
+        if from_block <= to_block:
+            events = [
+                event for event in self._get_request_logs(from_block, to_block)
+                if event['blockNumber'] > acquired.get(self.cluster.partition_of(event['args']['requestId']), to_block)
+            ]
+            logger.info(f"Taking over {len(acquired)} partition(s): replaying {len(events)} request(s) "
+                        f"from block {from_block}")
+            await self._handle_events(events)
+        self._checkpoint(to_block, acquired.keys())
+    
+    def _resume_queue(self, latest_block: int) -> int:
+        """Release leases from a previous run and resume scanning from the queue's cursor"""
+        recovered = self.queue.recover()
+        for request_id, block_number in self.queue.unfinished():
+            self._track(request_id, block_number)
+        cursor = self.queue.cursor
+        if recovered:
+            logger.info(f"Recovered {recovered} in-flight request(s) from the work queue")
+        if cursor is not None and cursor < latest_block:
+            logger.info(f"Resuming from block {cursor + 1} ({latest_block - cursor} block(s) behind)")
+            return cursor
+        return latest_block
+    
+    def _get_request_logs(self, from_block: int, to_block: int):
+        """PredictionRequested events in a block range, decoded straight from the raw logs"""
+        return self.request_logs.get_logs(self.w3, self.oracle_contract.address, from_block, to_block)
+    
+    async def _handle_events(self, events, to_block: Optional[int] = None):
+        if self.speculative is not None:
+            # Requests already fulfilled from a speculative prediction
+            events = self.speculative.unreleased(events)
+        for event in events:
+            self._track(event['args']['requestId'], event['blockNumber'])
+        if self.queue is not None:
+            # Durable before the scanner moves on; workers pick them up at their own pace
+            added = self.queue.enqueue_many(
+                ((event['args']['requestId'], event['args']['inputData'], event['blockNumber']) for event in events),
+                cursor=to_block
+            )
+            if added:
+                self._queue_ready.set()
+        elif self.scheduler is not None:
+            await self._schedule(events)
+        elif self.signer is not None or self.sender_pool is not None:
+            # Predictions run back to back while earlier ones are signed and sent
+            await asyncio.gather(*(self._handle_prediction_request(event) for event in events))
+        else:
+            for event in events:
+                await self._handle_prediction_request(event)
+    
+    async def _schedule(self, events):
+        """Rank requests by the fee paid in their transaction and their block time"""
+        fees: Dict[bytes, int] = {}
+        timestamps: Dict[int, int] = {}
+        for event in events:
+            tx_hash = event['transactionHash']
+            if tx_hash not in fees:
+                fees[tx_hash] = self.w3.eth.get_transaction(tx_hash)['value']
+            if event['blockNumber'] not in timestamps:
+                timestamps[event['blockNumber']] = self.w3.eth.get_block(event['blockNumber'])['timestamp']
+            await self.scheduler.put(
+                event['args']['requestId'], event['args']['inputData'],
+                fee=fees[tx_hash],
+                requested_at=timestamps[event['blockNumber']],
+                deadline=request_deadline(event['args']['inputData'])
+            )
+    
+    async def _release_speculative(self, event, result):
+        """Submit a prediction computed while the request was pending, as soon as it is mined"""
+        request_id = event['args']['requestId']
+        if self.cluster is not None and self.cluster.partition_of(request_id) not in self.cluster.owned:
+            self.speculative.forget(request_id)
+            return
+        self._track(request_id, event['blockNumber'])
+        try:
+            with self.profiler.trace(request_id.hex()):
+                await self._submit_prediction(request_id, *result)
+        except Exception as e:
+            logger.error(f"Speculative fulfillment of {request_id.hex()} failed, handing it back: {e}")
+            self.speculative.forget(request_id)
+            await self._handle_events([event])
     
     async def _process_new_requests(self, from_block: int, to_block: int):
         """Process new prediction requests from the blockchain"""
         try:
             # Get PredictionRequested events using getLogs directly
-            event_filter = self.oracle_contract.events.PredictionRequested.get_logs(
-                from_block=from_block,
-                to_block=to_block
-            )
+            event_filter = self._get_request_logs(from_block, to_block)
             
-            for event in event_filter:
-                await self._handle_prediction_request(event)
+            if self.cluster is not None:
+                # Only this node's partitions; checkpoint just the ones it owned throughout
+                owned = set(self.cluster.owned)
+                event_filter = [
+                    event for event in event_filter
+                    if self.cluster.partition_of(event['args']['requestId']) in owned
+                ]
+                await self._handle_events(event_filter, to_block)
+                self._checkpoint(to_block, owned & self.cluster.owned)
+            else:
+                await self._handle_events(event_filter, to_block)
+            return True
                 
         except Exception as e:
             error_msg = str(e)
@@ -130,28 +425,32 @@ class AIOraculeBridge:
             if 'limit exceeded' in error_msg or 'rate limit' in error_msg.lower():
                 logger.warning("Rate limit exceeded, waiting 60 seconds...")
                 await asyncio.sleep(60)
+            return False
     
     async def _handle_prediction_request(self, event):
         """Handle a single prediction request"""
+        with self.profiler.trace(event['args']['requestId'].hex()):
+            await self._fulfill_request(event)
+    
+    async def _fulfill_request(self, event):
+        """Predict for a request and submit the result"""
         try:
             request_id = event['args']['requestId']
-            input_data = event['args']['inputData']
             
             logger.info(f"Processing prediction request: {request_id.hex()}")
             
-            # Decode input data (assuming it's JSON encoded)
-            try:
-                decoded_input = json.loads(input_data.decode('utf-8'))
-            except:
-                # Fallback: treat as raw bytes and convert to float list
-                decoded_input = list(input_data)
-            
-            # Make prediction using AI model
-            prediction, confidence = self.ai_model.predict_with_confidence(decoded_input)
+            # A peer may have fulfilled it before handing the partition over
+            if self.cluster is not None and not self.oracle_contract.functions.isRequestPending(request_id).call():
+                logger.info(f"Request {request_id.hex()} already fulfilled, skipping")
+                self._finish(request_id)
+                return
             
-            # Convert prediction to integer (scaled by 1000 for precision)
-            prediction_int = int(prediction[0] * 1000)
-            confidence_int = int(confidence)
+            try:
+                prediction_int, confidence_int = self._predict(event['args']['inputData'], request_id)
+            except Exception:
+                # Unprocessable input; no retry will change that
+                self._finish(request_id)
+                raise
             
             # Submit prediction to blockchain
             await self._submit_prediction(request_id, prediction_int, confidence_int)
@@ -159,45 +458,168 @@ class AIOraculeBridge:
         except Exception as e:
             logger.error(f"Error handling prediction request: {e}")
     
-    async def _submit_prediction(self, request_id: bytes, prediction: int, confidence: int):
-        """Submit prediction to the oracle contract"""
+    def _predict(self, input_data: bytes, request_id: Optional[bytes] = None):
+        """Decode request input and return the (prediction, confidence) integers sent on chain"""
+        # Decode input data (assuming it's JSON encoded)
         try:
+            decoded_input = json.loads(input_data.decode('utf-8'))
+            if isinstance(decoded_input, dict):
+                # {"input": [...], "deadline": ...} envelope; the deadline is the scheduler's business
+                decoded_input = decoded_input['input']
+        except:
+            # Fallback: treat as raw bytes and convert to float list
+            decoded_input = list(input_data)
+        
+        # Grid inputs are answered by index; everything else goes to the model
+        result = self.lookup_table.lookup(decoded_input) if self.lookup_table is not None else None
+        if result is None:
+            # Make prediction using AI model, as integers (prediction scaled by 1000 for precision)
+            result = self.ai_model.predict_scaled(decoded_input)
+        
+        if self.shadow is not None:
+            # Candidates score the same input off the request path; nothing they return is submitted
+            self.shadow.submit(decoded_input, result, request_id)
+        return result
+    
+    async def _queue_worker(self):
+        """Lease jobs from the work queue until cancelled"""
+        poll_interval = self.config['queue'].get('poll_interval', 1.0)
+        while True:
+            jobs = self.queue.dequeue()
+            if not jobs:
+                # Woken by the scanner, or by the poll for retries coming due
+                self._queue_ready.clear()
+                try:
+                    await asyncio.wait_for(self._queue_ready.wait(), poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            with self.profiler.trace(jobs[0]['request_id'].hex()):
+                await self._run_job(jobs[0])
+    
+    async def _scheduler_worker(self):
+        """Fulfill requests in scheduler order until cancelled"""
+        while True:
+            job = await self.scheduler.get()
+            success = False
+            try:
+                with self.profiler.trace(job['request_id'].hex()):
+                    prediction_int, confidence_int = self._predict(job['input_data'], job['request_id'])
+                    await self._submit_prediction(job['request_id'], prediction_int, confidence_int)
+                success = True
+            except Exception as e:
+                logger.error(f"Error handling prediction request {job['request_id'].hex()}: {e}")
+            finally:
+                await self.scheduler.done(job, success)
+    
+    async def _run_job(self, job: Dict[str, Any]):
+        """Fulfill one queued request; ack only once the fulfillment is confirmed on chain"""
+        request_id = job['request_id']
+        logger.info(f"Processing prediction request: {request_id.hex()} (attempt {job['attempts']})")
+        try:
+            # An earlier attempt may have landed even though its receipt never arrived
+            if not self.oracle_contract.functions.isRequestPending(request_id).call():
+                logger.info(f"Request {request_id.hex()} no longer pending, acking")
+                self.queue.ack(request_id)
+                self._finish(request_id)
+                return
+        except Exception as e:
+            self.queue.retry(request_id, str(e))
+            return
+        
+        try:
+            prediction_int, confidence_int = self._predict(job['input_data'], request_id)
+        except Exception as e:
+            # The model rejects this input; retrying won't change that
+            self.queue.dead_letter(request_id, f"Unprocessable input: {e}")
+            self._finish(request_id)
+            return
+        
+        try:
+            await self._submit_prediction(request_id, prediction_int, confidence_int)
+        except LeaseLost as e:
+            if self.cluster.owns(request_id):
+                # The lease ran low but no peer has claimed the partition; try again once it is renewed
+                self.queue.retry(request_id, str(e))
+            else:
+                # The new owner replays it: the partition checkpoint was held behind this job
+                logger.info(f"Handing {request_id.hex()} over with its partition")
+                self.queue.ack(request_id)
+                self._finish(request_id)
+            return
+        except Exception as e:
+            if not self.queue.retry(request_id, str(e)):
+                self._finish(request_id)
+            return
+        self.queue.ack(request_id)
+    
+    async def _submit_prediction(self, request_id: bytes, prediction: int, confidence: int):
+        """Submit prediction to the oracle contract; raises unless the transaction succeeds"""
+        # Build transaction
+        function = self.oracle_contract.functions.fulfillPrediction(
+            request_id, prediction, confidence
+        )
+        
+        signer = self._signer_for(request_id)
+        sender = signer.address if signer is not None else self.account.address
+        
+        # Estimate gas
+        gas_estimate = function.estimate_gas({'from': sender})
+        
+        tx_params = {
+            'from': sender,
+            'gas': min(gas_estimate * 2, self.config['bridge']['gas_limit']),
+            'gasPrice': self.config['bridge']['gas_price'],
+            'chainId': self.config['blockchain']['chain_id']
+        }
+        
+        # A peer may claim the partition once our lease lapses; it replays the request from its checkpoint
+        if self.cluster is not None and not await self._lease_held(request_id):
+            self.lease_lost_skips += 1
+            raise LeaseLost(f"Lease on the partition of {request_id.hex()} lost before submitting")
+        
+        if signer is not None:
+            # The signer assigns the nonce, signs in its pool and sends in nonce order
+            tx_hash = await signer.submit(function.build_transaction(tx_params))
+            receipt = await self._wait_for_receipt(tx_hash)
+        else:
             # Build transaction
-            function = self.oracle_contract.functions.fulfillPrediction(
-                request_id, prediction, confidence
-            )
-            
-            # Estimate gas
-            gas_estimate = function.estimateGas({'from': self.account.address})
-            
-            # Build transaction
-            transaction = function.buildTransaction({
-                'from': self.account.address,
-                'gas': min(gas_estimate * 2, self.config['bridge']['gas_limit']),
-                'gasPrice': self.config['bridge']['gas_price'],
-                'nonce': self.w3.eth.get_transaction_count(self.account.address),
-                'chainId': self.config['blockchain']['chain_id']
-            })
+            tx_params['nonce'] = self.w3.eth.get_transaction_count(self.account.address)
+            transaction = function.build_transaction(tx_params)
             
             # Sign and send transaction
             signed_txn = self.w3.eth.account.sign_transaction(transaction, self.account.key)
-            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.rawTransaction)
+            tx_hash = self.w3.eth.send_raw_transaction(signed_txn.raw_transaction)
             
             # Wait for confirmation
             receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
-            
-            if receipt.status == 1:
-                logger.info(f"Prediction submitted successfully: {tx_hash.hex()}")
-            else:
-                logger.error(f"Transaction failed: {tx_hash.hex()}")
-                
-        except Exception as e:
-            logger.error(f"Error submitting prediction: {e}")
+        
+        if receipt.status != 1:
+            raise RuntimeError(f"Transaction failed: {tx_hash.hex()}")
+        self._finish(request_id)
+        logger.info(f"Prediction submitted successfully: {tx_hash.hex()}")
+    
+    async def _wait_for_receipt(self, tx_hash: bytes, timeout: float = 120):
+        """Poll for a receipt without blocking other in-flight requests"""
+        poll_interval = self.config['bridge'].get('receipt_poll_interval', 0.5)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self.w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Transaction {tx_hash.hex()} not mined after {timeout}s")
+                await asyncio.sleep(poll_interval)
     
     def stop_listening(self):
         """Stop the bridge service"""
         logger.info("Stopping AI Oracle Bridge...")
         self.is_running = False
+        self.profiler.shutdown()
+        if self.cluster is not None:
+            self.cluster.leave()
+        if self.shadow is not None:
+            self.shadow.close()
     
     def get_bridge_stats(self) -> Dict[str, Any]:
         """Get bridge service statistics"""
@@ -208,6 +630,17 @@ class AIOraculeBridge:
             'account_address': self.account.address,
             'account_balance': self.w3.eth.get_balance(self.account.address),
             'model_stats': self.ai_model.get_model_stats(),
+            'lookup_table': self.lookup_table.get_stats() if self.lookup_table is not None else None,
+            'profiler': self.profiler.get_stats(),
+            'signer': self.signer.get_stats() if self.signer is not None else None,
+            'sender_pool': self.sender_pool.get_stats() if self.sender_pool is not None else None,
+            'cluster': dict(self.cluster.get_stats(), lease_lost_skips=self.lease_lost_skips)
+                       if self.cluster is not None else None,
+            'queue': self.queue.get_stats() if self.queue is not None else None,
+            'scheduler': self.scheduler.get_stats() if self.scheduler is not None else None,
+            'log_decoder': self.request_logs.get_stats(),
+            'shadow': self.shadow.get_stats() if self.shadow is not None else None,
+            'speculative': self.speculative.get_stats() if self.speculative is not None else None,
             'timestamp': datetime.now().isoformat()
         }
 
@@ -0,0 +1,265 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DERIVED_KINDS = ('ratio', 'product', 'difference')
+
+
+class PreprocessingPipeline:
+    """Declarative feature preprocessing, fitted at training time and shared with serving.
+
+    Steps are plain dicts applied in order, e.g.::
+
+        [{"op": "derive", "kind": "ratio", "columns": [1, 2]},
+         {"op": "log1p", "columns": [1]},
+         {"op": "clip", "quantiles": [0.01, 0.99]},
+         {"op": "standardize"}]
+
+    Supported ops: ``derive`` (ratio/product/difference of two columns,
+    appended as a new column), ``log1p`` (signed, on selected columns),
+    ``clip`` (explicit ``min``/``max`` or fitted ``quantiles``),
+    ``standardize`` and ``minmax``.
+
+    After fitting, runs of clip/affine steps are compiled into a single clip
+    followed by one fused multiply-add, so a batch is transformed with a
+    handful of whole-array NumPy operations and no per-row Python work.
+    """
+
+    def __init__(self, steps: Optional[List[Dict[str, Any]]] = None, input_dim: Optional[int] = None):
+        self.steps = [dict(step) for step in (steps or [])]
+        self.input_dim = input_dim
+        self.params: List[Dict[str, Any]] = []
+        self.is_fitted = False
+        self._stages = []
+
+        for step in self.steps:
+            if step.get('op') not in ('derive', 'log1p', 'clip', 'standardize', 'minmax'):
+                raise ValueError(f"Unsupported preprocessing op: {step.get('op')}")
+            if step['op'] == 'derive' and step.get('kind') not in DERIVED_KINDS:
+                raise ValueError(f"Unsupported derived feature kind: {step.get('kind')}")
+
+    @property
+    def n_derived(self) -> int:
+        return sum(1 for step in self.steps if step['op'] == 'derive')
+
+    def output_dim(self, input_dim: Optional[int] = None) -> int:
+        """Width of transformed rows for a given raw input width"""
+        return (input_dim if input_dim is not None else self.input_dim) + self.n_derived
+
+    @staticmethod
+    def _derive(X: np.ndarray, kind: str, a: int, b: int) -> np.ndarray:
+        if kind == 'ratio':
+            den = X[:, b]
+            return np.divide(X[:, a], den, out=np.zeros_like(den), where=den != 0)
+        if kind == 'product':
+            return X[:, a] * X[:, b]
+        return X[:, a] - X[:, b]
+
+    @staticmethod
+    def _signed_log1p(values: np.ndarray) -> np.ndarray:
+        return np.sign(values) * np.log1p(np.abs(values))
+
+    def fit(self, X) -> 'PreprocessingPipeline':
+        """Fit step parameters sequentially on the training matrix"""
+        X = np.array(X, dtype=np.float32)
+        if X.ndim != 2:
+            raise ValueError("Preprocessing expects a 2D training matrix")
+        self.input_dim = X.shape[1]
+        self.params = []
+
+        for step in self.steps:
+            op = step['op']
+            if op == 'derive':
+                a, b = step['columns']
+                X = np.column_stack([X, self._derive(X, step['kind'], a, b)])
+                self.params.append({})
+            elif op == 'log1p':
+                cols = step.get('columns', list(range(X.shape[1])))
+                X[:, cols] = self._signed_log1p(X[:, cols])
+                self.params.append({'columns': cols})
+            elif op == 'clip':
+                if 'quantiles' in step:
+                    low, high = np.quantile(X, step['quantiles'], axis=0)
+                else:
+                    low = np.full(X.shape[1], step.get('min', -np.inf))
+                    high = np.full(X.shape[1], step.get('max', np.inf))
+                X = np.clip(X, low, high)
+                self.params.append({'low': low.tolist(), 'high': high.tolist()})
+            elif op == 'standardize':
+                mean, std = X.mean(axis=0), X.std(axis=0)
+                std[std == 0] = 1.0
+                X = (X - mean) / std
+                self.params.append({'scale': (1.0 / std).tolist(), 'offset': (-mean / std).tolist()})
+            elif op == 'minmax':
+                low, high = X.min(axis=0), X.max(axis=0)
+                span = high - low
+                span[span == 0] = 1.0
+                X = (X - low) / span
+                self.params.append({'scale': (1.0 / span).tolist(), 'offset': (-low / span).tolist()})
+
+        self.is_fitted = True
+        self._compile()
+        logger.info(f"Preprocessing fitted: {len(self.steps)} step(s), {self.input_dim} -> {X.shape[1]} features")
+        return self
+
+    def _compile(self):
+        """Collapse fitted steps into fused stages.
+
+        Derive and log1p stages run as-is. Consecutive clip/affine steps are
+        folded into one (low, high, scale, offset) stage using
+        clip(a*x + b, lo, hi) == a*clip(x, (lo - b)/a, (hi - b)/a) + b.
+        """
+        stages = []
+        fused = None
+
+        def flush():
+            nonlocal fused
+            if fused is not None:
+                stages.append(('fused', tuple(v.astype(np.float32) for v in fused)))
+                fused = None
+
+        width = self.input_dim
+        for step, params in zip(self.steps, self.params):
+            op = step['op']
+            if op == 'derive':
+                flush()
+                stages.append(('derive', (step['kind'], step['columns'][0], step['columns'][1])))
+                width += 1
+            elif op == 'log1p':
+                flush()
+                stages.append(('log1p', np.asarray(params['columns'], dtype=np.intp)))
+            else:
+                if fused is None:
+                    fused = [np.full(width, -np.inf), np.full(width, np.inf), np.ones(width), np.zeros(width)]
+                low, high, scale, offset = fused
+                if op == 'clip':
+                    # Pull the new bounds back through the pending affine map
+                    lo = (np.asarray(params['low']) - offset) / scale
+                    hi = (np.asarray(params['high']) - offset) / scale
+                    lo, hi = np.minimum(lo, hi), np.maximum(lo, hi)
+                    fused[0], fused[1] = np.maximum(low, lo), np.minimum(high, hi)
+                else:
+                    a, b = np.asarray(params['scale']), np.asarray(params['offset'])
+                    fused[2], fused[3] = scale * a, offset * a + b
+        flush()
+        self._stages = stages
+
+    def transform(self, X) -> np.ndarray:
+        """Apply the compiled pipeline to a whole batch"""
+        X = np.array(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if not self.steps:
+            return X
+        if not self.is_fitted:
+            raise ValueError("Preprocessing pipeline must be fitted before transform")
+
+        for kind, args in self._stages:
+            if kind == 'derive':
+                X = np.column_stack([X, self._derive(X, *args)])
+            elif kind == 'log1p':
+                X[:, args] = self._signed_log1p(X[:, args])
+            else:
+                low, high, scale, offset = args
+                np.clip(X, low, high, out=X)
+                X *= scale
+                X += offset
+        return X
+
+    def fit_transform(self, X) -> np.ndarray:
+        return self.fit(X).transform(X)
+
+    def validate(self, input_batch) -> Tuple[np.ndarray, np.ndarray, Dict[int, str]]:
+        """Vectorized validation of a batch of raw rows.
+
+        Returns (matrix of valid rows, their indices in the batch, errors by
+        row index) so a few bad rows never fail the whole call.
+        """
+        errors: Dict[int, str] = {}
+        try:
+            matrix = np.asarray(input_batch, dtype=np.float32)
+            if matrix.ndim == 1:
+                matrix = matrix.reshape(1, -1)
+            if matrix.ndim != 2:
+                raise ValueError
+        except (ValueError, TypeError):
+            # Ragged or non-numeric batch: keep the rows that convert at the expected width
+            rows = list(input_batch)
+            lengths = np.array([len(r) if isinstance(r, (list, tuple, np.ndarray)) else -1 for r in rows])
+            known = lengths[lengths >= 0]
+            expected = self.input_dim or (int(np.bincount(known).argmax()) if len(known) else 0)
+            row_ok = lengths == expected
+            for i in np.flatnonzero(~row_ok):
+                errors[int(i)] = f"Expected {expected} features, got {lengths[i]}"
+            converted = []
+            for i in np.flatnonzero(row_ok):
+                try:
+                    row = np.asarray(rows[i], dtype=np.float32)
+                except (ValueError, TypeError) as e:
+                    row_ok[i] = False
+                    errors[int(i)] = f"Input is not numeric: {e}"
+                    continue
+                if row.shape != (expected,):
+                    row_ok[i] = False
+                    errors[int(i)] = f"Expected {expected} features, got shape {row.shape}"
+                    continue
+                converted.append(row)
+            matrix = np.array(converted, dtype=np.float32).reshape(-1, expected)
+            row_index = np.flatnonzero(row_ok)
+            finite = np.isfinite(matrix).all(axis=1)
+            for i in row_index[~finite]:
+                errors[int(i)] = "Input contains NaN or infinite values"
+            return matrix[finite], row_index[finite], errors
+
+        if self.input_dim is not None and matrix.shape[1] != self.input_dim:
+            for i in range(len(matrix)):
+                errors[i] = f"Expected {self.input_dim} features, got {matrix.shape[1]}"
+            return matrix[:0], np.empty(0, dtype=np.intp), errors
+
+        finite = np.isfinite(matrix).all(axis=1)
+        for i in np.flatnonzero(~finite):
+            errors[int(i)] = "Input contains NaN or infinite values"
+        return matrix[finite], np.flatnonzero(finite), errors
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'steps': self.steps,
+            'input_dim': self.input_dim,
+            'params': self.params,
+            'is_fitted': self.is_fitted
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PreprocessingPipeline':
+        pipeline = cls(data['steps'], data.get('input_dim'))
+        pipeline.params = data.get('params', [])
+        pipeline.is_fitted = data.get('is_fitted', False)
+        if pipeline.is_fitted:
+            pipeline._compile()
+        return pipeline
+
+    def save(self, filepath: str):
+        """Save the fitted pipeline as JSON"""
+        with open(filepath, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        logger.info(f"Preprocessing pipeline saved to {filepath}")
+
+    @classmethod
+    def load(cls, filepath: str) -> 'PreprocessingPipeline':
+        """Load a pipeline saved with save()"""
+        with open(filepath, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+    @classmethod
+    def coerce(cls, spec) -> Optional['PreprocessingPipeline']:
+        """Accept a pipeline, a list of step dicts, or None"""
+        if spec is None or isinstance(spec, cls):
+            return spec
+        if isinstance(spec, Sequence):
+            return cls(list(spec))
+        raise TypeError(f"Cannot build a preprocessing pipeline from {type(spec).__name__}")
@@ -0,0 +1,325 @@
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _current_task(loop: asyncio.AbstractEventLoop) -> Optional[asyncio.Task]:
+    """The task `loop` is running right now, read from the sampler thread.
+
+    asyncio.current_task(loop) looks the loop up in a process-wide mapping on
+    CPython 3.7-3.13, so it answers for loops in other threads. Later
+    versions keep the running task per thread and may return None here; stacks
+    are then sampled without the task prefix.
+    """
+    try:
+        return asyncio.current_task(loop)
+    except RuntimeError:
+        return None
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler for the running process.
+
+    A daemon thread snapshots every thread's stack via sys._current_frames()
+    at a fixed interval and aggregates them as collapsed stacks
+    ("frame;frame;frame count"), ready for flamegraph.pl or speedscope.
+    Stacks from threads running an attached event loop are prefixed with the
+    asyncio task that was executing. Nothing is sampled while idle: the
+    thread exits, or with `slow_threshold` set, blocks until a trace starts.
+
+    Two modes:
+      * on demand: start()/stop(), profile_async(seconds), SIGUSR1 toggle or
+        the admin endpoint capture every thread for a bounded window;
+      * slow requests: wrap work in trace(name) and only traces that take at
+        least `slow_threshold` seconds are written out.
+    """
+
+    def __init__(self, interval: float = 0.005, output_dir: str = 'profiles', max_depth: int = 128,
+                 default_seconds: float = 30.0, slow_threshold: Optional[float] = None):
+        self.interval = interval
+        self.output_dir = output_dir
+        self.max_depth = max_depth
+        self.default_seconds = default_seconds
+        self.slow_threshold = slow_threshold
+
+        self._loops: Dict[int, asyncio.AbstractEventLoop] = {}
+        self._labels: Dict[Any, str] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # Set when a capture or trace starts; the idle sampler parks on it
+        self._wake = threading.Event()
+
+        # On-demand capture state
+        self._capturing = False
+        self._deadline: Optional[float] = None
+        self._capture = Counter()
+        self._capture_started: Optional[float] = None
+
+        # Slow-request traces: trace id -> (thread id, task or None, Counter)
+        self._traces: Dict[int, tuple] = {}
+        self._next_trace = 0
+
+        self.samples = 0
+        self.sampling_seconds = 0.0
+        self.last_output: Optional[str] = None
+        self.slow_profiles = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'SamplingProfiler':
+        return cls(
+            interval=config.get('interval', 0.005),
+            output_dir=config.get('output_dir', 'profiles'),
+            max_depth=config.get('max_depth', 128),
+            default_seconds=config.get('seconds', 30.0),
+            slow_threshold=config.get('slow_threshold')
+        )
+
+    @property
+    def is_capturing(self) -> bool:
+        return self._capturing
+
+    def attach_loop(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """Attribute samples from the current thread to tasks of `loop`"""
+        self._loops[threading.get_ident()] = loop or asyncio.get_running_loop()
+
+    # Sampling -----------------------------------------------------------
+
+    def _ensure_thread(self):
+        with self._lock:
+            self._wake.set()
+            if self._thread is None:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+                self._thread.start()
+
+    def _frame_label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._labels[code] = label
+        return label
+
+    def _collapse(self, frame) -> str:
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            names.append(self._frame_label(frame.f_code))
+            frame = frame.f_back
+        names.reverse()
+        return ';'.join(names)
+
+    def _task_for(self, thread_id: int) -> Optional[asyncio.Task]:
+        loop = self._loops.get(thread_id)
+        return _current_task(loop) if loop is not None else None
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while True:
+            with self._lock:
+                capturing, tracing = self._capturing, bool(self._traces)
+                if self._stop.is_set() or (not capturing and not tracing and self.slow_threshold is None):
+                    self._thread = None
+                    return
+                if not capturing and not tracing:
+                    self._wake.clear()
+            if not capturing and not tracing:
+                # Kept for slow-request tracing, but parked until a trace starts
+                self._wake.wait()
+                continue
+
+            started = time.perf_counter()
+            frames = sys._current_frames()
+            thread_names = {t.ident: t.name for t in threading.enumerate()} if capturing else {}
+
+            with self._lock:
+                for thread_id, frame in frames.items():
+                    if thread_id == own_id:
+                        continue
+                    task = self._task_for(thread_id)
+                    stack = None
+
+                    for trace_thread, trace_task, counts in self._traces.values():
+                        if trace_thread == thread_id and (trace_task is None or trace_task is task):
+                            stack = stack or self._collapse(frame)
+                            counts[stack] += 1
+
+                    if capturing:
+                        stack = stack or self._collapse(frame)
+                        prefix = thread_names.get(thread_id, str(thread_id))
+                        if task is not None:
+                            prefix += f";task:{task.get_name()}"
+                        self._capture[f"{prefix};{stack}"] += 1
+
+                self.samples += 1
+                self.sampling_seconds += time.perf_counter() - started
+
+            if capturing and self._deadline is not None and time.monotonic() >= self._deadline:
+                self._finish_capture()
+            self._stop.wait(self.interval)
+
+    def _write(self, counts: Counter, name: str) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.collapsed")
+        with open(path, 'w') as f:
+            for stack, count in counts.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+    # On-demand capture --------------------------------------------------
+
+    def start(self, seconds: Optional[float] = None) -> bool:
+        """Begin capturing all threads; stops by itself after `seconds` if given"""
+        with self._lock:
+            if self._capturing:
+                return False
+            self._capture = Counter()
+            self._capturing = True
+            self._capture_started = time.monotonic()
+            self._deadline = self._capture_started + seconds if seconds else None
+        self._ensure_thread()
+        logger.info(f"Profiling started ({f'{seconds}s' if seconds else 'until stopped'}, "
+                    f"{self.interval * 1000:.1f}ms interval)")
+        return True
+
+    def _finish_capture(self) -> Optional[str]:
+        with self._lock:
+            if not self._capturing:
+                return self.last_output
+            self._capturing = False
+            counts, self._capture = self._capture, Counter()
+            elapsed = time.monotonic() - self._capture_started
+
+        self.last_output = self._write(counts, 'profile')
+        logger.info(f"Profile written to {self.last_output} ({sum(counts.values())} stack samples "
+                    f"over {elapsed:.1f}s)")
+        return self.last_output
+
+    def stop(self) -> Optional[str]:
+        """Stop capturing and return the path of the collapsed-stack file"""
+        return self._finish_capture()
+
+    def shutdown(self):
+        """Finish any capture and stop the sampler thread"""
+        self.stop()
+        self._stop.set()
+        self._wake.set()
+
+    def toggle(self):
+        """Start a `default_seconds` capture, or stop the one in progress (SIGUSR1)"""
+        if self._capturing:
+            self.stop()
+        else:
+            self.start(self.default_seconds)
+
+    async def profile_async(self, seconds: float) -> Optional[str]:
+        """Capture for `seconds` without blocking the event loop"""
+        if not self.start():
+            return None
+        await asyncio.sleep(seconds)
+        return self.stop()
+
+    def install_signal_handler(self, signum: int = getattr(signal, 'SIGUSR1', None)) -> bool:
+        """Toggle capture on `signum`, via the running loop when there is one"""
+        if signum is None:
+            return False
+        try:
+            asyncio.get_running_loop().add_signal_handler(signum, self.toggle)
+        except RuntimeError:
+            signal.signal(signum, lambda *_: self.toggle())
+        except (NotImplementedError, ValueError) as e:
+            logger.warning(f"Could not install profiler signal handler: {e}")
+            return False
+        logger.info(f"Send signal {signum} to pid {os.getpid()} to toggle profiling")
+        return True
+
+    # Slow-request mode --------------------------------------------------
+
+    @contextmanager
+    def trace(self, name: str):
+        """Sample the enclosed work; keep the profile only if it exceeds `slow_threshold`"""
+        if self.slow_threshold is None:
+            yield
+            return
+
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        counts = Counter()
+        with self._lock:
+            trace_id = self._next_trace
+            self._next_trace += 1
+            self._traces[trace_id] = (threading.get_ident(), task, counts)
+        self._ensure_thread()
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._traces.pop(trace_id, None)
+            if elapsed >= self.slow_threshold:
+                self.slow_profiles += 1
+                if counts:
+                    path = self._write(counts, f"slow_{name[:16]}")
+                    logger.warning(f"Slow request {name} took {elapsed:.3f}s, profile written to {path}")
+                else:
+                    logger.warning(f"Slow request {name} took {elapsed:.3f}s (no samples collected)")
+
+    # Admin endpoint -----------------------------------------------------
+
+    async def _handle_admin(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode('latin-1').split()
+            while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+                pass
+
+            url = urlparse(request_line[1] if len(request_line) > 1 else '/')
+            if url.path == '/profile':
+                seconds = float(parse_qs(url.query).get('seconds', [self.default_seconds])[0])
+                path = await self.profile_async(seconds)
+                status, body = ('200 OK', {'output': path}) if path else ('409 Conflict', {'error': 'busy'})
+            elif url.path == '/profile/stats':
+                status, body = '200 OK', self.get_stats()
+            else:
+                status, body = '404 Not Found', {'error': 'not found'}
+        except Exception as e:
+            status, body = '400 Bad Request', {'error': str(e)}
+
+        payload = json.dumps(body).encode('utf-8')
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                     f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() + payload)
+        await writer.drain()
+        writer.close()
+
+    async def start_admin_server(self, host: str = '127.0.0.1', port: int = 9100) -> asyncio.AbstractServer:
+        """Serve GET /profile?seconds=N and GET /profile/stats"""
+        server = await asyncio.start_server(self._handle_admin, host, port)
+        logger.info(f"Profiler admin endpoint listening on http://{host}:{port}/profile")
+        return server
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'capturing': self._capturing,
+            'slow_threshold': self.slow_threshold,
+            'active_traces': len(self._traces),
+            'samples': self.samples,
+            'mean_sample_us': round(self.sampling_seconds / self.samples * 1e6, 1) if self.samples else 0.0,
+            'slow_profiles': self.slow_profiles,
+            'last_output': self.last_output
+        }
+
@@ -0,0 +1,341 @@
+import json
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PREDICTION_SCALE = 1000  # AIOracle predictions are value * 1000
+LOGIT_RESOLUTION = 1024  # Sigmoid table steps per logit unit
+LOGIT_RANGE = 16
+
+
+def _trunc_int(values: np.ndarray) -> np.ndarray:
+    """int() semantics (toward zero), vectorized"""
+    return np.trunc(values).astype(np.int64)
+
+
+def _sigmoid_tables() -> Tuple[np.ndarray, np.ndarray]:
+    """Sigmoid over the quantized logit grid, pre-truncated to prediction and confidence integers.
+
+    Looking the nonlinearity up instead of calling exp() keeps outputs
+    independent of the platform's libm.
+    """
+    logits = np.arange(-LOGIT_RANGE * LOGIT_RESOLUTION, LOGIT_RANGE * LOGIT_RESOLUTION + 1) / LOGIT_RESOLUTION
+    probabilities = 1 / (1 + np.exp(-logits))
+    return (_trunc_int(probabilities * PREDICTION_SCALE).astype(np.int16),
+            _trunc_int(probabilities * 100).astype(np.int8))
+
+
+class QuantizedMLP:
+    """Integer execution of an AIModel (Keras Sequential Dense/BatchNorm/Dropout) network.
+
+    BatchNorm is folded into the adjacent Dense weights and Dropout dropped.
+    Weights are quantized symmetrically per output channel and activations
+    per layer, both to `bits` (8 or 16), with scales calibrated on sample
+    inputs; biases are integers in the accumulator domain. Products are
+    accumulated in float BLAS on integer-valued arrays: int8 x int8 sums stay
+    below 2**24 and are exact in float32, int16 runs in float64 (exact below
+    2**53), so results don't depend on BLAS summation order and replicas
+    agree bit for bit. Outputs are the integers the bridges submit.
+    """
+
+    def __init__(self, layers, bits: int, input_scale: float, task: str):
+        self.layers = layers  # [{'weights': intN (in, out), 'bias': int64, 'scale': float64 (out,), 'relu', 'out_scale'}]
+        self.bits = bits
+        self.input_scale = input_scale
+        self.task = task
+        self.qmax = 2 ** (bits - 1) - 1
+        self._prediction_table, self._confidence_table = _sigmoid_tables()
+
+    @classmethod
+    def from_keras(cls, model, X_calibration: np.ndarray, bits: int = 8, task: str = 'classification') -> 'QuantizedMLP':
+        if bits not in (8, 16):
+            raise ValueError("bits must be 8 or 16")
+        folded = cls._fold(model)
+        qmax = 2 ** (bits - 1) - 1
+
+        # Activation ranges from a float pass over the calibration inputs
+        activation = np.asarray(X_calibration, dtype=np.float64)
+        ranges = [np.abs(activation).max()]
+        for W, b, kind in folded[:-1]:
+            activation = activation @ W + b
+            if kind == 'relu':
+                activation = np.maximum(activation, 0)
+            ranges.append(np.abs(activation).max())
+        scales = [max(r, 1e-12) / qmax for r in ranges]
+
+        layers = []
+        for i, (W, b, kind) in enumerate(folded):
+            weight_scale = np.maximum(np.abs(W).max(axis=0), 1e-12) / qmax
+            accumulator_scale = scales[i] * weight_scale
+            layers.append({
+                'weights': np.clip(np.rint(W / weight_scale), -qmax, qmax).astype(np.int8 if bits == 8 else np.int16),
+                'bias': np.rint(b / accumulator_scale).astype(np.int64),
+                'scale': accumulator_scale,
+                'relu': kind == 'relu',
+                'out_scale': scales[i + 1] if i < len(folded) - 1 else None
+            })
+        return cls(layers, bits, scales[0], task)
+
+    @staticmethod
+    def _fold(model):
+        """[(W, b, activation)] per Dense layer, with BatchNorm folded into the next Dense.
+
+        AIModel normalizes after the ReLU, so the affine BatchNorm is merged
+        forward into the weights that consume it rather than backward.
+        """
+        folded = []
+        pending = None  # (factor, shift) of a BatchNorm awaiting the next Dense
+        for layer in model.layers:
+            kind = type(layer).__name__
+            if kind == 'Dense':
+                W, b = (np.asarray(w, dtype=np.float64) for w in layer.get_weights())
+                activation = layer.get_config().get('activation', 'linear')
+                if activation not in ('relu', 'linear', 'sigmoid'):
+                    raise ValueError(f"Cannot quantize {activation} activation")
+                if pending is not None:
+                    factor, shift = pending
+                    W, b = W * factor[:, None], shift @ W + b
+                    pending = None
+                folded.append((W, b, activation))
+            elif kind == 'BatchNormalization':
+                gamma, beta, mean, variance = (np.asarray(w, dtype=np.float64) for w in layer.get_weights())
+                factor = gamma / np.sqrt(variance + layer.epsilon)
+                pending = (factor, beta - mean * factor)
+            elif kind not in ('Dropout', 'InputLayer'):
+                raise ValueError(f"Cannot quantize layer type {kind}")
+        if pending is not None or not folded:
+            raise ValueError("Model must end with a Dense layer")
+        if any(activation == 'sigmoid' for _, _, activation in folded[:-1]):
+            raise ValueError("Sigmoid is only supported on the output layer")
+        return folded
+
+    def _accumulate(self, x: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """Exact integer x @ weights, returned as float64"""
+        exact_in_float32 = self.bits == 8 and weights.shape[0] * self.qmax * self.qmax < 2 ** 24
+        dtype = np.float32 if exact_in_float32 else np.float64
+        return (x.astype(dtype) @ weights.astype(dtype)).astype(np.float64)
+
+    def _logits(self, X: np.ndarray) -> np.ndarray:
+        x = np.clip(np.rint(np.asarray(X, dtype=np.float64) / self.input_scale), -self.qmax, self.qmax)
+        for layer in self.layers[:-1]:
+            y = (self._accumulate(x, layer['weights']) + layer['bias']) * layer['scale']
+            lowest = 0 if layer['relu'] else -self.qmax
+            x = np.clip(np.rint(y / layer['out_scale']), lowest, self.qmax)
+        output = self.layers[-1]
+        return (self._accumulate(x, output['weights']) + output['bias']) * output['scale']
+
+    def predict_scaled(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(prediction * 1000, confidence) integers per row, as the oracle receives them"""
+        logits = self._logits(X)
+        if self.task == 'regression':
+            return _trunc_int(logits[:, 0] * PREDICTION_SCALE), np.full(len(logits), 90, dtype=np.int64)
+
+        index = np.clip(np.rint(logits * LOGIT_RESOLUTION), -LOGIT_RANGE * LOGIT_RESOLUTION,
+                        LOGIT_RANGE * LOGIT_RESOLUTION).astype(np.int64) + LOGIT_RANGE * LOGIT_RESOLUTION
+        predictions = self._prediction_table[index[:, 0]].astype(np.int64)
+        if logits.shape[1] == 1:
+            # Same confidence rule as the float path for a single output
+            return predictions, np.full(len(logits), 90, dtype=np.int64)
+        return predictions, self._confidence_table[index].max(axis=1).astype(np.int64)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(layer['weights'].nbytes + layer['bias'].nbytes + layer['scale'].nbytes for layer in self.layers)
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        arrays = {}
+        for i, layer in enumerate(self.layers):
+            for key in ('weights', 'bias', 'scale'):
+                arrays[f'layer{i}_{key}'] = layer[key]
+        return arrays
+
+    def meta(self) -> Dict[str, Any]:
+        return {
+            'kind': 'mlp', 'bits': self.bits, 'input_scale': self.input_scale, 'task': self.task,
+            'layers': [{'relu': layer['relu'], 'out_scale': layer['out_scale']} for layer in self.layers]
+        }
+
+    @classmethod
+    def from_arrays(cls, meta: Dict[str, Any], arrays) -> 'QuantizedMLP':
+        layers = [dict(spec, weights=arrays[f'layer{i}_weights'], bias=arrays[f'layer{i}_bias'],
+                       scale=arrays[f'layer{i}_scale']) for i, spec in enumerate(meta['layers'])]
+        return cls(layers, meta['bits'], meta['input_scale'], meta['task'])
+
+
+class QuantizedForest:
+    """Integer execution of a fitted sklearn forest (or single tree).
+
+    All trees are flattened into shared node arrays and traversed together,
+    one vectorized step per depth level. Inputs are mapped per feature to
+    unsigned fixed point spanning that feature's split thresholds, and the
+    thresholds are stored in the same domain (uint16 by default), so
+    comparisons are integer and only inputs within one quantization step of
+    a threshold can go the other way. Leaf class probabilities are stored
+    as uint16 fractions of 65535 and regression leaves as int64 in the
+    1e3 * 2**10 domain; summing them over trees is exact.
+    """
+
+    PROBABILITY_SCALE = 65535
+    REGRESSION_SHIFT = 10
+
+    def __init__(self, arrays: Dict[str, np.ndarray], task: str, n_trees: int, max_depth: int,
+                 classes: Optional[np.ndarray] = None):
+        self.arrays = arrays
+        self.task = task
+        self.n_trees = n_trees
+        self.max_depth = max_depth
+        self.classes = classes
+
+    @classmethod
+    def from_sklearn(cls, model, threshold_bits: int = 16) -> 'QuantizedForest':
+        if threshold_bits not in (16, 32):
+            raise ValueError("threshold_bits must be 16 or 32")
+        from sklearn.ensemble._forest import BaseForest
+        from sklearn.tree import BaseDecisionTree
+
+        # Boosting and bagging combine their estimators differently than a mean over trees
+        if isinstance(model, BaseForest):
+            trees = [estimator.tree_ for estimator in model.estimators_]
+        elif isinstance(model, BaseDecisionTree):
+            trees = [model.tree_]
+        else:
+            raise ValueError(f"Only random forests and decision trees can be quantized, not {type(model).__name__}")
+        if trees[0].n_outputs != 1:
+            raise ValueError("Only single-output forests can be quantized")
+        task = 'classification' if hasattr(model, 'classes_') else 'regression'
+        n_features = model.n_features_in_
+
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        is_leaf = np.concatenate([tree.children_left == -1 for tree in trees])
+        node_ids = np.arange(offsets[-1])
+        # Leaves point at themselves so every tree can take max_depth steps
+        left = np.where(is_leaf, node_ids, np.concatenate([tree.children_left + o for tree, o in zip(trees, offsets)]))
+        right = np.where(is_leaf, node_ids, np.concatenate([tree.children_right + o for tree, o in zip(trees, offsets)]))
+        feature = np.where(is_leaf, 0, np.concatenate([tree.feature for tree in trees]))
+        threshold = np.concatenate([tree.threshold for tree in trees])
+
+        # Per-feature fixed point over the range of that feature's thresholds
+        levels = 2 ** threshold_bits - 2
+        lower = np.zeros(n_features)
+        step = np.ones(n_features)
+        for f in range(n_features):
+            used = threshold[(feature == f) & ~is_leaf]
+            if len(used):
+                lower[f] = used.min()
+                step[f] = max(used.max() - used.min(), 1e-12) / levels
+        threshold_q = np.where(is_leaf, 0, np.floor((threshold - lower[feature]) / step[feature]))
+        threshold_q = np.clip(threshold_q, 0, levels).astype(np.uint16 if threshold_bits == 16 else np.uint32)
+
+        values = np.concatenate([tree.value[:, 0, :] for tree in trees])
+        if task == 'classification':
+            probabilities = values / np.maximum(values.sum(axis=1, keepdims=True), 1e-12)
+            leaf_values = np.rint(probabilities * cls.PROBABILITY_SCALE).astype(np.uint16)
+        else:
+            leaf_values = np.rint(values[:, 0] * PREDICTION_SCALE * 2 ** cls.REGRESSION_SHIFT).astype(np.int64)
+
+        arrays = {
+            'left': left.astype(np.int32), 'right': right.astype(np.int32), 'feature': feature.astype(np.int32),
+            'threshold': threshold_q, 'roots': offsets[:-1].astype(np.int32), 'leaf_values': leaf_values,
+            'lower': lower, 'step': step
+        }
+        classes = np.asarray(model.classes_) if task == 'classification' else None
+        return cls(arrays, task, len(trees), max(tree.max_depth for tree in trees), classes)
+
+    def quantize_inputs(self, X: np.ndarray) -> np.ndarray:
+        levels = np.iinfo(self.arrays['threshold'].dtype).max - 1
+        Xq = np.floor((np.asarray(X, dtype=np.float64) - self.arrays['lower']) / self.arrays['step'])
+        # Below every threshold -> -1, above every threshold -> levels + 1
+        return np.clip(Xq, -1, levels + 1).astype(np.int64)
+
+    def leaves(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node per (tree, row), shape (n_trees, n)"""
+        a = self.arrays
+        Xq = self.quantize_inputs(X)
+        n = len(Xq)
+        node = np.repeat(a['roots'], n).astype(np.int64)
+        rows = np.tile(np.arange(n), self.n_trees)
+        for _ in range(self.max_depth):
+            go_left = Xq[rows, a['feature'][node]] <= a['threshold'][node]
+            node = np.where(go_left, a['left'][node], a['right'][node])
+        return node.reshape(self.n_trees, n)
+
+    def predict_scaled(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(prediction * 1000, confidence) integers per row, as the oracle receives them"""
+        leaves = self.leaves(X)
+        totals = self.arrays['leaf_values'][leaves].astype(np.int64).sum(axis=0)
+        if self.task == 'classification':
+            winner = totals.argmax(axis=1)
+            predictions = _trunc_int(self.classes[winner].astype(np.float64) * PREDICTION_SCALE)
+            confidences = totals.max(axis=1) * 100 // (self.n_trees * self.PROBABILITY_SCALE)
+            return predictions, confidences
+
+        divisor = self.n_trees << self.REGRESSION_SHIFT
+        # Integer division toward zero, matching int()
+        predictions = np.sign(totals) * (np.abs(totals) // divisor)
+        return predictions, np.full(len(totals), 85, dtype=np.int64)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(array.nbytes for array in self.arrays.values())
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        arrays = dict(self.arrays)
+        if self.classes is not None:
+            arrays['classes'] = self.classes
+        return arrays
+
+    def meta(self) -> Dict[str, Any]:
+        return {'kind': 'forest', 'task': self.task, 'n_trees': self.n_trees, 'max_depth': self.max_depth}
+
+    @classmethod
+    def from_arrays(cls, meta: Dict[str, Any], arrays) -> 'QuantizedForest':
+        classes = arrays['classes'] if 'classes' in arrays else None
+        own = {key: arrays[key] for key in arrays if key not in ('classes', 'meta')}
+        return cls(own, meta['task'], meta['n_trees'], meta['max_depth'], classes)
+
+
+def quantize_model(model, X_calibration: Optional[np.ndarray] = None, bits: int = 8,
+                   task: Optional[str] = None):
+    """Quantize a Keras MLP (needs preprocessed calibration inputs) or a fitted sklearn forest/tree"""
+    if hasattr(model, 'layers'):
+        if X_calibration is None:
+            raise ValueError("Calibration inputs are required to quantize an MLP")
+        task = task or ('classification' if type(model.layers[-1]).__name__ == 'Dense'
+                        and model.layers[-1].get_config().get('activation') == 'sigmoid' else 'regression')
+        return QuantizedMLP.from_keras(model, X_calibration, bits, task)
+    return QuantizedForest.from_sklearn(model, threshold_bits=16 if bits <= 16 else 32)
+
+
+def save_quantized(quantized, path: str):
+    with open(path, 'wb') as f:
+        np.savez(f, meta=json.dumps(quantized.meta()), **quantized.to_arrays())
+    logger.info(f"Quantized model saved to {path} ({quantized.nbytes / 1e3:.1f} kB)")
+
+
+def load_quantized(path: str):
+    with np.load(path) as data:
+        meta = json.loads(str(data['meta']))
+        arrays = {key: data[key] for key in data.files}
+    return (QuantizedMLP if meta['kind'] == 'mlp' else QuantizedForest).from_arrays(meta, arrays)
+
+
+def export_quantized(model_path: str, model_type: str = 'sklearn', calibration_inputs=None, bits: int = 8) -> str:
+    """Quantize a saved model and write the sidecar InferenceModel(..., quantized=True) loads.
+
+    `calibration_inputs` are raw request rows; they are preprocessed with the
+    model's own pipeline before the activation ranges are measured.
+    """
+    from src.ai.inference import InferenceModel
+
+    model = InferenceModel(model_path, model_type)
+    X_calibration = None
+    if calibration_inputs is not None:
+        X_calibration, _, _ = model.preprocess_batch(calibration_inputs)
+    quantized = quantize_model(model.model, X_calibration, bits=bits)
+    path = f"{model_path}_quantized.npz"
+    save_quantized(quantized, path)
+    return path
@@ -0,0 +1,397 @@
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.ai.log_decoder import EventSchema, LogDecoder, schemas_from_abi
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# AIOracle's events, used when the configured ABI does not carry them
+ORACLE_EVENTS = [
+    EventSchema('PredictionRequested', [
+        {'name': 'requestId', 'type': 'bytes32', 'indexed': True},
+        {'name': 'inputData', 'type': 'bytes', 'indexed': False}
+    ]),
+    EventSchema('PredictionFulfilled', [
+        {'name': 'requestId', 'type': 'bytes32', 'indexed': True},
+        {'name': 'prediction', 'type': 'int256', 'indexed': False},
+        {'name': 'confidence', 'type': 'uint256', 'indexed': False}
+    ])
+]
+
+
+def parse_input(input_data: bytes):
+    """Request input as the bridge decodes it: JSON, else the raw byte values"""
+    try:
+        return json.loads(input_data.decode('utf-8'))
+    except (ValueError, UnicodeDecodeError):
+        return list(input_data)
+
+
+class History:
+    """Columnar record of request/fulfillment pairs, stored as one .npz of arrays.
+
+    Request ids are an (n, 32) uint8 array; a fixed-width bytes dtype would
+    drop trailing NUL bytes. Raw inputs are kept as a byte blob plus
+    offsets; `inputs` holds them parsed into a float matrix (NaN rows where
+    a request could not be parsed into the common feature width).
+    """
+
+    COLUMNS = ('request_id', 'request_block', 'input_offsets', 'input_blob', 'inputs',
+               'fulfilled', 'prediction', 'confidence', 'fulfilled_block')
+
+    def __init__(self, columns: Dict[str, np.ndarray], meta: Optional[Dict[str, Any]] = None):
+        self.columns = columns
+        self.meta = meta or {}
+
+    def __len__(self) -> int:
+        return len(self.columns['request_id'])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def request_id(self, i: int) -> bytes:
+        return self.columns['request_id'][i].tobytes()
+
+    def raw_input(self, i: int) -> bytes:
+        offsets = self.columns['input_offsets']
+        return self.columns['input_blob'][offsets[i]:offsets[i + 1]].tobytes()
+
+    @classmethod
+    def from_events(cls, requests: List[Dict[str, Any]], fulfillments: List[Dict[str, Any]],
+                    meta: Optional[Dict[str, Any]] = None) -> 'History':
+        n = len(requests)
+        payloads = [event['args']['inputData'] for event in requests]
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(p) for p in payloads])
+
+        parsed = [parse_input(p) for p in payloads]
+        lengths = [len(row) if isinstance(row, list) else -1 for row in parsed]
+        valid_lengths = [length for length in lengths if length > 0]
+        width = max(set(valid_lengths), key=valid_lengths.count) if valid_lengths else 0
+        inputs = np.full((n, width), np.nan)
+        for i, row in enumerate(parsed):
+            if lengths[i] == width:
+                try:
+                    inputs[i] = row
+                except (TypeError, ValueError):
+                    pass
+
+        by_id = {event['args']['requestId']: event for event in fulfillments}
+        answers = [by_id.get(event['args']['requestId']) for event in requests]
+        columns = {
+            'request_id': np.frombuffer(b''.join(bytes(event['args']['requestId']) for event in requests),
+                                        dtype=np.uint8).reshape(n, 32),
+            'request_block': np.array([event['blockNumber'] for event in requests], dtype=np.int64),
+            'input_offsets': offsets,
+            'input_blob': np.frombuffer(b''.join(payloads), dtype=np.uint8),
+            'inputs': inputs,
+            'fulfilled': np.array([a is not None for a in answers], dtype=bool),
+            'prediction': np.array([a['args']['prediction'] if a else 0 for a in answers], dtype=np.int64),
+            'confidence': np.array([a['args']['confidence'] if a else 0 for a in answers], dtype=np.int64),
+            'fulfilled_block': np.array([a['blockNumber'] if a else -1 for a in answers], dtype=np.int64)
+        }
+        return cls(columns, meta)
+
+    def save(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez(f, meta=json.dumps(self.meta), **self.columns)
+        logger.info(f"Saved {len(self)} request(s) to {path}")
+
+    @classmethod
+    def load(cls, path: str) -> 'History':
+        with np.load(path) as data:
+            columns = {name: data[name] for name in cls.COLUMNS}
+            meta = json.loads(str(data['meta']))
+        if columns['request_id'].dtype.kind == 'S':
+            # Written as S32, which stripped trailing NULs
+            columns['request_id'] = np.frombuffer(b''.join(rid.ljust(32, b'\0') for rid in columns['request_id']),
+                                                  dtype=np.uint8).reshape(-1, 32)
+        return cls(columns, meta)
+
+
+def extract_history(w3, oracle_address: str, from_block: int, to_block: int,
+                    oracle_abi: Optional[List[Dict[str, Any]]] = None, chunk_blocks: int = 5000) -> History:
+    """Pull every PredictionRequested/PredictionFulfilled pair in a block range from the oracle"""
+    schemas = schemas_from_abi(oracle_abi or [])
+    decoder = LogDecoder([schemas.get(schema.name, schema) for schema in ORACLE_EVENTS])
+    requests, fulfillments = [], []
+    start = time.perf_counter()
+    for chunk_start in range(from_block, to_block + 1, chunk_blocks):
+        chunk_end = min(chunk_start + chunk_blocks - 1, to_block)
+        for event in decoder.get_logs(w3, oracle_address, chunk_start, chunk_end):
+            (requests if event['event'] == 'PredictionRequested' else fulfillments).append(event)
+    logger.info(f"Fetched {len(requests)} request(s) and {len(fulfillments)} fulfillment(s) "
+                f"from blocks {from_block}-{to_block} in {time.perf_counter() - start:.1f}s")
+    meta = {'oracle_address': oracle_address, 'from_block': from_block, 'to_block': to_block,
+            'extracted_at': datetime.now().isoformat()}
+    return History.from_events(requests, fulfillments, meta)
+
+
+# Process-pool scoring: each worker loads the candidates once
+
+_worker_models: Dict[str, Any] = {}
+
+
+def _load_candidates(candidates: Dict[str, Dict[str, Any]], quiet: bool = True):
+    from src.ai.inference import InferenceModel
+
+    if quiet:
+        # Per-request inference logging would dominate batch replay
+        logging.getLogger('src.ai.inference').setLevel(logging.WARNING)
+    return {
+        name: InferenceModel(spec['path'], spec.get('type', 'sklearn'), quantized=spec.get('quantized', False),
+                             tf_serving=spec.get('tf_serving'))
+        for name, spec in candidates.items()
+    }
+
+
+def _init_worker(candidates: Dict[str, Dict[str, Any]]):
+    global _worker_models
+    _worker_models = _load_candidates(candidates)
+
+
+def _score_chunk(models: Dict[str, Any], rows: np.ndarray) -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray, float]]:
+    """Per candidate: (predictions, confidences, scored mask, seconds) for one chunk of raw rows"""
+    results = {}
+    for name, model in models.items():
+        start = time.perf_counter()
+        processed, row_index, _ = model.preprocess_batch(rows)
+        predictions = np.zeros(len(rows), dtype=np.int64)
+        confidences = np.zeros(len(rows), dtype=np.int64)
+        scored = np.zeros(len(rows), dtype=bool)
+        if len(row_index):
+            predictions[row_index], confidences[row_index] = model.predict_scaled_batch(processed)
+            scored[row_index] = True
+        results[name] = (predictions, confidences, scored, time.perf_counter() - start)
+    return results
+
+
+def _score_in_worker(rows: np.ndarray):
+    return _score_chunk(_worker_models, rows)
+
+
+class ReplayEngine:
+    """Re-scores a History through candidate models and compares them with what was fulfilled on chain.
+
+    Inputs are scored in large chunks (one vectorized preprocessing and
+    model call each), spread over a process pool when workers > 1.
+    """
+
+    def __init__(self, candidates: Dict[str, Dict[str, Any]], batch_size: int = 65536, workers: int = 1,
+                 tolerance: int = 0):
+        self.candidates = candidates
+        self.batch_size = batch_size
+        self.workers = workers
+        self.tolerance = tolerance
+
+    def score(self, history: History) -> Dict[str, Dict[str, np.ndarray]]:
+        """Candidate predictions/confidences for every request in `history`"""
+        inputs = history['inputs']
+        chunks = [inputs[i:i + self.batch_size] for i in range(0, len(inputs), self.batch_size)]
+        n = len(inputs)
+        scores = {name: {'prediction': np.zeros(n, dtype=np.int64), 'confidence': np.zeros(n, dtype=np.int64),
+                         'scored': np.zeros(n, dtype=bool), 'chunk_seconds': []} for name in self.candidates}
+
+        start = time.perf_counter()
+        if self.workers > 1:
+            # spawn: workers must not inherit a parent's TensorFlow state
+            with ProcessPoolExecutor(self.workers, mp_context=get_context('spawn'),
+                                     initializer=_init_worker, initargs=(self.candidates,)) as pool:
+                results = pool.map(_score_in_worker, chunks)
+                self._collect(scores, results)
+        else:
+            models = _load_candidates(self.candidates)
+            self._collect(scores, (_score_chunk(models, chunk) for chunk in chunks))
+        for row in scores.values():
+            row['wall_seconds'] = time.perf_counter() - start
+        return scores
+
+    def _collect(self, scores, results):
+        offset = 0
+        for chunk_results in results:
+            for name, (predictions, confidences, scored, seconds) in chunk_results.items():
+                end = offset + len(predictions)
+                scores[name]['prediction'][offset:end] = predictions
+                scores[name]['confidence'][offset:end] = confidences
+                scores[name]['scored'][offset:end] = scored
+                scores[name]['chunk_seconds'].append(seconds)
+            offset = end
+
+    def report(self, history: History, scores: Dict[str, Dict[str, np.ndarray]]) -> Dict[str, Any]:
+        """Agreement with on-chain answers, confidence shift and scoring latency per candidate"""
+        report = {}
+        for name, row in scores.items():
+            compared = row['scored'] & history['fulfilled']
+            diff = row['prediction'][compared] - history['prediction'][compared]
+            shift = row['confidence'][compared] - history['confidence'][compared]
+            chunk_seconds = np.asarray(row['chunk_seconds'])
+            report[name] = {
+                'requests': len(history),
+                'scored': int(row['scored'].sum()),
+                'compared': int(compared.sum()),
+                'exact_agreement': float((diff == 0).mean()) if len(diff) else None,
+                'within_tolerance': float((np.abs(diff) <= self.tolerance).mean()) if len(diff) else None,
+                'mean_abs_diff': float(np.abs(diff).mean()) if len(diff) else None,
+                'p99_abs_diff': float(np.percentile(np.abs(diff), 99)) if len(diff) else None,
+                'mean_confidence_shift': float(shift.mean()) if len(shift) else None,
+                'confidence_shift_p5_p95': [float(v) for v in np.percentile(shift, [5, 95])] if len(shift) else None,
+                'rows_per_sec': len(history) / row['wall_seconds'] if row['wall_seconds'] else None,
+                'chunk_ms_p50': float(np.percentile(chunk_seconds, 50) * 1e3) if len(chunk_seconds) else None,
+                'chunk_ms_p99': float(np.percentile(chunk_seconds, 99) * 1e3) if len(chunk_seconds) else None,
+                'us_per_row': float(chunk_seconds.sum() / max(int(row['scored'].sum()), 1) * 1e6)
+            }
+        return report
+
+    def run(self, history: History) -> Dict[str, Any]:
+        return self.report(history, self.score(history))
+
+
+class ShadowEvaluator:
+    """Scores live requests with candidate models beside production, without submitting anything.
+
+    Requests are handed to a single background thread so production latency
+    is unaffected; when it falls more than `max_pending` requests behind,
+    new ones are dropped (and counted) rather than queued without bound.
+    Each comparison is optionally appended to a JSON-lines log.
+    """
+
+    def __init__(self, models: Dict[str, Any], log_path: Optional[str] = None, max_pending: int = 1000):
+        self.models = models
+        self.log_path = log_path
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow')
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.dropped = 0
+        self.stats = {name: {'scored': 0, 'errors': 0, 'exact': 0, 'abs_diff': 0, 'confidence_shift': 0,
+                             'seconds': 0.0} for name in models}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['ShadowEvaluator']:
+        if not config.get('enabled') or not config.get('models'):
+            return None
+        models = _load_candidates({spec.get('name', spec['path']): spec for spec in config['models']}, quiet=False)
+        logger.info(f"Shadow evaluation enabled for: {', '.join(models)}")
+        return cls(models, config.get('log_path'), config.get('max_pending', 1000))
+
+    def submit(self, input_values, production: Tuple[int, int], request_id: Optional[bytes] = None):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.dropped += 1
+                return
+            self._pending += 1
+        self._executor.submit(self._score, input_values, production, request_id)
+
+    def _score(self, input_values, production: Tuple[int, int], request_id: Optional[bytes]):
+        try:
+            record = {'request_id': request_id.hex() if request_id is not None else None,
+                      'production': list(production), 'candidates': {}}
+            for name, model in self.models.items():
+                stats = self.stats[name]
+                start = time.perf_counter()
+                try:
+                    prediction, confidence = model.predict_scaled(input_values)
+                except Exception as e:
+                    stats['errors'] += 1
+                    record['candidates'][name] = {'error': str(e)}
+                    continue
+                stats['seconds'] += time.perf_counter() - start
+                stats['scored'] += 1
+                stats['exact'] += prediction == production[0]
+                stats['abs_diff'] += abs(prediction - production[0])
+                stats['confidence_shift'] += confidence - production[1]
+                record['candidates'][name] = [prediction, confidence]
+            if self.log_path:
+                with open(self.log_path, 'a') as f:
+                    f.write(json.dumps(record) + '\n')
+        except Exception as e:
+            logger.error(f"Shadow evaluation failed: {e}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        summary = {}
+        for name, stats in self.stats.items():
+            scored = stats['scored']
+            summary[name] = {
+                'scored': scored,
+                'errors': stats['errors'],
+                'exact_agreement': stats['exact'] / scored if scored else None,
+                'mean_abs_diff': stats['abs_diff'] / scored if scored else None,
+                'mean_confidence_shift': stats['confidence_shift'] / scored if scored else None,
+                'mean_latency_ms': stats['seconds'] / scored * 1e3 if scored else None
+            }
+        return {'models': summary, 'pending': self._pending, 'dropped': self.dropped}
+
+
+def _parse_candidate(spec: str) -> Tuple[str, Dict[str, Any]]:
+    """name=path[:type[:quantized]], e.g. rf2=models/rf2.pkl:sklearn"""
+    name, _, rest = spec.rpartition('=')
+    parts = rest.split(':')
+    candidate = {'path': parts[0], 'type': parts[1] if len(parts) > 1 else 'sklearn',
+                 'quantized': len(parts) > 2 and parts[2] == 'quantized'}
+    return name or parts[0], candidate
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay historical oracle traffic through candidate models')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    extract = subparsers.add_parser('extract', help='Pull request/fulfillment pairs into a history file')
+    extract.add_argument('--config', default='config.json')
+    extract.add_argument('--from-block', type=int, required=True)
+    extract.add_argument('--to-block', type=int, default=None)
+    extract.add_argument('--chunk-blocks', type=int, default=5000)
+    extract.add_argument('--output', default='replay/history.npz')
+
+    score = subparsers.add_parser('score', help='Re-score a history file and report against production')
+    score.add_argument('history')
+    score.add_argument('--model', action='append', required=True, metavar='NAME=PATH[:TYPE[:quantized]]')
+    score.add_argument('--batch-size', type=int, default=65536)
+    score.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    score.add_argument('--tolerance', type=int, default=0, help='Allowed |prediction diff| in scaled units')
+    score.add_argument('--output', default=None)
+    args = parser.parse_args()
+
+    if args.command == 'extract':
+        from web3 import Web3
+
+        with open(args.config, 'r') as f:
+            config = json.load(f)
+        w3 = Web3(Web3.HTTPProvider(config['blockchain']['rpc_url']))
+        to_block = args.to_block if args.to_block is not None else w3.eth.block_number
+        history = extract_history(w3, config['blockchain']['oracle_address'], args.from_block, to_block,
+                                  config['blockchain'].get('oracle_abi'), args.chunk_blocks)
+        history.save(args.output)
+        return
+
+    history = History.load(args.history)
+    engine = ReplayEngine(dict(_parse_candidate(spec) for spec in args.model), args.batch_size, args.workers,
+                          args.tolerance)
+    report = engine.run(history)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
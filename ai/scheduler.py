@@ -0,0 +1,206 @@
+import asyncio
+import bisect
+import itertools
+import json
+import logging
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def request_deadline(input_data: bytes) -> Optional[float]:
+    """Caller deadline (unix seconds) from a {"input": [...], "deadline": ...} request envelope"""
+    try:
+        decoded = json.loads(input_data.decode('utf-8'))
+    except (UnicodeDecodeError, ValueError):
+        return None
+    if isinstance(decoded, dict) and isinstance(decoded.get('deadline'), (int, float)):
+        return float(decoded['deadline'])
+    return None
+
+
+class PriorityScheduler:
+    """Bounded, fee- and age-ordered queue between the block scanner and fulfillment workers.
+
+    Each request is ranked by log2(fee) + requested_at / half_life: a
+    request's value halves for every `half_life` seconds it has waited, so a
+    request paying twice the fee is worth as much as one `half_life` seconds
+    younger. Because every request ages at the same rate the ordering never
+    changes while they wait, and the queue is kept as a sorted list.
+
+    Requests past their deadline (the caller's, or `max_age` after the block
+    they were requested in) are shed instead of started. When `max_pending`
+    requests are waiting, the lowest-ranked one is shed to admit a better
+    one. At most `max_in_flight` requests are predicted and submitted at a
+    time; once all but `reserved_slots` of them are busy, only requests
+    paying at least `high_value_fee` may start and the rest are deferred
+    until a slot frees up, so high-value work never waits behind a
+    submission backlog. `on_shed`, if set, is called with every shed job.
+    """
+
+    def __init__(self, max_pending: int = 1000, max_in_flight: int = 4, reserved_slots: int = 1,
+                 high_value_fee: Optional[int] = None, half_life: float = 60.0, max_age: Optional[float] = None,
+                 latency_window: int = 10000):
+        if reserved_slots >= max_in_flight:
+            raise ValueError("reserved_slots must leave at least one slot for other requests")
+        self.max_pending = max_pending
+        self.max_in_flight = max_in_flight
+        self.reserved_slots = reserved_slots if high_value_fee is not None else 0
+        self.high_value_fee = high_value_fee
+        self.half_life = half_life
+        self.max_age = max_age
+
+        # Ascending by rank: the next request to start is at the end, the next to shed at the front
+        self._pending: List[tuple] = []
+        self._seq = itertools.count()
+        self._changed: Optional[asyncio.Condition] = None
+        self.in_flight = 0
+        self.on_shed: Optional[Callable[[Dict[str, Any]], None]] = None
+
+        self.admitted = 0
+        self.shed_overflow = 0
+        self.shed_expired = 0
+        self.deferred = 0
+        self.completed = 0
+        self.failed = 0
+        self._latencies = {True: deque(maxlen=latency_window), False: deque(maxlen=latency_window)}
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> Optional['PriorityScheduler']:
+        if not config.get('enabled'):
+            return None
+        return cls(
+            max_pending=config.get('max_pending', 1000),
+            max_in_flight=config.get('max_in_flight', 4),
+            reserved_slots=config.get('reserved_slots', 1),
+            high_value_fee=config.get('high_value_fee'),
+            half_life=config.get('half_life', 60.0),
+            max_age=config.get('max_age')
+        )
+
+    @property
+    def _condition(self) -> asyncio.Condition:
+        # Created on first use so it binds to the running loop
+        if self._changed is None:
+            self._changed = asyncio.Condition()
+        return self._changed
+
+    def rank(self, fee: int, requested_at: float) -> float:
+        return math.log2(max(fee, 1)) + requested_at / self.half_life
+
+    def _expired(self, job: Dict[str, Any], now: float) -> bool:
+        return job['deadline'] is not None and now > job['deadline']
+
+    def _shed(self, job: Dict[str, Any]):
+        if self.on_shed is not None:
+            self.on_shed(job)
+
+    def is_high_value(self, fee: int) -> bool:
+        return self.high_value_fee is not None and fee >= self.high_value_fee
+
+    async def put(self, request_id: bytes, input_data: bytes, fee: int = 0, requested_at: Optional[float] = None,
+                  deadline: Optional[float] = None, **extra) -> bool:
+        """Admit a request; returns False if it was shed (expired, or outranked while the queue is full)"""
+        now = time.time()
+        requested_at = requested_at if requested_at is not None else now
+        if self.max_age is not None:
+            deadline = min(deadline, requested_at + self.max_age) if deadline is not None \
+                else requested_at + self.max_age
+        job = dict(extra, request_id=request_id, input_data=input_data, fee=fee, requested_at=requested_at,
+                   deadline=deadline, high_value=self.is_high_value(fee), queued_at=time.monotonic())
+        if self._expired(job, now):
+            self.shed_expired += 1
+            self._shed(job)
+            return False
+
+        entry = (self.rank(fee, requested_at), next(self._seq), job)
+        bisect.insort(self._pending, entry)
+        self.admitted += 1
+        if len(self._pending) > self.max_pending:
+            _, _, shed = self._pending.pop(0)
+            self.shed_overflow += 1
+            logger.warning(f"Scheduler full, shedding request {shed['request_id'].hex()} (fee {shed['fee']})")
+            self._shed(shed)
+            if shed is job:
+                return False
+        async with self._condition:
+            self._condition.notify_all()
+        return True
+
+    def _may_start(self, job: Dict[str, Any]) -> bool:
+        return job['high_value'] or self.in_flight < self.max_in_flight - self.reserved_slots
+
+    def _next(self) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        while self._pending and self._expired(self._pending[-1][2], now):
+            _, _, expired = self._pending.pop()
+            self.shed_expired += 1
+            logger.warning(f"Request {expired['request_id'].hex()} passed its deadline, shedding")
+            self._shed(expired)
+        if not self._pending or self.in_flight >= self.max_in_flight:
+            return None
+        index = len(self._pending) - 1
+        if not self._may_start(self._pending[index][2]):
+            # Only reserved slots are free: start the best high-value request, defer the rest
+            index = next((i for i in range(index - 1, -1, -1) if self._pending[i][2]['high_value']), None)
+            if index is None:
+                self.deferred += 1
+                return None
+        self.in_flight += 1
+        return self._pending.pop(index)[2]
+
+    async def get(self) -> Dict[str, Any]:
+        """Wait for the highest-ranked request that may start now and mark it in flight"""
+        async with self._condition:
+            while True:
+                job = self._next()
+                if job is not None:
+                    return job
+                await self._condition.wait()
+
+    async def done(self, job: Dict[str, Any], success: bool = True):
+        """Release a started request's slot"""
+        self.in_flight -= 1
+        if success:
+            self.completed += 1
+            self._latencies[job['high_value']].append(time.monotonic() - job['queued_at'])
+        else:
+            self.failed += 1
+        async with self._condition:
+            self._condition.notify_all()
+
+    @property
+    def saturated(self) -> bool:
+        return self.in_flight >= self.max_in_flight - self.reserved_slots
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def latency_percentiles(self, high_value: bool) -> Optional[Dict[str, float]]:
+        """Queue-to-completion latency (ms) of recent requests"""
+        samples = self._latencies[high_value]
+        if not samples:
+            return None
+        ms = np.array(samples) * 1e3
+        return {'p50_ms': float(np.percentile(ms, 50)), 'p99_ms': float(np.percentile(ms, 99)),
+                'samples': len(ms)}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'pending': len(self._pending),
+            'in_flight': self.in_flight,
+            'admitted': self.admitted,
+            'completed': self.completed,
+            'failed': self.failed,
+            'shed_overflow': self.shed_overflow,
+            'shed_expired': self.shed_expired,
+            'deferred': self.deferred,
+            'high_value_latency': self.latency_percentiles(True),
+            'other_latency': self.latency_percentiles(False)
+        }
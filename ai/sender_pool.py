@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional, Union
+
+from src.ai.tx_signer import TransactionSigner, create_executor
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def load_sender_keys() -> List[str]:
+    """Fulfiller keys from ORACLE_PRIVATE_KEYS (comma separated), else ORACLE_PRIVATE_KEY"""
+    keys = [key.strip() for key in os.getenv('ORACLE_PRIVATE_KEYS', '').split(',') if key.strip()]
+    if not keys and os.getenv('ORACLE_PRIVATE_KEY'):
+        keys = [os.getenv('ORACLE_PRIVATE_KEY')]
+    return keys
+
+
+class SenderPool:
+    """Shards fulfillment transactions across several authorized oracle accounts.
+
+    Every account gets its own TransactionSigner, and therefore its own nonce
+    stream, so submissions for different shards never wait on each other.
+    Signing for all accounts shares one worker pool. Requests map to accounts
+    by request id, which is already a keccak hash and so spreads evenly; a
+    background task tracks balances and routes around accounts that drop
+    below `min_balance_wei` until they are topped up.
+
+    Each account must be the oracle owner or authorized with
+    AIOracle.authorizeCaller.
+    """
+
+    def __init__(self, w3, private_keys: List[Union[str, bytes]], workers: Optional[int] = None,
+                 pool: str = 'process', min_balance_wei: int = 10 ** 16, balance_check_interval: float = 30.0):
+        if not private_keys:
+            raise ValueError("SenderPool needs at least one private key")
+        self.w3 = w3
+        self.executor = create_executor(private_keys, workers, pool)
+        self.signers = [TransactionSigner(w3, key, workers, pool, executor=self.executor) for key in private_keys]
+        self.min_balance_wei = min_balance_wei
+        self.balance_check_interval = balance_check_interval
+
+        self.balances: Dict[str, int] = {}
+        self.low_balance: set = set()
+        self.assigned: Dict[str, int] = {signer.address: 0 for signer in self.signers}
+        self._monitor: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_config(cls, w3, private_keys: List[Union[str, bytes]], config: Dict[str, Any]) -> 'SenderPool':
+        return cls(w3, private_keys, workers=config.get('workers'), pool=config.get('pool', 'process'),
+                   min_balance_wei=config.get('min_balance_wei', 10 ** 16),
+                   balance_check_interval=config.get('balance_check_interval', 30.0))
+
+    @property
+    def addresses(self) -> List[str]:
+        return [signer.address for signer in self.signers]
+
+    def signer_for(self, request_id: bytes) -> TransactionSigner:
+        """Account that owns this request's shard, skipping accounts low on funds"""
+        n = len(self.signers)
+        shard = int.from_bytes(bytes(request_id)[-8:], 'big') % n
+        for offset in range(n):
+            signer = self.signers[(shard + offset) % n]
+            if signer.address not in self.low_balance:
+                break
+        else:
+            signer = self.signers[shard]  # Everyone is low; let the node reject it
+        self.assigned[signer.address] += 1
+        return signer
+
+    async def start(self):
+        """Sync every account's nonce, warm the pool and start the balance monitor"""
+        for signer in self.signers:
+            await signer.start()
+        self.check_balances()
+        if self._monitor is None:
+            self._monitor = asyncio.create_task(self._monitor_balances())
+        logger.info(f"Sender pool started with {len(self.signers)} account(s)")
+
+    def check_balances(self):
+        for address in self.addresses:
+            balance = self.w3.eth.get_balance(address)
+            self.balances[address] = balance
+            if balance < self.min_balance_wei:
+                if address not in self.low_balance:
+                    logger.warning(f"Sender {address} balance {balance} below {self.min_balance_wei} wei, "
+                                   f"routing its shard elsewhere")
+                self.low_balance.add(address)
+            elif address in self.low_balance:
+                logger.info(f"Sender {address} topped up, rejoining the pool")
+                self.low_balance.discard(address)
+
+    async def _monitor_balances(self):
+        while True:
+            await asyncio.sleep(self.balance_check_interval)
+            try:
+                self.check_balances()
+            except Exception as e:
+                logger.error(f"Balance check failed: {e}")
+
+    async def close(self):
+        if self._monitor is not None:
+            self._monitor.cancel()
+            self._monitor = None
+        for signer in self.signers:
+            await signer.close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'accounts': len(self.signers),
+            'low_balance': sorted(self.low_balance),
+            'senders': [
+                dict(signer.get_stats(), balance=self.balances.get(signer.address),
+                     assigned=self.assigned[signer.address])
+                for signer in self.signers
+            ]
+        }
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Files next to a model that change what it returns
+_SIDECARS = ('_preprocessing.json', '_confidence.json')
+
+
+def model_version(model_path: str) -> str:
+    """Content hash of a saved model and its sidecars; changes whenever its answers may change"""
+    digest = hashlib.sha256()
+    paths = [model_path]
+    if os.path.isdir(model_path):
+        paths = sorted(os.path.join(root, name) for root, _, names in os.walk(model_path) for name in names)
+    paths += [model_path + suffix for suffix in _SIDECARS if os.path.exists(model_path + suffix)]
+    for path in paths:
+        digest.update(os.path.relpath(path, os.path.dirname(model_path)).encode())
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def canonical_input(input_data) -> bytes:
+    """Bytes that are equal exactly when two inputs are the same feature vector ([1, 2] == [1.0, 2.0])"""
+    try:
+        return np.asarray(input_data, dtype=np.float64).tobytes()
+    except (TypeError, ValueError):
+        return json.dumps(input_data, sort_keys=True, default=str).encode()
+
+
+class SharedPredictionCache:
+    """Second-tier prediction cache shared by every process on a host.
+
+    Backed by SQLite in WAL mode, so any number of bridge and API processes
+    read concurrently while one writes. Each write is a single transaction,
+    which makes it atomic. Entries are keyed by a 16-byte BLAKE2 hash of the
+    model version and the canonical input, so a retrained model never reads
+    another model's answers. Values are float64 arrays of the prediction
+    followed by the confidence.
+
+    The cache holds at most about `max_entries` entries. Every
+    `evict_interval` writes, entries older than the newest `max_entries`
+    are dropped, oldest written first. The file outlives the processes, so
+    a restarted replica starts warm.
+    """
+
+    def __init__(self, db_path: str, version: str, max_entries: int = 1_000_000, evict_interval: int = 256,
+                 synchronous: str = 'NORMAL'):
+        self.db_path = db_path
+        self.version = version.encode()
+        self.max_entries = max_entries
+        self.evict_interval = evict_interval
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evicted = 0
+        self._writes_since_eviction = 0
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._lock = threading.Lock()
+        # seq orders entries by write time for eviction
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS predictions (
+                seq INTEGER PRIMARY KEY,
+                key BLOB NOT NULL UNIQUE,
+                value BLOB NOT NULL
+            )
+        """)
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], version: str) -> Optional['SharedPredictionCache']:
+        if not config.get('enabled'):
+            return None
+        return cls(
+            config.get('db_path', 'cache/predictions.db'),
+            version,
+            max_entries=config.get('max_entries', 1_000_000),
+            evict_interval=config.get('evict_interval', 256),
+            synchronous=config.get('synchronous', 'NORMAL')
+        )
+
+    def key(self, input_data) -> bytes:
+        return hashlib.blake2b(self.version + b'\0' + canonical_input(input_data), digest_size=16).digest()
+
+    @staticmethod
+    def _encode(prediction: List[float], confidence: float) -> bytes:
+        return np.array(list(prediction) + [confidence], dtype=np.float64).tobytes()
+
+    @staticmethod
+    def _decode(value: bytes) -> Tuple[List[float], float]:
+        values = np.frombuffer(value, dtype=np.float64)
+        return values[:-1].tolist(), float(values[-1])
+
+    def get(self, input_data) -> Optional[Tuple[List[float], float]]:
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM predictions WHERE key = ?", (self.key(input_data),)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._decode(row[0])
+
+    def get_many(self, inputs: Sequence) -> List[Optional[Tuple[List[float], float]]]:
+        """Cached results for each input (None on a miss), in one query"""
+        keys = [self.key(input_data) for input_data in inputs]
+        found: Dict[bytes, bytes] = {}
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for i in range(0, len(keys), 900):
+                chunk = keys[i:i + 900]
+                found.update(self.conn.execute(
+                    f"SELECT key, value FROM predictions WHERE key IN ({','.join('?' * len(chunk))})", chunk))
+        results = [self._decode(found[key]) if key in found else None for key in keys]
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return results
+
+    def put(self, input_data, prediction: List[float], confidence: float):
+        self.put_many([(input_data, prediction, confidence)])
+
+    def put_many(self, entries: Iterable[Tuple[Any, List[float], float]]):
+        rows = [(self.key(input_data), self._encode(prediction, confidence))
+                for input_data, prediction, confidence in entries]
+        if not rows:
+            return
+        with self._transaction():
+            self.conn.executemany("INSERT OR REPLACE INTO predictions (key, value) VALUES (?, ?)", rows)
+            self._writes_since_eviction += len(rows)
+            if self._writes_since_eviction >= self.evict_interval:
+                self._evict()
+        self.writes += len(rows)
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def _evict(self):
+        # Rewritten keys leave gaps in seq, so this keeps at most max_entries entries
+        cursor = self.conn.execute(
+            "DELETE FROM predictions WHERE seq <= (SELECT MAX(seq) FROM predictions) - ?", (self.max_entries,))
+        self.evicted += cursor.rowcount
+        self._writes_since_eviction = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+    def clear(self):
+        with self._transaction():
+            self.conn.execute("DELETE FROM predictions")
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'db_path': self.db_path,
+            'version': self.version.decode(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'writes': self.writes,
+            'evicted': self.evicted
+        }
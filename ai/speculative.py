@@ -0,0 +1,223 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from eth_abi import decode
+from eth_utils import keccak, to_checksum_address
+from web3.exceptions import TransactionNotFound
+
+from src.ai.log_decoder import LogDecoder
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+REQUEST_SELECTOR = keccak(text='requestPrediction(bytes)')[:4]
+
+
+def decode_request_calldata(calldata: bytes) -> Optional[bytes]:
+    """inputData of an AIContract.requestPrediction(bytes) call, or None for any other call"""
+    calldata = bytes(calldata)
+    if calldata[:4] != REQUEST_SELECTOR:
+        return None
+    try:
+        return decode(['bytes'], calldata[4:])[0]
+    except Exception:
+        return None
+
+
+class SpeculativeExecutor:
+    """Runs inference on requestPrediction transactions while they are still pending.
+
+    Pending transactions to AIContract are read from a pending-transaction
+    filter. Their calldata is decoded and the prediction is staged under the
+    transaction hash. The request id hashes the block timestamp, so it is
+    only known once the transaction is mined. Each poll reads the oracle's
+    PredictionRequested logs from new blocks, and every staged transaction
+    found there is released straight away with its precomputed answer.
+    Only signing and sending remain on the critical path.
+
+    Staged results are discarded when their transaction disappears from the
+    node (dropped or replaced), when it is mined without emitting a request
+    (reverted, e.g. an insufficient fee), or after `max_age` seconds.
+    """
+
+    def __init__(self, w3, ai_contract_address: str, oracle_address: str, request_logs: LogDecoder,
+                 predict: Callable[[bytes], Tuple[int, int]], max_staged: int = 10000,
+                 drop_check_interval: float = 5.0, max_age: float = 600.0):
+        self.w3 = w3
+        self.ai_contract_address = to_checksum_address(ai_contract_address)
+        self.oracle_address = to_checksum_address(oracle_address)
+        self.request_logs = request_logs
+        self.predict = predict
+        self.max_staged = max_staged
+        self.drop_check_interval = drop_check_interval
+        self.max_age = max_age
+
+        # tx hash -> {'input_data', 'result', 'staged_at', 'checked_at'}
+        self.staged: Dict[bytes, Dict[str, Any]] = {}
+        # Request ids released here; the regular path must not fulfill them again
+        self._released: 'OrderedDict[bytes, None]' = OrderedDict()
+        self._seen: 'OrderedDict[bytes, None]' = OrderedDict()
+        self._filter = None
+        self._last_block: Optional[int] = None
+
+        self.predicted = 0
+        self.released = 0
+        self.dropped = 0
+        self.reverted = 0
+        self.expired = 0
+        self.overtaken = 0
+        self.failed_predictions = 0
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], w3, ai_contract_address: str, oracle_address: str,
+                    request_logs: LogDecoder, predict: Callable[[bytes], Tuple[int, int]]) -> Optional['SpeculativeExecutor']:
+        if not config.get('enabled'):
+            return None
+        return cls(
+            w3, ai_contract_address, oracle_address, request_logs, predict,
+            max_staged=config.get('max_staged', 10000),
+            drop_check_interval=config.get('drop_check_interval', 5.0),
+            max_age=config.get('max_age', 600.0)
+        )
+
+    @staticmethod
+    def _remember(entries: 'OrderedDict[bytes, None]', key: bytes, limit: int):
+        entries[key] = None
+        if len(entries) > limit:
+            entries.popitem(last=False)
+
+    def poll_pending(self) -> int:
+        """Stage predictions for new pending requestPrediction transactions; returns how many"""
+        if self._filter is None:
+            self._filter = self.w3.eth.filter('pending')
+        try:
+            hashes = self._filter.get_new_entries()
+        except ValueError:
+            # Nodes expire idle filters; start a new one
+            self._filter = self.w3.eth.filter('pending')
+            return 0
+
+        staged = 0
+        for tx_hash in hashes:
+            tx_hash = bytes(tx_hash)
+            # Some nodes report a transaction more than once
+            if tx_hash in self._seen:
+                continue
+            self._remember(self._seen, tx_hash, self.max_staged * 4)
+            if len(self.staged) >= self.max_staged:
+                break
+            try:
+                tx = self.w3.eth.get_transaction(tx_hash)
+            except TransactionNotFound:
+                continue
+            if tx['to'] != self.ai_contract_address or tx.get('blockNumber') is not None:
+                continue
+            input_data = decode_request_calldata(tx['input'])
+            if input_data is None:
+                continue
+            try:
+                result = self.predict(input_data)
+            except Exception as e:
+                # The regular path will report it once the request is mined
+                self.failed_predictions += 1
+                logger.debug(f"Speculative prediction failed for {tx_hash.hex()}: {e}")
+                continue
+            now = time.monotonic()
+            self.staged[tx_hash] = {'input_data': input_data, 'result': result, 'staged_at': now, 'checked_at': now}
+            self.predicted += 1
+            staged += 1
+        return staged
+
+    def poll_mined(self) -> List[Tuple[Dict[str, Any], Tuple[int, int]]]:
+        """Requests mined since the last poll whose answers are staged: [(event, (prediction, confidence))]"""
+        head = self.w3.eth.block_number
+        if self._last_block is None:
+            self._last_block = head
+            return []
+        if head <= self._last_block:
+            return []
+        events = self.request_logs.get_logs(self.w3, self.oracle_address, self._last_block + 1, head)
+        self._last_block = head
+
+        ready = []
+        for event in events:
+            staged = self.staged.pop(bytes(event['transactionHash']), None)
+            if staged is None or staged['input_data'] != bytes(event['args']['inputData']):
+                continue
+            self._remember(self._released, bytes(event['args']['requestId']), self.max_staged * 4)
+            ready.append((event, staged['result']))
+        return ready
+
+    def discard_stale(self):
+        """Drop staged results whose transaction was dropped, reverted or has been pending too long"""
+        now = time.monotonic()
+        for tx_hash, staged in list(self.staged.items()):
+            if now - staged['staged_at'] > self.max_age:
+                del self.staged[tx_hash]
+                self.expired += 1
+                continue
+            if now - staged['checked_at'] < self.drop_check_interval:
+                continue
+            staged['checked_at'] = now
+            try:
+                tx = self.w3.eth.get_transaction(tx_hash)
+            except TransactionNotFound:
+                tx = None
+            if tx is None:
+                del self.staged[tx_hash]
+                self.dropped += 1
+                logger.info(f"Pending request {tx_hash.hex()} was dropped, discarding its speculative result")
+            elif tx.get('blockNumber') is not None and self._last_block is not None \
+                    and tx['blockNumber'] <= self._last_block:
+                # Mined in a block already scanned, yet no request was logged: it reverted
+                del self.staged[tx_hash]
+                self.reverted += 1
+
+    def unreleased(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """The events the regular path still has to fulfill.
+
+        Their staged results are dropped, so a request is never released
+        here after the regular path has taken it.
+        """
+        remaining = []
+        for event in events:
+            if bytes(event['args']['requestId']) in self._released:
+                continue
+            if self.staged.pop(bytes(event['transactionHash']), None) is not None:
+                self.overtaken += 1
+            remaining.append(event)
+        return remaining
+
+    def forget(self, request_id: bytes):
+        """Hand a released request back to the regular path, e.g. after its submission failed"""
+        self._released.pop(bytes(request_id), None)
+
+    async def run(self, release: Callable[[Dict[str, Any], Tuple[int, int]], Awaitable[None]],
+                  poll_interval: float = 0.25):
+        """Watch pending and mined requests until cancelled, calling `release` for each staged one that lands"""
+        while True:
+            try:
+                self.poll_pending()
+                ready = self.poll_mined()
+                self.discard_stale()
+                if ready:
+                    self.released += len(ready)
+                    await asyncio.gather(*(release(event, result) for event, result in ready))
+            except Exception as e:
+                logger.error(f"Speculative execution poll failed: {e}")
+            await asyncio.sleep(poll_interval)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'staged': len(self.staged),
+            'predicted': self.predicted,
+            'released': self.released,
+            'dropped': self.dropped,
+            'reverted': self.reverted,
+            'expired': self.expired,
+            'overtaken': self.overtaken,
+            'failed_predictions': self.failed_predictions
+        }
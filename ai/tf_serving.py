@@ -0,0 +1,103 @@
+import logging
+import time
+from typing import Any, Dict, Iterable, Optional
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (1, 8, 32, 128)
+
+
+def configure_threads(intra_op_threads: Optional[int] = None, inter_op_threads: Optional[int] = None):
+    """Size TensorFlow's thread pools; only takes effect before the runtime starts (i.e. before loading a model)"""
+    import tensorflow as tf
+
+    try:
+        if intra_op_threads:
+            tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+        if inter_op_threads:
+            tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+    except RuntimeError as e:
+        # The runtime was already initialized, e.g. by an earlier model in this process
+        logger.warning(f"Could not configure TensorFlow thread pools: {e}")
+
+
+class TracedKerasModel:
+    """Keras model served through tf.function graphs traced for fixed batch sizes.
+
+    `model.predict` builds a data adapter and runs a callback loop on every
+    call, which dominates single-row latency, and the first call traces the
+    graph while a request waits. Here one concrete function is traced per
+    bucket size with a fixed input signature, all of them at load time, and
+    each batch is zero-padded up to the nearest bucket (larger batches are
+    split into chunks of the largest bucket), so serving never retraces.
+    """
+
+    def __init__(self, model, buckets: Iterable[int] = DEFAULT_BUCKETS, warmup: bool = True):
+        import tensorflow as tf
+
+        self.model = model
+        self.buckets = sorted(set(int(b) for b in buckets))
+        if not self.buckets or self.buckets[0] < 1:
+            raise ValueError("buckets must be positive batch sizes")
+        self.n_features = int(model.input_shape[-1])
+
+        def forward(x):
+            return model(x, training=False)
+
+        self._functions = {
+            bucket: tf.function(forward, input_signature=[tf.TensorSpec([bucket, self.n_features], tf.float32)])
+            .get_concrete_function()
+            for bucket in self.buckets
+        }
+        self.calls = {bucket: 0 for bucket in self.buckets}
+        self.rows = 0
+        self.padded_rows = 0
+        self.warmup_seconds = self.warmup() if warmup else None
+
+    @classmethod
+    def from_config(cls, model, config: Dict[str, Any]) -> 'TracedKerasModel':
+        return cls(model, buckets=config.get('buckets', DEFAULT_BUCKETS), warmup=config.get('warmup', True))
+
+    def warmup(self) -> float:
+        """Run every bucket once so first requests don't pay for graph or kernel initialization"""
+        start = time.perf_counter()
+        for bucket, fn in self._functions.items():
+            fn(np.zeros((bucket, self.n_features), dtype=np.float32))
+        seconds = time.perf_counter() - start
+        logger.info(f"Warmed {len(self.buckets)} serving bucket(s) {self.buckets} in {seconds:.2f}s")
+        return seconds
+
+    def _bucket_for(self, n: int) -> int:
+        return next(bucket for bucket in self.buckets if bucket >= n)
+
+    def _run(self, X: np.ndarray) -> np.ndarray:
+        n = len(X)
+        bucket = self._bucket_for(n)
+        if bucket != n:
+            padded = np.zeros((bucket, self.n_features), dtype=np.float32)
+            padded[:n] = X
+            X = padded
+        self.calls[bucket] += 1
+        self.padded_rows += bucket - n
+        return self._functions[bucket](X).numpy()[:n]
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Same outputs as model.predict(X)"""
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        self.rows += len(X)
+        largest = self.buckets[-1]
+        if len(X) <= largest:
+            return self._run(X)
+        return np.concatenate([self._run(X[i:i + largest]) for i in range(0, len(X), largest)])
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'buckets': self.buckets,
+            'calls_per_bucket': dict(self.calls),
+            'rows': self.rows,
+            'padding_overhead': self.padded_rows / self.rows if self.rows else 0.0,
+            'warmup_seconds': self.warmup_seconds
+        }
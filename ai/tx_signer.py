@@ -0,0 +1,203 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from eth_account import Account
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Per-process signing accounts by address, set up by _init_worker
+_worker_accounts = {}
+
+
+def _init_worker(private_keys: List[Union[str, bytes]]):
+    """Load the signing keys once per pool process instead of shipping them with every task"""
+    for private_key in private_keys:
+        account = Account.from_key(private_key)
+        _worker_accounts[account.address] = account
+
+
+def _sign(transaction: Dict[str, Any], account=None) -> Tuple[bytes, bytes]:
+    """Sign a fully built transaction (as its 'from' account); returns (raw transaction, transaction hash)"""
+    account = account or _worker_accounts[transaction['from']]
+    signed = account.sign_transaction(transaction)
+    return bytes(signed.raw_transaction), bytes(signed.hash)
+
+
+def create_executor(private_keys: List[Union[str, bytes]], workers: Optional[int] = None,
+                    pool: str = 'process') -> Executor:
+    """Signing pool for one or more accounts; process workers hold every key"""
+    workers = workers or os.cpu_count() or 1
+    if pool == 'process':
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_init_worker, initargs=(list(private_keys),))
+    if pool == 'thread':
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tx-signer')
+    raise ValueError(f"Unsupported signer pool: {pool}")
+
+
+class _Pending:
+    __slots__ = ('transaction', 'signed', 'result')
+
+    def __init__(self, transaction: Dict[str, Any], signed: asyncio.Future, result: asyncio.Future):
+        self.transaction = transaction
+        self.signed = signed
+        self.result = result
+
+
+class TransactionSigner:
+    """Signs transactions in a worker pool and sends them in nonce order.
+
+    Nonces are reserved on the event loop as soon as a transaction is
+    submitted, so signing for many transactions proceeds in parallel while a
+    single sender task streams the signed payloads to send_raw_transaction in
+    nonce order. If a transaction fails to sign or send, the ones queued
+    behind it are re-signed from the account's pending nonce so the sequence
+    never has a gap.
+
+    ``pool='process'`` (default) sidesteps the GIL for pure-Python secp256k1;
+    ``pool='thread'`` avoids process start-up where coincurve is installed.
+    """
+
+    def __init__(self, w3, private_key: Union[str, bytes], workers: Optional[int] = None, pool: str = 'process',
+                 executor: Optional[Executor] = None):
+        self.w3 = w3
+        self.account = Account.from_key(private_key)
+        self.address = self.account.address
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = pool
+
+        # A shared executor (see SenderPool) is owned, and shut down, by the caller
+        self._owns_executor = executor is None
+        self.executor = executor or create_executor([private_key], self.workers, pool)
+        self._sign_args: Tuple = (self.account,) if pool == 'thread' else ()
+
+        self._queue: List[_Pending] = []
+        self._next_nonce: Optional[int] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._sender: Optional[asyncio.Task] = None
+
+        self.signed_count = 0
+        self.sent_count = 0
+        self.failed_count = 0
+
+    @classmethod
+    def from_config(cls, w3, private_key: Union[str, bytes], config: Dict[str, Any]) -> 'TransactionSigner':
+        return cls(w3, private_key, workers=config.get('workers'), pool=config.get('pool', 'process'))
+
+    async def start(self):
+        """Sync the nonce, warm the pool and start the sender task"""
+        if self._sender is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._next_nonce = self.w3.eth.get_transaction_count(self.address, 'pending')
+        self._wakeup = asyncio.Event()
+
+        # Pay worker start-up (imports, key loading) before the first real request
+        warmup = {'from': self.address, 'to': self.address, 'value': 0, 'gas': 21000, 'gasPrice': 1, 'nonce': 0, 'chainId': 1}
+        await asyncio.gather(*(loop.run_in_executor(self.executor, _sign, warmup, *self._sign_args)
+                               for _ in range(self.workers)))
+
+        self._sender = asyncio.create_task(self._send_loop())
+        logger.info(f"Transaction signer started: {self.workers} {self.pool} worker(s), "
+                    f"next nonce {self._next_nonce}")
+
+    def _sign_async(self, transaction: Dict[str, Any]) -> asyncio.Future:
+        return asyncio.get_running_loop().run_in_executor(self.executor, _sign, transaction, *self._sign_args)
+
+    async def submit(self, transaction: Dict[str, Any]) -> bytes:
+        """Reserve a nonce, sign in the pool and wait until the transaction is sent; returns its hash"""
+        if self._sender is None:
+            await self.start()
+
+        if self._next_nonce is None:
+            # Lost track of the nonce after the node failed mid-resequence
+            self._next_nonce = self.w3.eth.get_transaction_count(self.address, 'pending')
+        transaction = dict(transaction, nonce=self._next_nonce)
+        transaction['from'] = self.address
+        self._next_nonce += 1
+        pending = _Pending(transaction, self._sign_async(transaction), asyncio.get_running_loop().create_future())
+        self._queue.append(pending)
+        self._wakeup.set()
+        return await pending.result
+
+    async def _send_loop(self):
+        while True:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            pending = self._queue[0]
+            try:
+                raw_transaction, _ = await pending.signed
+                self.signed_count += 1
+
+                tx_hash = self.w3.eth.send_raw_transaction(raw_transaction)
+                self._queue.pop(0)
+                self.sent_count += 1
+                pending.result.set_result(bytes(tx_hash))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._queue.pop(0)
+                self.failed_count += 1
+                logger.error(f"Transaction with nonce {pending.transaction['nonce']} failed: {e}")
+                if not pending.result.done():
+                    pending.result.set_exception(e)
+                try:
+                    self._resequence()
+                except Exception as resequence_error:
+                    # Usually the node is unreachable, which is why the send failed too.
+                    # The queued nonces can't be trusted; fail them and re-sync on the next submit
+                    logger.error(f"Could not re-read the nonce after a failed send: {resequence_error}")
+                    self._next_nonce = None
+                    self._fail_queued(resequence_error)
+
+    def _fail_queued(self, error: BaseException):
+        """Resolve every queued transaction's future with `error`"""
+        queued, self._queue = self._queue, []
+        for pending in queued:
+            self.failed_count += 1
+            if not pending.result.done():
+                pending.result.set_exception(error)
+
+    def _resequence(self):
+        """Re-sign everything still queued from the account's pending nonce"""
+        nonce = self.w3.eth.get_transaction_count(self.address, 'pending')
+        for pending in self._queue:
+            pending.transaction = dict(pending.transaction, nonce=nonce)
+            pending.signed = self._sign_async(pending.transaction)
+            nonce += 1
+        self._next_nonce = nonce
+        if self._queue:
+            logger.warning(f"Re-signed {len(self._queue)} queued transaction(s) after a nonce gap")
+
+    async def close(self):
+        """Stop the sender task, fail anything still queued and shut down the pool"""
+        if self._sender is not None:
+            self._sender.cancel()
+            try:
+                await self._sender
+            except asyncio.CancelledError:
+                pass
+            self._sender = None
+        self._fail_queued(RuntimeError("Transaction signer closed before sending"))
+        if self._owns_executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'address': self.address,
+            'pool': self.pool,
+            'workers': self.workers,
+            'next_nonce': self._next_nonce,
+            'queued': len(self._queue),
+            'signed': self.signed_count,
+            'sent': self.sent_count,
+            'failed': self.failed_count
+        }
@@ -0,0 +1,219 @@
+import logging
+import os
+import random
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class WorkQueue:
+    """Durable queue between event ingestion and fulfillment.
+
+    Backed by SQLite in WAL mode. The scanner enqueues each block range's
+    requests together with its cursor in one transaction, so a request is on
+    disk before the scanner moves past it and a restarted bridge resumes
+    from the cursor. Workers lease jobs with `dequeue` and `ack` them only
+    once the fulfillment is confirmed on chain; `retry` re-schedules a job
+    with exponential backoff and moves it to the dead-letter table after
+    `max_attempts`. Leases left behind by a crashed worker become visible
+    again after `visibility_timeout`.
+
+    synchronous=NORMAL survives process crashes; use FULL to also survive
+    power loss at the cost of an fsync per commit.
+    """
+
+    def __init__(self, db_path: str = 'work_queue.db', max_attempts: int = 5, base_delay: float = 1.0,
+                 max_delay: float = 300.0, visibility_timeout: float = 300.0, synchronous: str = 'NORMAL'):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.visibility_timeout = visibility_timeout
+
+        self.enqueued = 0
+        self.acked = 0
+        self.retried = 0
+        self.dead_lettered = 0
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._create_tables()
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'WorkQueue':
+        return cls(
+            db_path=config.get('db_path', 'work_queue.db'),
+            max_attempts=config.get('max_attempts', 5),
+            base_delay=config.get('base_delay', 1.0),
+            max_delay=config.get('max_delay', 300.0),
+            visibility_timeout=config.get('visibility_timeout', 300.0),
+            synchronous=config.get('synchronous', 'NORMAL')
+        )
+
+    def _create_tables(self):
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                request_id BLOB PRIMARY KEY,
+                input_data BLOB NOT NULL,
+                block_number INTEGER,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL,
+                leased_until REAL,
+                last_error TEXT,
+                created REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_available ON jobs (available_at);
+            CREATE TABLE IF NOT EXISTS dead_letters (
+                request_id BLOB PRIMARY KEY,
+                input_data BLOB NOT NULL,
+                block_number INTEGER,
+                attempts INTEGER NOT NULL,
+                error TEXT,
+                failed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER
+            );
+        """)
+
+    @contextmanager
+    def _transaction(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    @property
+    def cursor(self) -> Optional[int]:
+        """Last block whose requests have all been enqueued"""
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'cursor'").fetchone()
+        return row[0] if row else None
+
+    def enqueue(self, request_id: bytes, input_data: bytes, block_number: Optional[int] = None) -> bool:
+        return self.enqueue_many([(request_id, input_data, block_number)]) == 1
+
+    def enqueue_many(self, items: Iterable[Tuple[bytes, bytes, Optional[int]]], cursor: Optional[int] = None) -> int:
+        """Record requests (idempotently) and advance the cursor in one commit; returns how many were new"""
+        now = time.time()
+        with self._transaction():
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO jobs (request_id, input_data, block_number, available_at, created) "
+                "SELECT ?, ?, ?, ?, ? WHERE NOT EXISTS (SELECT 1 FROM dead_letters WHERE request_id = ?)",
+                [(bytes(rid), bytes(data), block, now, now, bytes(rid)) for rid, data, block in items]
+            )
+            added = self.conn.total_changes - before
+            if cursor is not None:
+                self.conn.execute("INSERT INTO meta (key, value) VALUES ('cursor', ?) "
+                                  "ON CONFLICT(key) DO UPDATE SET value = MAX(value, excluded.value)", (cursor,))
+        self.enqueued += added
+        return added
+
+    def dequeue(self, limit: int = 1) -> List[Dict[str, Any]]:
+        """Lease up to `limit` due jobs, oldest first"""
+        now = time.time()
+        with self._transaction():
+            rows = self.conn.execute(
+                "SELECT request_id, input_data, block_number, attempts FROM jobs "
+                "WHERE available_at <= ? AND (leased_until IS NULL OR leased_until < ?) "
+                "ORDER BY available_at LIMIT ?", (now, now, limit)
+            ).fetchall()
+            self.conn.executemany(
+                "UPDATE jobs SET attempts = attempts + 1, leased_until = ? WHERE request_id = ?",
+                [(now + self.visibility_timeout, row[0]) for row in rows]
+            )
+        return [
+            {'request_id': rid, 'input_data': data, 'block_number': block, 'attempts': attempts + 1}
+            for rid, data, block, attempts in rows
+        ]
+
+    def ack(self, request_id: bytes):
+        """Done: the fulfillment is confirmed on chain (or no longer needed)"""
+        self.conn.execute("DELETE FROM jobs WHERE request_id = ?", (bytes(request_id),))
+        self.acked += 1
+
+    def retry(self, request_id: bytes, error: str) -> bool:
+        """Release the lease with backoff; returns False if the job was dead-lettered instead"""
+        row = self.conn.execute("SELECT attempts FROM jobs WHERE request_id = ?", (bytes(request_id),)).fetchone()
+        if row is None:
+            return False
+        attempts = row[0]
+        if attempts >= self.max_attempts:
+            self.dead_letter(request_id, error)
+            return False
+
+        # Full jitter keeps retries of one failing burst from landing together
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempts - 1)))
+        self.conn.execute("UPDATE jobs SET available_at = ?, leased_until = NULL, last_error = ? "
+                          "WHERE request_id = ?", (time.time() + delay, error, bytes(request_id)))
+        self.retried += 1
+        logger.warning(f"Retrying {bytes(request_id).hex()} in {delay:.1f}s (attempt {attempts}): {error}")
+        return True
+
+    def dead_letter(self, request_id: bytes, error: str):
+        """Move a job that cannot succeed out of the queue"""
+        with self._transaction():
+            self.conn.execute(
+                "INSERT OR REPLACE INTO dead_letters (request_id, input_data, block_number, attempts, error, failed_at) "
+                "SELECT request_id, input_data, block_number, attempts, ?, ? FROM jobs WHERE request_id = ?",
+                (error, time.time(), bytes(request_id))
+            )
+            self.conn.execute("DELETE FROM jobs WHERE request_id = ?", (bytes(request_id),))
+        self.dead_lettered += 1
+        logger.error(f"Dead-lettered {bytes(request_id).hex()}: {error}")
+
+    def recover(self) -> int:
+        """Release leases held by a previous run of this process; returns how many"""
+        return self.conn.execute("UPDATE jobs SET leased_until = NULL WHERE leased_until IS NOT NULL").rowcount
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        rows = self.conn.execute("SELECT request_id, input_data, block_number, attempts, error, failed_at "
+                                 "FROM dead_letters ORDER BY failed_at DESC LIMIT ?", (limit,)).fetchall()
+        keys = ('request_id', 'input_data', 'block_number', 'attempts', 'error', 'failed_at')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def requeue_dead_letter(self, request_id: bytes) -> bool:
+        """Give a dead-lettered job a fresh set of attempts (e.g. after a model fix)"""
+        now = time.time()
+        with self._transaction():
+            moved = self.conn.execute(
+                "INSERT OR IGNORE INTO jobs (request_id, input_data, block_number, available_at, created) "
+                "SELECT request_id, input_data, block_number, ?, ? FROM dead_letters WHERE request_id = ?",
+                (now, now, bytes(request_id))
+            ).rowcount
+            self.conn.execute("DELETE FROM dead_letters WHERE request_id = ?", (bytes(request_id),))
+        return bool(moved)
+
+    def unfinished(self) -> List[Tuple[bytes, Optional[int]]]:
+        """(request id, block number) of every job not yet acked or dead-lettered"""
+        return [(bytes(rid), block) for rid, block in self.conn.execute("SELECT request_id, block_number FROM jobs")]
+
+    def depth(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'depth': self.depth(),
+            'dead_letters': self.conn.execute("SELECT COUNT(*) FROM dead_letters").fetchone()[0],
+            'cursor': self.cursor,
+            'enqueued': self.enqueued,
+            'acked': self.acked,
+            'retried': self.retried,
+            'dead_lettered': self.dead_lettered
+        }
+
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Benchmark training throughput with and without checkpoint stalls.
+
+Trains the same AIModel on synthetic regression data three ways:
+  - none: no checkpointing;
+  - sync: the previous behavior, a Keras ModelCheckpoint writing the full
+    model to one HDF5 file whenever val_loss improves;
+  - async: CheckpointManager keeping the top --keep checkpoints, written by
+    its background thread.
+Reports training steps/sec, how long each epoch end blocked on the
+checkpoint callback, and how many checkpoints were written. Short epochs
+(--steps-per-epoch) of a wide model (--hidden-units) make checkpoints a
+visible share of training time, as in long runs that checkpoint often.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+import tensorflow as tf
+
+from src.ai.model import AIModel
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class StepTimer(tf.keras.callbacks.Callback):
+    """Counts training steps and wall time spent inside fit()"""
+
+    def on_train_begin(self, logs=None):
+        self.steps = 0
+        self.start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        self.steps += 1
+
+    def on_train_end(self, logs=None):
+        self.elapsed = time.perf_counter() - self.start
+
+    @property
+    def steps_per_sec(self):
+        return self.steps / self.elapsed if self.elapsed else 0.0
+
+
+class StallTimer(tf.keras.callbacks.Callback):
+    """Placed on both sides of a checkpoint callback: time each epoch end spends inside it"""
+
+    def __init__(self, stalls, start):
+        super().__init__()
+        self.stalls = stalls
+        self.start = start
+
+    def on_epoch_end(self, epoch, logs=None):
+        if self.start:
+            self.stalls.append(-time.perf_counter())
+        else:
+            self.stalls[-1] += time.perf_counter()
+
+
+class SaveCounter(tf.keras.callbacks.Callback):
+    """Counts ModelCheckpoint writes by watching the file's mtime"""
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.saves = 0
+        self.mtime = None
+
+    def on_epoch_end(self, epoch, logs=None):
+        mtime = os.path.getmtime(self.path) if os.path.exists(self.path) else None
+        if mtime is not None and mtime != self.mtime:
+            self.saves += 1
+            self.mtime = mtime
+
+
+def run_mode(mode, args, X, y, X_val, y_val, workdir):
+    model = AIModel(X.shape[1], 1, model_type='regression', hidden_units=args.hidden_units,
+                    dropout_rates=0.1, calibration=None)
+    timer, stalls, counter = StepTimer(), [], None
+
+    if mode == 'sync':
+        checkpoint_path = os.path.join(workdir, 'best_model.h5')
+        counter = SaveCounter(checkpoint_path)
+        checkpoint = tf.keras.callbacks.ModelCheckpoint(checkpoint_path, save_best_only=True, monitor='val_loss')
+        model._build_callbacks = lambda *a, **kw: [StallTimer(stalls, True), checkpoint,
+                                                   StallTimer(stalls, False), counter, timer]
+    else:
+        build_callbacks = model._build_callbacks
+
+        def callbacks(checkpoint_path, keep_checkpoints, monitor):
+            built = build_callbacks(checkpoint_path, keep_checkpoints, monitor)
+            if checkpoint_path:
+                # The checkpoint callback comes first, ahead of early stopping
+                built = [StallTimer(stalls, True), built[0], StallTimer(stalls, False)] + built[1:]
+            return built + [timer]
+
+        model._build_callbacks = callbacks
+
+    started = time.perf_counter()
+    model.train(X, y, X_val, y_val, epochs=args.epochs, batch_size=args.batch_size,
+                checkpoint_path=os.path.join(workdir, 'checkpoints') if mode == 'async' else None,
+                keep_checkpoints=args.keep, verbose=0)
+    total = time.perf_counter() - started
+
+    row = {
+        'steps': timer.steps,
+        'steps_per_sec': round(timer.steps_per_sec, 1),
+        'train_seconds': round(total, 2),
+        'epoch_end_stall_ms': {
+            'mean': round(float(np.mean(stalls)) * 1e3, 2) if stalls else 0.0,
+            'max': round(float(np.max(stalls)) * 1e3, 2) if stalls else 0.0,
+            'total_s': round(float(np.sum(stalls)), 3) if stalls else 0.0
+        }
+    }
+    if mode == 'sync':
+        row['checkpoints_written'] = counter.saves
+    elif mode == 'async':
+        stats = model.checkpoints.get_stats()
+        row['checkpoints_written'] = stats['saved']
+        row['checkpoints_kept'] = stats['kept']
+        row['background_write_seconds'] = stats['write_seconds']
+        model.checkpoints.close()
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark training steps/sec with and without checkpoint stalls')
+    parser.add_argument('--epochs', type=int, default=30)
+    parser.add_argument('--steps-per-epoch', type=int, default=5, help='Training batches per epoch')
+    parser.add_argument('--batch-size', type=int, default=128)
+    parser.add_argument('--features', type=int, default=64)
+    parser.add_argument('--hidden-units', type=int, nargs='+', default=[2048, 2048, 1024])
+    parser.add_argument('--keep', type=int, default=3, help='Checkpoints kept by the async manager')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_results/checkpointing.json')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    n = args.steps_per_epoch * args.batch_size
+    X = rng.normal(size=(n + n // 4, args.features)).astype(np.float32)
+    w = rng.normal(size=args.features).astype(np.float32)
+    y = (X @ w + rng.normal(scale=0.5, size=len(X))).astype(np.float32)
+    X, X_val, y, y_val = X[:n], X[n:], y[:n], y[n:]
+
+    logging.getLogger('src.ai.model').setLevel(logging.WARNING)
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in ('none', 'sync', 'async'):
+            workdir = os.path.join(tmp, mode)
+            os.makedirs(workdir)
+            results[mode] = run_mode(mode, args, X, y, X_val, y_val, workdir)
+
+    logger.info("=" * 60)
+    logger.info(f"{args.epochs} epochs x {args.steps_per_epoch} steps, hidden units {args.hidden_units}")
+    for mode, row in results.items():
+        stall = row['epoch_end_stall_ms']
+        line = (f"{mode}: {row['steps_per_sec']} steps/s ({row['train_seconds']}s); "
+                f"epoch-end stall mean {stall['mean']}ms, max {stall['max']}ms, total {stall['total_s']}s")
+        if 'checkpoints_written' in row:
+            line += f"; {row['checkpoints_written']} checkpoints written"
+        logger.info(line)
+    logger.info("=" * 60)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({'config': vars(args), 'results': results}, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
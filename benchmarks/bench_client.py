@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Benchmark the async prediction client against the per-request flow.
+
+Deploys AIOracle/AIContract to an in-process EVM (or --rpc-url), runs
+AIOraculeBridge to fulfill requests, and submits --requests predictions
+two ways:
+  - sequential: test_bsc_interaction.py's flow, one request at a time
+    (estimate gas, read the nonce, sign, send, wait for the receipt, poll
+    getPrediction until fulfilled);
+  - client: PredictionClient sending one requestPrediction per input
+    concurrently, with local nonces, reading answers from the oracle's
+    PredictionFulfilled logs.
+Requester calls get --rpc-latency added, as to a remote node; the bridge
+talks to the chain directly. Reports submit requests/s, RPC calls and
+request gas per prediction, and the time until the
+last answer arrived. The in-process bridge shares the event loop with the
+requester, so it only fulfills while the requester awaits.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from web3 import AsyncWeb3, AsyncHTTPProvider, EthereumTesterProvider, Web3
+from web3.logs import DISCARD
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).parent))
+
+from local_chain import bridge_config, connect, deploy_contracts, train_demo_model
+from src.ai.client import PredictionClient, encode_input
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class RpcLink:
+    """Requester-side connection to the chain: adds --rpc-latency to every call and counts calls"""
+
+    def __init__(self, w3, rpc_url, latency):
+        self.rpc_url = rpc_url
+        self.tester = None if rpc_url else w3.provider.ethereum_tester
+        self.latency = latency
+        self.calls = 0
+
+    def sync_web3(self):
+        if self.rpc_url:
+            provider = Web3.HTTPProvider(self.rpc_url)
+        else:
+            provider = EthereumTesterProvider(ethereum_tester=self.tester)
+        make_request = provider.make_request
+
+        def delayed(method, params):
+            self.calls += 1
+            time.sleep(self.latency)
+            return make_request(method, params)
+
+        provider.make_request = delayed
+        return Web3(provider)
+
+    def async_web3(self):
+        if self.rpc_url:
+            provider = AsyncHTTPProvider(self.rpc_url)
+        else:
+            from web3.providers.eth_tester import AsyncEthereumTesterProvider
+            provider = AsyncEthereumTesterProvider()
+            provider.ethereum_tester = self.tester
+        make_request = provider.make_request
+
+        async def delayed(method, params):
+            self.calls += 1
+            await asyncio.sleep(self.latency)
+            return await make_request(method, params)
+
+        provider.make_request = delayed
+        return AsyncWeb3(provider)
+
+
+def submit_sequential(w3, ai_contract, key, inputs):
+    """test_bsc_interaction.py's flow for each input; returns request ids and request gas"""
+    account = w3.eth.account.from_key(key)
+    fee = ai_contract.functions.predictionFee().call()
+    request_ids, gas = [], 0
+    for input_data in inputs:
+        function = ai_contract.functions.requestPrediction(encode_input(input_data))
+        gas_estimate = function.estimate_gas({'from': account.address, 'value': fee})
+        transaction = function.build_transaction({
+            'from': account.address,
+            'value': fee,
+            'gas': int(gas_estimate * 1.2),
+            'gasPrice': w3.eth.gas_price,
+            'nonce': w3.eth.get_transaction_count(account.address),
+        })
+        tx_hash = w3.eth.send_raw_transaction(account.sign_transaction(transaction).raw_transaction)
+        receipt = w3.eth.wait_for_transaction_receipt(tx_hash, poll_latency=0.05)
+        gas += receipt.gasUsed
+        events = ai_contract.events.PredictionRequested().process_receipt(receipt, errors=DISCARD)
+        request_ids.append(events[0]['args']['requestId'])
+    return request_ids, gas
+
+
+async def run_mode(name, args, w3, oracle, ai_contract, keys, inputs, model_path):
+    """Submit `inputs` while a bridge fulfills them, then wait for every answer"""
+    from src.ai.oracle_bridge import AIOraculeBridge
+
+    bridge = AIOraculeBridge(config=bridge_config(w3, oracle, model_path, 'sklearn', args.poll_interval), w3=w3)
+    bridge_task = asyncio.create_task(bridge.start_listening())
+    await asyncio.sleep(0)
+
+    link = RpcLink(w3, args.rpc_url, args.rpc_latency / 1000)
+    client = None
+    try:
+        started = time.perf_counter()
+        if name == 'sequential':
+            requester_w3 = link.sync_web3()
+            requester_contract = requester_w3.eth.contract(address=ai_contract.address, abi=ai_contract.abi)
+            request_ids, gas = submit_sequential(requester_w3, requester_contract, keys[1], inputs)
+        else:
+            client = PredictionClient(link.async_web3(), ai_contract.address, oracle.address, keys[1],
+                                      ai_contract.abi, oracle.abi, poll_interval=args.poll_interval)
+            await client.start()
+            request_ids = await client.submit(inputs)
+            gas = client.gas_used
+        submitted = time.perf_counter() - started
+        submit_calls = link.calls
+
+        if client is not None:
+            answers = await asyncio.gather(*(client.wait(request_id, args.timeout) for request_id in request_ids))
+            await client.close()
+        else:
+            answers = []
+            for request_id in request_ids:
+                # What the sequential flow does next: poll getPrediction until answered
+                while not (answer := oracle.functions.getPrediction(request_id).call())[2]:
+                    await asyncio.sleep(args.poll_interval)
+                answers.append(answer[:2])
+        elapsed = time.perf_counter() - started
+    finally:
+        bridge.stop_listening()
+        bridge_task.cancel()
+        await asyncio.gather(bridge_task, return_exceptions=True)
+
+    return {
+        'submit_requests_per_sec': round(len(inputs) / submitted, 2),
+        'submit_rpc_calls_per_request': round(submit_calls / len(inputs), 2),
+        'gas_per_request': round(gas / len(inputs)),
+        'answers': len(answers),
+        'all_answered_seconds': round(elapsed, 2)
+    }
+
+
+async def run_benchmark(args):
+    w3, keys = connect(args.rpc_url, args.private_key or None)
+    oracle, ai_contract = deploy_contracts(w3, keys[0])
+    rng = np.random.default_rng(args.seed)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ['ORACLE_PRIVATE_KEY'] = keys[0]
+        os.environ.pop('ORACLE_PRIVATE_KEYS', None)
+        model_path = train_demo_model(os.path.join(tmp, 'model.pkl'))
+        for name in ('sequential', 'client'):
+            inputs = np.round(rng.uniform(0, 10, size=(args.requests, 3)), 3).tolist()
+            results[name] = await run_mode(name, args, w3, oracle, ai_contract, keys, inputs, model_path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the async prediction client')
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--rpc-latency', type=float, default=50.0,
+                        help='Milliseconds added to each requester RPC call, as to a remote node')
+    parser.add_argument('--timeout', type=float, default=300.0)
+    parser.add_argument('--poll-interval', type=float, default=0.05, help='Bridge and client poll interval (s)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rpc-url', help='JSON-RPC dev node instead of the in-process EVM')
+    parser.add_argument('--private-key', action='append', help='Funded key for --rpc-url (first is the oracle owner)')
+    parser.add_argument('--output', default='bench_results/client.json')
+    args = parser.parse_args()
+
+    logging.getLogger('src.ai.oracle_bridge').setLevel(logging.WARNING)
+    logging.getLogger('src.ai.inference').setLevel(logging.WARNING)
+    results = asyncio.run(run_benchmark(args))
+
+    logger.info("=" * 60)
+    logger.info(f"{args.requests} predictions, {args.rpc_latency}ms per requester RPC call")
+    for name, row in results.items():
+        logger.info(f"{name}: submitted {row['submit_requests_per_sec']} req/s with "
+                    f"{row['submit_rpc_calls_per_request']} RPC calls and {row['gas_per_request']} gas per request; "
+                    f"{row['answers']} answers after {row['all_answered_seconds']}s")
+    logger.info("=" * 60)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({'config': vars(args), 'results': results}, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Benchmark calibrated confidence estimation.
+
+For a forest classifier, a forest regressor (per-tree variance) and a Keras
+regressor (MC dropout) this reports expected calibration error on held-out
+data before and after calibration, and p50/p99 latency of the legacy
+confidence path versus ConfidenceEstimator across batch sizes. For MC
+dropout it also times the naive alternative: one eager stochastic call per
+sample.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.ai.confidence import ConfidenceEstimator
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def make_data(n, features, task, rng):
+    X = rng.uniform(-1, 1, size=(n, features)).astype(np.float32)
+    # Noise grows with |x0|, so a useful confidence has to vary per row
+    noise = rng.normal(0, 0.05 + 0.5 * np.abs(X[:, 0]))
+    signal = X.sum(axis=1) + noise
+    return X, ((signal > 0).astype(int) if task == 'classification' else signal.astype(np.float32))
+
+
+def latency(fn, repeats):
+    fn()  # warmup
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1e3)
+    return {'p50_ms': round(float(np.percentile(timings, 50)), 3), 'p99_ms': round(float(np.percentile(timings, 99)), 3)}
+
+
+def calibration_report(estimator, model, X_test, y_test, legacy_confidence):
+    predictions, confidences = estimator.predict(model, X_test)
+    correct = estimator._correct(model, predictions, y_test)
+    legacy = np.broadcast_to(np.asarray(legacy_confidence, dtype=np.float64) / 100, correct.shape)
+    return {
+        'accuracy': round(float(correct.mean()), 4),
+        'ece_legacy': round(estimator.expected_calibration_error(legacy, correct), 4),
+        'ece_calibrated': round(estimator.expected_calibration_error(confidences / 100, correct), 4)
+    }
+
+
+def bench_forests(args, rng):
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+    results = {}
+    for task, cls, legacy in [('classification', RandomForestClassifier, None),
+                              ('regression', RandomForestRegressor, 85.0)]:
+        X, y = make_data(args.samples, args.features, task, rng)
+        n_train, n_val = int(len(X) * 0.6), int(len(X) * 0.8)
+        model = cls(n_estimators=args.estimators, min_samples_leaf=5, random_state=args.seed, n_jobs=1)
+        model.fit(X[:n_train], y[:n_train])
+        estimator = ConfidenceEstimator(task, args.method).fit(model, X[n_train:n_val], y[n_train:n_val])
+
+        X_test, y_test = X[n_val:], y[n_val:]
+        if legacy is None:
+            legacy = model.predict_proba(X_test).max(axis=1) * 100
+        row = calibration_report(estimator, model, X_test, y_test, legacy)
+
+        for batch_size in args.batch_sizes:
+            batch = X_test[:batch_size]
+            if task == 'classification':
+                legacy_fn = lambda: (model.predict(batch), model.predict_proba(batch).max(axis=1))
+            else:
+                legacy_fn = lambda: model.predict(batch)
+            row[f'batch_{batch_size}'] = {
+                'legacy': latency(legacy_fn, args.repeats),
+                'calibrated': latency(lambda: estimator.predict(model, batch), args.repeats)
+            }
+        results[f'forest_{task}'] = row
+        logger.info(f"forest {task}: {row}")
+    return results
+
+
+def bench_mc_dropout(args, rng):
+    from src.ai.model import AIModel
+
+    X, y = make_data(args.samples, args.features, 'regression', rng)
+    n_train, n_val = int(len(X) * 0.6), int(len(X) * 0.8)
+    ai_model = AIModel(args.features, 1, model_type='regression', hidden_units=(64, 32), dropout_rates=0.2,
+                       calibration=args.method, mc_samples=args.mc_samples)
+    ai_model.train(X[:n_train], y[:n_train], X[n_train:n_val], y[n_train:n_val], epochs=args.epochs,
+                   checkpoint_path=None, verbose=0)
+    estimator, model = ai_model.confidence, ai_model.model
+    row = calibration_report(estimator, model, X[n_val:], y[n_val:], 90.0)
+
+    def eager_passes(batch):
+        # MC dropout without tiling or tf.function: one eager call per sample
+        return np.stack([np.asarray(model(batch, training=True)) for _ in range(estimator.mc_samples)])
+
+    for batch_size in args.batch_sizes:
+        batch = X[n_val:n_val + batch_size]
+        row[f'batch_{batch_size}'] = {
+            'legacy': latency(lambda: model.predict(batch, verbose=0), args.repeats),
+            'calibrated': latency(lambda: estimator.predict(model, batch), args.repeats),
+            'mc_eager_loop': latency(lambda: eager_passes(batch), max(args.repeats // 5, 5))
+        }
+    logger.info(f"keras regression (MC dropout x{args.mc_samples}): {row}")
+    return {'keras_regression_mc_dropout': row}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark calibrated confidence estimation')
+    parser.add_argument('--samples', type=int, default=5000)
+    parser.add_argument('--features', type=int, default=8)
+    parser.add_argument('--estimators', type=int, default=100)
+    parser.add_argument('--method', choices=['isotonic', 'platt'], default='isotonic')
+    parser.add_argument('--mc-samples', type=int, default=20)
+    parser.add_argument('--epochs', type=int, default=20)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 32, 256])
+    parser.add_argument('--repeats', type=int, default=100)
+    parser.add_argument('--skip-keras', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_results/confidence.json')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    results = bench_forests(args, rng)
+    if not args.skip_keras:
+        results.update(bench_mc_dropout(args, rng))
+
+    logger.info("=" * 60)
+    for name, row in results.items():
+        logger.info(f"{name}: accuracy {row['accuracy']}, ECE {row['ece_legacy']} -> {row['ece_calibrated']}")
+        for batch_size in args.batch_sizes:
+            timings = row[f'batch_{batch_size}']
+            logger.info(f"  batch {batch_size:4d}: " + ", ".join(
+                f"{path} p50 {t['p50_ms']}ms p99 {t['p99_ms']}ms" for path, t in timings.items()))
+    logger.info("=" * 60)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({'config': vars(args), 'results': results}, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
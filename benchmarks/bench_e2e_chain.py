@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+End-to-end oracle benchmark on a local chain.
+
+Deploys AIOracle/AIContract from contracts/contracts/*.json to an in-process
+EVM (or --rpc-url), fires requestPrediction at a configurable rate and burst
+size, lets AIOraculeBridge fulfill them, and writes throughput, latency
+percentiles, gas per fulfillment and RSS as JSON. With --baseline the run is
+compared against a previous result and exits non-zero on regression.
+
+--nodes N runs N bridges in cluster mode against one coordination database;
+--fail-node-after kills the first node mid-run (without leaving the cluster)
+to measure failover. Duplicate fulfillment attempts are counted from the
+oracle's transactions. By default the nodes share this process and its
+event loop, which tests partitioning and failover but not throughput
+scaling. --node-processes runs each node in its own process with its own
+fulfiller key(s) (--senders per node); the chain must then be reachable by
+every process, so it requires --rpc-url. More than one fulfiller key needs
+an oracle whose fulfillPrediction accepts authorized callers; the AIOracle
+in contracts/ is owner-only.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from web3 import Web3
+from web3.logs import DISCARD
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).parent))
+
+from local_chain import (authorize_fulfillers, bridge_config, connect, deploy_contracts, send_transaction,
+                         train_demo_model)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Metrics where a larger value is a regression
+HIGHER_IS_WORSE = ('latency_ms.p50', 'latency_ms.p99', 'gas_per_fulfillment.mean', 'rss_mb.peak')
+LOWER_IS_WORSE = ('throughput_per_sec',)
+
+
+def current_rss_mb() -> float:
+    """Resident set size of this process in MB"""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentiles(values):
+    if not values:
+        return {}
+    arr = np.asarray(values)
+    return {
+        'p50': round(float(np.percentile(arr, 50)), 3),
+        'p90': round(float(np.percentile(arr, 90)), 3),
+        'p99': round(float(np.percentile(arr, 99)), 3),
+        'max': round(float(arr.max()), 3),
+        'mean': round(float(arr.mean()), 3)
+    }
+
+
+class LoadRun:
+    """Drives requests into AIContract and watches the oracle for fulfillments"""
+
+    def __init__(self, w3, oracle, ai_contract, requester_keys, args):
+        self.w3 = w3
+        self.oracle = oracle
+        self.ai_contract = ai_contract
+        self.requester_keys = requester_keys
+        self.args = args
+        self.sent = {}
+        self.fulfilled = {}
+        self.request_gas = []
+        self.rss_samples = []
+        self.rng = np.random.default_rng(args.seed)
+
+    def _random_input(self) -> bytes:
+        features = self.rng.random(3) * np.array([100, 1000, 10])
+        return json.dumps([round(float(x), 3) for x in features]).encode('utf-8')
+
+    async def generate(self):
+        """Send `requests` predictions in bursts of `burst` at `rate` requests/sec"""
+        fee = self.ai_contract.functions.predictionFee().call()
+        interval = self.args.burst / self.args.rate
+        next_tick = time.perf_counter()
+        n = 0
+
+        while n < self.args.requests:
+            for _ in range(min(self.args.burst, self.args.requests - n)):
+                key = self.requester_keys[n % len(self.requester_keys)]
+                started = time.perf_counter()
+                receipt = send_transaction(
+                    self.w3, self.ai_contract.functions.requestPrediction(self._random_input()), key, value=fee
+                )
+                event = self.ai_contract.events.PredictionRequested().process_receipt(receipt, errors=DISCARD)[0]
+                self.sent[bytes(event['args']['requestId'])] = started
+                self.request_gas.append(receipt.gasUsed)
+                n += 1
+
+            next_tick += interval
+            await asyncio.sleep(max(0.0, next_tick - time.perf_counter()))
+
+    async def monitor(self, start_block: int, deadline: float):
+        """Poll PredictionFulfilled logs and timestamp each fulfillment when first seen"""
+        last_block = start_block
+        while time.perf_counter() < deadline:
+            head = self.w3.eth.block_number
+            if head > last_block:
+                logs = self.oracle.events.PredictionFulfilled.get_logs(from_block=last_block + 1, to_block=head)
+                now = time.perf_counter()
+                for log in logs:
+                    self.fulfilled.setdefault(bytes(log['args']['requestId']), (now, log['transactionHash']))
+                last_block = head
+
+            self.rss_samples.append(current_rss_mb())
+            if len(self.fulfilled) >= self.args.requests:
+                return
+            await asyncio.sleep(self.args.monitor_interval)
+
+    def fulfill_attempts(self, start_block: int):
+        """Every fulfillPrediction transaction mined since `start_block`, with its status"""
+        selector = bytes(Web3.keccak(text='fulfillPrediction(bytes32,int256,uint256)')[:4])
+        attempts = []
+        for number in range(start_block, self.w3.eth.block_number + 1):
+            for tx in self.w3.eth.get_block(number, full_transactions=True).transactions:
+                calldata = tx.get('input', tx.get('data'))  # eth-tester names it `data`
+                if tx['to'] == self.oracle.address and bytes(calldata)[:4] == selector:
+                    attempts.append(self.w3.eth.get_transaction_receipt(tx['hash']).status)
+        return attempts
+
+    def results(self, elapsed: float, start_block: int):
+        attempts = self.fulfill_attempts(start_block)
+        latencies = [(self.fulfilled[rid][0] - started) * 1000
+                     for rid, started in self.sent.items() if rid in self.fulfilled]
+        fulfill_gas = [self.w3.eth.get_transaction_receipt(tx_hash).gasUsed
+                       for _, tx_hash in self.fulfilled.values()]
+        return {
+            'sent': len(self.sent),
+            'fulfilled': len(latencies),
+            'missing': len(self.sent) - len(latencies),
+            'duration_sec': round(elapsed, 3),
+            'throughput_per_sec': round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+            'latency_ms': percentiles(latencies),
+            'gas_per_request': percentiles(self.request_gas),
+            'gas_per_fulfillment': percentiles(fulfill_gas),
+            'fulfill_transactions': len(attempts),
+            'reverted_fulfillments': attempts.count(0),
+            'duplicate_fulfillments': len(attempts) - len(self.fulfilled),
+            'rss_mb': {
+                'peak': round(max(self.rss_samples), 1) if self.rss_samples else 0.0,
+                'final': round(current_rss_mb(), 1)
+            }
+        }
+
+
+def set_bridge_keys(sender_keys):
+    os.environ['ORACLE_PRIVATE_KEY'] = sender_keys[0]
+    if len(sender_keys) > 1:
+        os.environ['ORACLE_PRIVATE_KEYS'] = ','.join(sender_keys)
+    else:
+        os.environ.pop('ORACLE_PRIVATE_KEYS', None)
+
+
+def node_process(rpc_url, node_config, sender_keys, ready, stop, stats):
+    """One cluster node with its own event loop; reports its takeovers when stopped"""
+    from src.ai.oracle_bridge import AIOraculeBridge
+
+    logging.getLogger('src.ai.oracle_bridge').setLevel(logging.WARNING)
+    logging.getLogger('src.ai.inference').setLevel(logging.WARNING)
+    set_bridge_keys(sender_keys)
+    bridge = AIOraculeBridge(config=node_config, w3=Web3(Web3.HTTPProvider(rpc_url)))
+
+    async def run():
+        if bridge.sender_pool is not None:
+            await bridge.sender_pool.start()
+        elif bridge.signer is not None:
+            await bridge.signer.start()
+        task = asyncio.create_task(bridge.start_listening())
+        ready.set()
+        while not stop.is_set():
+            await asyncio.sleep(0.05)
+        bridge.stop_listening()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(run())
+    stats.put(bridge.cluster.takeovers if bridge.cluster is not None else 0)
+    if bridge.cluster is not None:
+        bridge.cluster.close()
+
+
+async def run_node_processes(args, configs, node_keys, run, start_block):
+    """Drive the load while each node runs in its own process"""
+    context = multiprocessing.get_context('spawn')
+    stop, stats = context.Event(), context.Queue()
+    nodes = []
+    for config, sender_keys in zip(configs, node_keys):
+        ready = context.Event()
+        process = context.Process(target=node_process, args=(args.rpc_url, config, sender_keys, ready, stop, stats))
+        process.start()
+        nodes.append((process, ready))
+    # Keep model loading and pool start-up out of the measurement
+    for process, ready in nodes:
+        while not ready.wait(0.1):
+            if not process.is_alive():
+                raise RuntimeError(f"Node process exited with code {process.exitcode} during start-up")
+
+    async def fail_node():
+        await asyncio.sleep(args.fail_node_after)
+        logger.info(f"Killing {configs[0]['cluster']['node_id']} (pid {nodes[0][0].pid})")
+        nodes[0][0].kill()
+
+    started = time.perf_counter()
+    monitor_task = asyncio.create_task(run.monitor(start_block, started + args.timeout))
+    failure_task = asyncio.create_task(fail_node()) if args.fail_node_after is not None and args.nodes > 1 else None
+    await run.generate()
+    await monitor_task
+    elapsed = time.perf_counter() - started
+
+    if failure_task is not None:
+        failure_task.cancel()
+    stop.set()
+    # A killed node reports nothing
+    survivors = [process for process, _ in nodes if process.is_alive()]
+    takeovers = sum(stats.get(timeout=60) for _ in survivors)
+    for process, _ in nodes:
+        process.join()
+    return elapsed, takeovers
+
+
+async def run_benchmark(args):
+    from src.ai.oracle_bridge import AIOraculeBridge
+
+    if args.node_processes and not args.rpc_url:
+        raise ValueError("--node-processes needs a chain every process can reach; pass --rpc-url")
+
+    keys = args.private_key or None
+    w3, keys = connect(args.rpc_url, keys)
+    senders = max(args.senders, 1)
+    if args.node_processes:
+        # Nodes in separate processes can't share a key without racing on its nonce
+        fulfiller_keys = keys[:senders * args.nodes]
+        node_keys = [fulfiller_keys[i * senders:(i + 1) * senders] for i in range(args.nodes)]
+    else:
+        fulfiller_keys = keys[:senders]
+        node_keys = [fulfiller_keys] * args.nodes
+    if any(len(sender_keys) < senders for sender_keys in node_keys):
+        raise ValueError(f"{args.nodes} node(s) x {senders} sender(s) need more funded keys than the {len(keys)} given")
+    sender_keys = node_keys[0]
+    owner_key, requester_keys = keys[0], keys[len(fulfiller_keys):] or keys[-1:]
+    oracle, ai_contract = deploy_contracts(w3, owner_key)
+    if len(fulfiller_keys) > 1:
+        authorize_fulfillers(w3, oracle, owner_key, fulfiller_keys[1:])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = args.model or train_demo_model(os.path.join(tmp, 'model.pkl'))
+        set_bridge_keys(sender_keys)
+        config = bridge_config(w3, oracle, model_path, 'sklearn', args.poll_interval)
+        if args.signer_workers or len(sender_keys) > 1:
+            config['bridge']['signer'] = {'workers': args.signer_workers or None, 'pool': args.signer_pool}
+            config['bridge']['receipt_poll_interval'] = args.poll_interval
+        configs = []
+        for i in range(args.nodes):
+            node_config = dict(config)
+            if args.nodes > 1:
+                node_config['cluster'] = {
+                    'enabled': True,
+                    'db_path': os.path.join(tmp, 'cluster.db'),
+                    'node_id': f'node-{i}',
+                    'lease_seconds': args.lease_seconds,
+                    'heartbeat_interval': args.lease_seconds / 4
+                }
+            if args.queue:
+                node_config['queue'] = {
+                    'enabled': True,
+                    'db_path': os.path.join(tmp, f'work_queue-{i}.db'),
+                    'workers': args.queue_workers,
+                    'poll_interval': args.poll_interval
+                }
+            configs.append(node_config)
+
+        run = LoadRun(w3, oracle, ai_contract, requester_keys, args)
+        start_block = w3.eth.block_number
+        if args.node_processes:
+            elapsed, takeovers = await run_node_processes(args, configs, node_keys, run, start_block)
+            return report(args, run, elapsed, start_block, takeovers, len(sender_keys))
+
+        bridges = [AIOraculeBridge(config=node_config, w3=w3) for node_config in configs]
+        # Keep pool start-up out of the measurement
+        for bridge in bridges:
+            if bridge.sender_pool is not None:
+                await bridge.sender_pool.start()
+            elif bridge.signer is not None:
+                await bridge.signer.start()
+
+        bridge_tasks = [asyncio.create_task(bridge.start_listening()) for bridge in bridges]
+        await asyncio.sleep(0)
+
+        async def fail_node():
+            await asyncio.sleep(args.fail_node_after)
+            logger.info(f"Killing {bridges[0].cluster.node_id}")
+            bridge_tasks[0].cancel()
+
+        started = time.perf_counter()
+        monitor_task = asyncio.create_task(run.monitor(start_block, started + args.timeout))
+        failure_task = asyncio.create_task(fail_node()) if args.fail_node_after is not None and args.nodes > 1 else None
+        await run.generate()
+        await monitor_task
+        elapsed = time.perf_counter() - started
+
+        if failure_task is not None:
+            failure_task.cancel()
+        for bridge, task in zip(bridges, bridge_tasks):
+            bridge.stop_listening()
+            task.cancel()
+        await asyncio.gather(*bridge_tasks, return_exceptions=True)
+        takeovers = sum(bridge.cluster.takeovers for bridge in bridges if bridge.cluster is not None)
+        for bridge in bridges:
+            if bridge.cluster is not None:
+                bridge.cluster.close()
+
+    return report(args, run, elapsed, start_block, takeovers, len(sender_keys))
+
+
+def report(args, run, elapsed, start_block, takeovers, senders):
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'chain': args.rpc_url or 'eth-tester',
+        'config': {
+            'requests': args.requests,
+            'rate': args.rate,
+            'burst': args.burst,
+            'poll_interval': args.poll_interval,
+            'signer_workers': args.signer_workers,
+            'senders': senders,
+            'nodes': args.nodes,
+            'node_processes': args.node_processes,
+            'queue': args.queue,
+            'fail_node_after': args.fail_node_after
+        },
+        'results': dict(run.results(elapsed, start_block), partition_takeovers=takeovers)
+    }
+
+
+def lookup(results, dotted):
+    value = results
+    for part in dotted.split('.'):
+        value = value.get(part, {}) if isinstance(value, dict) else {}
+    return value if isinstance(value, (int, float)) else None
+
+
+def compare_to_baseline(results, baseline, max_regression):
+    """Return a list of metrics that regressed by more than `max_regression`"""
+    regressions = []
+    for metric in HIGHER_IS_WORSE + LOWER_IS_WORSE:
+        current, previous = lookup(results, metric), lookup(baseline, metric)
+        if not current or not previous:
+            continue
+        change = (current - previous) / previous
+        if metric in LOWER_IS_WORSE:
+            change = -change
+        status = 'REGRESSION' if change > max_regression else 'ok'
+        logger.info(f"{metric}: {previous} -> {current} ({change:+.1%} worse) {status}")
+        if change > max_regression:
+            regressions.append(metric)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=100)
+    parser.add_argument('--rate', type=float, default=20.0, help='Requests per second')
+    parser.add_argument('--burst', type=int, default=1, help='Requests sent back-to-back per tick')
+    parser.add_argument('--poll-interval', type=float, default=0.05, help='Bridge poll interval (s)')
+    parser.add_argument('--senders', type=int, default=1, help='Fulfiller accounts to shard submissions across')
+    parser.add_argument('--signer-workers', type=int, default=0, help='Sign in a TransactionSigner pool')
+    parser.add_argument('--signer-pool', choices=['process', 'thread'], default='process')
+    parser.add_argument('--nodes', type=int, default=1, help='Bridges to run in cluster mode')
+    parser.add_argument('--node-processes', action='store_true',
+                        help='Run each node in its own process (requires --rpc-url)')
+    parser.add_argument('--fail-node-after', type=float, help='Kill the first node after this many seconds')
+    parser.add_argument('--lease-seconds', type=float, default=2.0, help='Cluster lease when --nodes > 1')
+    parser.add_argument('--queue', action='store_true', help='Fulfill through the durable work queue')
+    parser.add_argument('--queue-workers', type=int, default=4)
+    parser.add_argument('--monitor-interval', type=float, default=0.01)
+    parser.add_argument('--timeout', type=float, default=300.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--model', help='sklearn model path (defaults to a freshly trained demo model)')
+    parser.add_argument('--rpc-url', help='JSON-RPC dev node instead of the in-process EVM')
+    parser.add_argument('--private-key', action='append', help='Funded key for --rpc-url (first is the oracle owner)')
+    parser.add_argument('--output', default='bench_results/e2e_chain.json')
+    parser.add_argument('--baseline', help='Previous result JSON to compare against')
+    parser.add_argument('--max-regression', type=float, default=0.10)
+    args = parser.parse_args()
+
+    logging.getLogger('src.ai.oracle_bridge').setLevel(logging.WARNING)
+    logging.getLogger('src.ai.inference').setLevel(logging.WARNING)
+
+    output = asyncio.run(run_benchmark(args))
+    results = output['results']
+    logger.info("=" * 60)
+    logger.info(f"Fulfilled {results['fulfilled']}/{results['sent']} in {results['duration_sec']}s "
+                f"({results['throughput_per_sec']}/s)")
+    logger.info(f"Latency ms: {results['latency_ms']}")
+    logger.info(f"Gas per fulfillment: {results['gas_per_fulfillment']}")
+    logger.info(f"Fulfill transactions: {results['fulfill_transactions']} "
+                f"({results['duplicate_fulfillments']} duplicate, {results['reverted_fulfillments']} reverted)")
+    logger.info(f"RSS MB: {results['rss_mb']}")
+    logger.info("=" * 60)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline['results'], args.max_regression)
+        if regressions:
+            logger.error(f"Regressions detected: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
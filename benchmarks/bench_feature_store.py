@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark FeatureStore ingest, scan and latest-lookup throughput.
+Defaults to 20 million rows of price/volume/volatility features.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.ai.feature_store import FeatureStore
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+COLUMNS = ['price', 'volume', 'volatility', 'signal']
+
+
+def generate_batch(rng, start, size, symbols):
+    """Synthetic market rows using the same ranges and rule as demo.py"""
+    features = rng.random((size, len(COLUMNS)), dtype=np.float32)
+    features[:, 0] *= 100
+    features[:, 1] *= 1000
+    features[:, 2] *= 10
+    features[:, 3] = (features[:, 1] > 500) & (features[:, 2] < 5)
+    batch_symbols = symbols[rng.integers(0, len(symbols), size)]
+    timestamps = np.arange(start, start + size, dtype=np.int64)
+    return batch_symbols, timestamps, features
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20_000_000)
+    parser.add_argument('--batch-size', type=int, default=1_000_000)
+    parser.add_argument('--symbols', type=int, default=1000)
+    parser.add_argument('--scan-chunk', type=int, default=4_000_000)
+    parser.add_argument('--lookups', type=int, default=100_000)
+    parser.add_argument('--path', help='Store directory (defaults to a temporary directory)')
+    parser.add_argument('--output', help='Optional JSON results file')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    symbols = np.array([f"SYM{i:04d}" for i in range(args.symbols)])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FeatureStore(args.path or tmp, columns=COLUMNS, initial_capacity=args.rows)
+
+        # Ingest (data generation excluded from timing)
+        ingest_time = 0.0
+        for start in range(0, args.rows, args.batch_size):
+            size = min(args.batch_size, args.rows - start)
+            batch = generate_batch(rng, start, size, symbols)
+            t0 = time.perf_counter()
+            store.append(*batch)
+            ingest_time += time.perf_counter() - t0
+        t0 = time.perf_counter()
+        store.flush()
+        ingest_time += time.perf_counter() - t0
+
+        # Full scan over zero-copy slices
+        t0 = time.perf_counter()
+        totals = np.zeros(len(COLUMNS), dtype=np.float64)
+        for start in range(0, len(store), args.scan_chunk):
+            totals += store.slice(start, start + args.scan_chunk).sum(axis=0, dtype=np.float64)
+        scan_time = time.perf_counter() - t0
+
+        # Latest vector lookups
+        lookup_symbols = symbols[rng.integers(0, len(symbols), args.lookups)].tolist()
+        t0 = time.perf_counter()
+        for symbol in lookup_symbols:
+            store.latest(symbol)
+        lookup_time = time.perf_counter() - t0
+
+        stats = store.get_stats()
+
+    results = {
+        'rows': args.rows,
+        'symbols': args.symbols,
+        'store_bytes': stats['size_bytes'],
+        'ingest_rows_per_sec': round(args.rows / ingest_time),
+        'scan_rows_per_sec': round(args.rows / scan_time),
+        'scan_gb_per_sec': round(args.rows * 4 * len(COLUMNS) / scan_time / 1e9, 3),
+        'latest_lookup_us': round(lookup_time / args.lookups * 1e6, 3)
+    }
+
+    logger.info("=" * 60)
+    for key, value in results.items():
+        logger.info(f"{key}: {value}")
+    logger.info("=" * 60)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark HyperparameterSearch wall-clock time: one worker using every core
+(serial trials) versus a process pool of thread-pinned workers.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from demo import create_sample_data
+from src.ai.hyperparameter_search import HyperparameterSearch
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PARAM_GRID = {
+    'hidden_units': [(128, 64, 32), (64, 32)],
+    'dropout_rates': [0.1, 0.3],
+    'learning_rate': [0.001, 0.0003]
+}
+
+
+def run_search(X, y, max_workers, threads_per_worker, args):
+    search = HyperparameterSearch(
+        input_dim=3, output_dim=1, param_grid=PARAM_GRID, n_folds=args.folds,
+        max_workers=max_workers, threads_per_worker=threads_per_worker,
+        min_epochs=args.min_epochs, max_epochs=args.max_epochs
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        search.run(X, y, output_dir=tmp)
+    return search.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--threads-per-worker', type=int, default=1)
+    parser.add_argument('--folds', type=int, default=3)
+    parser.add_argument('--min-epochs', type=int, default=3)
+    parser.add_argument('--max-epochs', type=int, default=9)
+    parser.add_argument('--output', help='Optional JSON results file')
+    args = parser.parse_args()
+
+    X, y = create_sample_data()
+
+    serial = run_search(X, y, 1, os.cpu_count(), args)
+    parallel = run_search(X, y, args.workers, args.threads_per_worker, args)
+
+    results = {
+        'serial': serial,
+        'parallel': parallel,
+        'wall_clock_speedup': round(serial['wall_seconds'] / parallel['wall_seconds'], 2)
+    }
+
+    logger.info("=" * 60)
+    logger.info(f"Serial:   {serial['wall_seconds']}s")
+    logger.info(f"Parallel: {parallel['wall_seconds']}s on {parallel['workers']} worker(s)")
+    logger.info(f"Speedup:  {results['wall_clock_speedup']}x")
+    logger.info("=" * 60)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Benchmark the local prediction indexer.
+
+Three parts:
+  - chain: requests are sent through AIContract on a locally deployed chain
+    and most are fulfilled; the index is synced and every request is checked
+    against AIOracle. Point lookups from the index are timed against the
+    getPrediction + isRequestPending RPC round trip they replace, alongside
+    per-requester listings and pending-by-age queries;
+  - reorg: a snapshot is taken, more requests are mined and indexed, then the
+    chain is reverted and a different branch is mined; after the next sync
+    the index must match the new branch;
+  - scale: --rows synthetic requests are written to a fresh index and the
+    same queries are timed (p50/p99) at that size.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from eth_utils import to_checksum_address
+from web3.logs import DISCARD
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).parent))
+
+from local_chain import connect, deploy_contracts, send_transaction
+from src.ai.indexer import PredictionIndexer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def latency(fn, args_list):
+    timings = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - start)
+    timings = np.array(timings) * 1e6
+    return {'p50_us': round(float(np.percentile(timings, 50)), 1),
+            'p99_us': round(float(np.percentile(timings, 99)), 1)}
+
+
+def make_requests(w3, oracle, ai_contract, keys, n, fulfil_every, offset=0):
+    fee = ai_contract.functions.predictionFee().call()
+    request_ids = []
+    for i in range(n):
+        receipt = send_transaction(w3, ai_contract.functions.requestPrediction(
+            f"[{offset + i}, 2.5, 3.5]".encode()), keys[1 + i % (len(keys) - 1)], value=fee)
+        request_id = oracle.events.PredictionRequested().process_receipt(receipt, errors=DISCARD)[0]['args']['requestId']
+        request_ids.append(request_id)
+        if i % fulfil_every:
+            send_transaction(w3, oracle.functions.fulfillPrediction(request_id, 1000 + i, 90), keys[0])
+    return request_ids
+
+
+def check_against_chain(indexer, oracle, request_ids):
+    for request_id in request_ids:
+        indexed = indexer.get_request(request_id)
+        prediction, confidence, timestamp = oracle.functions.getPrediction(request_id).call()
+        pending = oracle.functions.isRequestPending(request_id).call()
+        if indexed is None or indexed['pending'] != pending or (
+                not pending and (indexed['prediction'], indexed['confidence']) != (prediction, confidence)):
+            raise RuntimeError(f"Index disagrees with the chain for 0x{bytes(request_id).hex()}")
+
+
+def bench_chain(args, tmp):
+    w3, keys = connect(args.rpc_url, args.private_keys)
+    oracle, ai_contract = deploy_contracts(w3, keys[0])
+    indexer = PredictionIndexer(w3, oracle.address, ai_contract.address, db_path=os.path.join(tmp, 'chain.db'),
+                                start_block=w3.eth.block_number + 1, confirmations=args.confirmations,
+                                oracle_abi=oracle.abi, ai_contract_abi=ai_contract.abi)
+
+    request_ids = make_requests(w3, oracle, ai_contract, keys, args.chain_requests, fulfil_every=4)
+    start = time.perf_counter()
+    events = indexer.sync()
+    sync_seconds = time.perf_counter() - start
+    check_against_chain(indexer, oracle, request_ids)
+
+    def rpc_lookup(request_id):
+        oracle.functions.getPrediction(request_id).call()
+        oracle.functions.isRequestPending(request_id).call()
+
+    requester = w3.eth.account.from_key(keys[1]).address
+    results = {
+        'requests': len(request_ids),
+        'events': events,
+        'sync_seconds': round(sync_seconds, 3),
+        'rpc_lookup': latency(rpc_lookup, [(rid,) for rid in request_ids]),
+        'index_lookup': latency(indexer.get_request, [(rid,) for rid in request_ids]),
+        'requester_listing': latency(indexer.requests_by_requester, [(requester,)] * 100),
+        'pending': latency(indexer.pending, [()] * 100),
+        'pending_count': len(indexer.pending(limit=args.chain_requests))
+    }
+    results['lookup_speedup'] = round(results['rpc_lookup']['p50_us'] / results['index_lookup']['p50_us'])
+
+    if hasattr(w3.provider, 'ethereum_tester'):
+        results['reorg'] = bench_reorg(w3, oracle, ai_contract, keys, indexer, request_ids, args)
+    indexer.close()
+    return results
+
+
+def bench_reorg(w3, oracle, ai_contract, keys, indexer, confirmed_ids, args):
+    tester = w3.provider.ethereum_tester
+    snapshot = tester.take_snapshot()
+    orphaned = make_requests(w3, oracle, ai_contract, keys, args.reorg_depth, fulfil_every=2, offset=10_000)
+    indexer.sync()
+    if any(indexer.get_request(rid) is None for rid in orphaned):
+        raise RuntimeError("Requests on the abandoned branch were not indexed")
+
+    tester.revert_to_snapshot(snapshot)
+    # The new branch fulfils a request that was still pending before the fork
+    send_transaction(w3, oracle.functions.fulfillPrediction(confirmed_ids[0], 7, 70), keys[0])
+    canonical = make_requests(w3, oracle, ai_contract, keys, args.reorg_depth // 2, fulfil_every=3, offset=20_000)
+
+    start = time.perf_counter()
+    indexer.sync()
+    seconds = time.perf_counter() - start
+    if any(indexer.get_request(rid) is not None for rid in orphaned):
+        raise RuntimeError("Requests from the abandoned branch survived the reorg")
+    check_against_chain(indexer, oracle, confirmed_ids + canonical)
+    stats = indexer.get_stats()
+    return {'orphaned_requests': len(orphaned), 'new_branch_requests': len(canonical),
+            'reorgs': stats['reorgs'], 'rolled_back_blocks': stats['rolled_back_blocks'],
+            'resync_seconds': round(seconds, 3)}
+
+
+def bench_scale(args, tmp, rng):
+    indexer = PredictionIndexer(None, '0x' + '11' * 20, db_path=os.path.join(tmp, 'scale.db'))
+    requesters = [to_checksum_address(rng.bytes(20)) for _ in range(args.requesters)]
+
+    # Raw slices: an 'S32' array would strip trailing NUL bytes from some ids
+    raw_ids = rng.bytes(32 * args.rows)
+    request_ids = [raw_ids[i:i + 32] for i in range(0, len(raw_ids), 32)]
+    owners = rng.integers(0, len(requesters), args.rows)
+    fulfilled = rng.uniform(size=args.rows) >= args.pending_fraction
+    now = int(time.time())
+    start = time.perf_counter()
+    with indexer._transaction():
+        indexer.conn.executemany(
+            "INSERT INTO requests (request_id, requester, input_data, block_number, timestamp, transaction_hash, "
+            "fulfilled) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            ((request_ids[i], requesters[owners[i]], b'[1.0, 2.5, 3.5]', i // 10, now - (args.rows - i) // 5,
+              request_ids[i], int(fulfilled[i])) for i in range(args.rows)))
+        indexer.conn.executemany(
+            "INSERT INTO fulfillments (request_id, source, prediction, confidence, block_number, transaction_hash) "
+            "VALUES (?, 'oracle', ?, 90, ?, ?)",
+            ((request_ids[i], i, i // 10 + 1, request_ids[i]) for i in np.flatnonzero(fulfilled)))
+    load_seconds = time.perf_counter() - start
+
+    sample = rng.integers(0, args.rows, args.queries)
+    results = {
+        'rows': args.rows,
+        'load_seconds': round(load_seconds, 2),
+        'db_mb': round(os.path.getsize(indexer.db_path) / 1e6, 1),
+        'index_lookup': latency(indexer.get_request, [(request_ids[i],) for i in sample]),
+        'index_lookup_hex': latency(indexer.get_request, [('0x' + request_ids[i].hex(),) for i in sample]),
+        'requester_listing': latency(indexer.requests_by_requester,
+                                     [(requesters[owners[i]], 50) for i in sample[:1000]]),
+        'pending_oldest': latency(indexer.pending, [(0, 100)] * 1000),
+        'pending_older_than_hour': latency(indexer.pending, [(3600, 100)] * 1000)
+    }
+    indexer.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the local prediction indexer')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--requesters', type=int, default=10_000)
+    parser.add_argument('--pending-fraction', type=float, default=0.01)
+    parser.add_argument('--queries', type=int, default=10_000)
+    parser.add_argument('--chain-requests', type=int, default=100)
+    parser.add_argument('--confirmations', type=int, default=12)
+    parser.add_argument('--reorg-depth', type=int, default=6, help='Requests mined on the abandoned branch')
+    parser.add_argument('--rpc-url', default=None, help='JSON-RPC dev node (default: in-process eth-tester)')
+    parser.add_argument('--private-keys', nargs='*', default=None)
+    parser.add_argument('--skip-chain', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_results/indexer.json')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {'scale': bench_scale(args, tmp, rng)}
+        if not args.skip_chain:
+            results['chain'] = bench_chain(args, tmp)
+
+    logger.info("=" * 60)
+    scale = results['scale']
+    logger.info(f"Scale: {scale['rows']} requests ({scale['db_mb']} MB) loaded in {scale['load_seconds']}s")
+    for key in ('index_lookup', 'index_lookup_hex', 'requester_listing', 'pending_oldest', 'pending_older_than_hour'):
+        logger.info(f"  {key}: p50 {scale[key]['p50_us']}us, p99 {scale[key]['p99_us']}us")
+    if 'chain' in results:
+        chain = results['chain']
+        logger.info(f"Chain: {chain['requests']} requests, {chain['events']} events synced in {chain['sync_seconds']}s")
+        logger.info(f"  RPC getPrediction+isRequestPending: p50 {chain['rpc_lookup']['p50_us']}us; "
+                    f"index: p50 {chain['index_lookup']['p50_us']}us ({chain['lookup_speedup']}x)")
+        if 'reorg' in chain:
+            reorg = chain['reorg']
+            logger.info(f"  Reorg: {reorg['orphaned_requests']} orphaned requests dropped, "
+                        f"{reorg['rolled_back_blocks']} blocks rolled back, resynced in {reorg['resync_seconds']}s")
+    logger.info("=" * 60)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({'config': vars(args), 'results': results}, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the inference hot paths.
+
+Times InferenceModel.preprocess_input, predict_with_confidence (cache miss
+and cache hit), batch_predict and AIModel.predict_with_confidence across
+batch sizes, feature widths and both sklearn and tensorflow models. Each
+case also records allocations with tracemalloc. With --baseline the median
+latencies are compared against a stored run and the script exits non-zero
+when any case regresses by more than --max-regression.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.ai.inference import InferenceModel
+from src.ai.model import AIModel
+from src.ai.preprocessing import PreprocessingPipeline
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PREPROCESSING = [{'op': 'clip', 'quantiles': [0.01, 0.99]}, {'op': 'standardize'}]
+
+
+def measure(fn, setup=None, min_time=0.2, max_repeats=1000, min_repeats=5):
+    """Call `fn` until `min_time` has elapsed; `setup` runs untimed before each call"""
+    if setup:
+        setup()
+    fn()  # warmup
+
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while len(timings) < max_repeats and (len(timings) < min_repeats or time.perf_counter() < deadline):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    timings_us = np.array(timings) * 1e6
+    return {
+        'repeats': len(timings),
+        'median_us': round(float(np.median(timings_us)), 2),
+        'p90_us': round(float(np.percentile(timings_us, 90)), 2),
+        'min_us': round(float(timings_us.min()), 2)
+    }
+
+
+def measure_allocations(fn, setup=None):
+    """Peak traced memory and net allocation blocks for a single call"""
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    diff = after.compare_to(before, 'filename')
+    return {
+        'peak_kb': round((peak - base) / 1024, 2),
+        'allocated_blocks': sum(max(stat.count_diff, 0) for stat in diff)
+    }
+
+
+def build_models(model_type, width, output_dir, seed=0):
+    """Train a small model of `model_type` on `width` features; returns (InferenceModel, AIModel or None)"""
+    rng = np.random.default_rng(seed)
+    X = rng.random((2000, width)).astype(np.float32)
+    y = (X[:, 0] + X[:, -1] > 1).astype(int)
+    model_path = os.path.join(output_dir, f"{model_type}_{width}")
+
+    if model_type == 'sklearn':
+        import joblib
+        from sklearn.ensemble import RandomForestClassifier
+
+        model_path += '.pkl'
+        preprocessing = PreprocessingPipeline(PREPROCESSING, input_dim=width).fit(X)
+        joblib.dump(RandomForestClassifier(n_estimators=50, random_state=seed).fit(preprocessing.transform(X), y),
+                    model_path)
+        preprocessing.save(f"{model_path}_preprocessing.json")
+        return InferenceModel(model_path, 'sklearn'), None
+
+    model_path += '.h5'
+    ai_model = AIModel(input_dim=width, output_dim=1, model_type='classification', preprocessing=PREPROCESSING)
+    ai_model.train(X, y, epochs=1, batch_size=64, checkpoint_path=None, verbose=0)
+    ai_model.save_model(model_path)
+    return InferenceModel(model_path, 'tensorflow'), ai_model
+
+
+def cases_for(model_type, width, batch_size, inference, ai_model, rng):
+    """Yield (name, fn, setup) for every hot path at this batch size"""
+    batch = (rng.random((batch_size, width)) * 100).round(3).tolist()
+    row = batch[0]
+
+    if batch_size == 1:
+        yield 'preprocess_input', lambda: inference.preprocess_input(row), None
+        yield 'predict_with_confidence.miss', lambda: inference.predict_with_confidence(row), inference.clear_cache
+        yield 'predict_with_confidence.hit', lambda: inference.predict_with_confidence(row), \
+            lambda: inference.predict_with_confidence(row)
+        yield 'cache_key', lambda: inference._cache_key(row), None
+    else:
+        yield 'preprocess_input', lambda: inference.preprocess_input(batch), None
+
+    yield 'batch_predict.miss', lambda: inference.batch_predict(batch), inference.clear_cache
+    yield 'batch_predict.hit', lambda: inference.batch_predict(batch), lambda: inference.batch_predict(batch)
+
+    if ai_model is not None:
+        X = np.asarray(batch, dtype=np.float32)
+        yield 'AIModel.predict_with_confidence', lambda: ai_model.predict_with_confidence(X), None
+
+
+def run_suite(args):
+    rng = np.random.default_rng(args.seed)
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for model_type in args.model_types:
+            for width in args.widths:
+                inference, ai_model = build_models(model_type, width, tmp, args.seed)
+                for batch_size in args.batch_sizes:
+                    for name, fn, setup in cases_for(model_type, width, batch_size, inference, ai_model, rng):
+                        key = f"{model_type}/w{width}/b{batch_size}/{name}"
+                        stats = measure(fn, setup, args.min_time, args.max_repeats)
+                        stats.update(measure_allocations(fn, setup))
+                        stats['per_row_us'] = round(stats['median_us'] / batch_size, 2)
+                        results[key] = stats
+                        logger.info(f"{key:<60} {stats['median_us']:>12.1f} us  "
+                                    f"{stats['per_row_us']:>10.2f} us/row  {stats['peak_kb']:>10.1f} KB peak")
+    return results
+
+
+def compare_to_baseline(results, baseline, max_regression):
+    """Return the cases whose median latency regressed by more than `max_regression`"""
+    regressions = []
+    for key, stats in results.items():
+        previous = baseline.get(key)
+        if not previous or not previous.get('median_us'):
+            continue
+        change = (stats['median_us'] - previous['median_us']) / previous['median_us']
+        if change > max_regression:
+            logger.error(f"{key}: {previous['median_us']}us -> {stats['median_us']}us ({change:+.1%})")
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model-types', nargs='+', default=['sklearn', 'tensorflow'],
+                        choices=['sklearn', 'tensorflow'])
+    parser.add_argument('--widths', nargs='+', type=int, default=[3, 32])
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=[1, 32, 256])
+    parser.add_argument('--min-time', type=float, default=0.2, help='Seconds to spend timing each case')
+    parser.add_argument('--max-repeats', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_results/inference.json')
+    parser.add_argument('--baseline', help='Previous result JSON to compare against')
+    parser.add_argument('--max-regression', type=float, default=0.20)
+    args = parser.parse_args()
+
+    logging.getLogger('src.ai.inference').setLevel(logging.WARNING)
+    logging.getLogger('src.ai.model').setLevel(logging.WARNING)
+
+    logger.info("=" * 60)
+    results = run_suite(args)
+    logger.info("=" * 60)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({'timestamp': datetime.now().isoformat(), 'results': results}, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)['results']
+        regressions = compare_to_baseline(results, baseline, args.max_regression)
+        if regressions:
+            logger.error(f"{len(regressions)} case(s) regressed by more than {args.max_regression:.0%}")
+            sys.exit(1)
+        logger.info(f"No regressions beyond {args.max_regression:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
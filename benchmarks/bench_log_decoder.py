@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Benchmark the raw event log decoder.
+
+Reports:
+  - startup: parsing the AIContract Truffle artifact and building a web3
+    contract from it, versus loading the cached event schema;
+  - decode-only throughput (logs/sec) on synthetic PredictionRequested logs,
+    web3's `events.PredictionRequested().process_log` on formatted logs
+    versus LogDecoder on raw JSON-RPC logs;
+  - end-to-end throughput on an in-process chain, where both contracts'
+    `events.PredictionRequested.get_logs` is compared against
+    `LogDecoder.get_logs` over the same block range.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3 import Web3
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).parent))
+
+from local_chain import ARTIFACTS_DIR, connect, deploy_contracts, send_transaction
+from src.ai.log_decoder import LogDecoder, load_event_schemas, schemas_from_abi
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def best_of(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_startup(artifact_path, repeats):
+    w3 = Web3()
+
+    def from_artifact():
+        with open(artifact_path, 'r') as f:
+            abi = json.load(f)['abi']
+        return w3.eth.contract(address='0x' + '11' * 20, abi=abi).events.PredictionRequested
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, 'event_schemas.json')
+        load_event_schemas(artifact_path, cache_path)  # writes the cache
+        return {
+            'artifact_bytes': os.path.getsize(artifact_path),
+            'artifact_parse_ms': round(best_of(from_artifact, repeats) * 1e3, 3),
+            'schema_cache_load_ms': round(best_of(lambda: LogDecoder(
+                [load_event_schemas(artifact_path, cache_path)['PredictionRequested']]), repeats) * 1e3, 3)
+        }
+
+
+def synthetic_logs(schema, n, payload_bytes, rng):
+    """Raw eth_getLogs entries (hex strings) for AIContract's PredictionRequested"""
+    address = '0x' + '22' * 20
+    logs = []
+    for i in range(n):
+        payload = json.dumps(np.round(rng.uniform(0, 10, payload_bytes // 6), 3).tolist()).encode()
+        logs.append({
+            'address': address,
+            'topics': [schema.topic, '0x' + rng.bytes(32).hex(), '0x' + '00' * 12 + '33' * 20],
+            'data': '0x' + encode(['bytes'], [payload]).hex(),
+            'blockNumber': hex(1000 + i // 10),
+            'blockHash': '0x' + '44' * 32,
+            'transactionHash': '0x' + rng.bytes(32).hex(),
+            'transactionIndex': hex(i % 10),
+            'logIndex': hex(i % 10),
+            'removed': False
+        })
+    return logs
+
+
+def web3_formatted(log):
+    """What web3's result formatters hand to process_log"""
+    return {
+        'address': Web3.to_checksum_address(log['address']),
+        'topics': [HexBytes(topic) for topic in log['topics']],
+        'data': HexBytes(log['data']),
+        'blockNumber': int(log['blockNumber'], 16),
+        'blockHash': HexBytes(log['blockHash']),
+        'transactionHash': HexBytes(log['transactionHash']),
+        'transactionIndex': int(log['transactionIndex'], 16),
+        'logIndex': int(log['logIndex'], 16),
+        'removed': False
+    }
+
+
+def bench_decode(artifact_path, args, rng):
+    with open(artifact_path, 'r') as f:
+        abi = json.load(f)['abi']
+    event = Web3().eth.contract(address='0x' + '22' * 20, abi=abi).events.PredictionRequested()
+    decoder = LogDecoder([schemas_from_abi(abi)['PredictionRequested']])
+
+    raw = synthetic_logs(decoder.schemas[0], args.logs, args.payload_bytes, rng)
+    formatted = [web3_formatted(log) for log in raw]
+
+    reference = [event.process_log(log) for log in formatted[:100]]
+    ours = decoder.decode(raw[:100])
+    assert all(dict(r['args']) == o['args'] for r, o in zip(reference, ours)), "decoded args differ from web3"
+
+    web3_seconds = best_of(lambda: [event.process_log(log) for log in formatted], args.repeats)
+    ours_seconds = best_of(lambda: decoder.decode(raw), args.repeats)
+    return {
+        'logs': args.logs,
+        'web3_process_log_per_sec': round(args.logs / web3_seconds),
+        'raw_decoder_per_sec': round(args.logs / ours_seconds),
+        'speedup': round(web3_seconds / ours_seconds, 1)
+    }
+
+
+def bench_chain(args):
+    w3, keys = connect(args.rpc_url, args.private_keys)
+    oracle, ai_contract = deploy_contracts(w3, keys[0])
+    fee = ai_contract.functions.predictionFee().call()
+    from_block = w3.eth.block_number + 1
+    for i in range(args.chain_requests):
+        send_transaction(w3, ai_contract.functions.requestPrediction(f"[{i % 10}, 2.5, 3.5]".encode()),
+                         keys[1 + i % (len(keys) - 1)], value=fee)
+    to_block = w3.eth.block_number
+
+    results = {}
+    for name, contract in (('AIOracle', oracle), ('AIContract', ai_contract)):
+        decoder = LogDecoder([schemas_from_abi(contract.abi)['PredictionRequested']])
+        reference = contract.events.PredictionRequested.get_logs(from_block=from_block, to_block=to_block)
+        ours = decoder.get_logs(w3, contract.address, from_block, to_block)
+        if [dict(e['args']) for e in reference] != [e['args'] for e in ours]:
+            raise RuntimeError(f"{name}: raw decoder disagrees with web3")
+
+        web3_seconds = best_of(lambda: contract.events.PredictionRequested.get_logs(
+            from_block=from_block, to_block=to_block), args.repeats)
+        ours_seconds = best_of(lambda: decoder.get_logs(w3, contract.address, from_block, to_block), args.repeats)
+        results[name] = {
+            'logs': len(ours),
+            'web3_get_logs_per_sec': round(len(ours) / web3_seconds),
+            'raw_get_logs_per_sec': round(len(ours) / ours_seconds),
+            'speedup': round(web3_seconds / ours_seconds, 1)
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the raw event log decoder')
+    parser.add_argument('--logs', type=int, default=20000, help='Synthetic logs for decode-only timing')
+    parser.add_argument('--payload-bytes', type=int, default=64)
+    parser.add_argument('--chain-requests', type=int, default=300)
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--rpc-url', default=None, help='JSON-RPC dev node (default: in-process eth-tester)')
+    parser.add_argument('--private-keys', nargs='*', default=None)
+    parser.add_argument('--skip-chain', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_results/log_decoder.json')
+    args = parser.parse_args()
+
+    artifact_path = ARTIFACTS_DIR / 'AIContract.json'
+    rng = np.random.default_rng(args.seed)
+    results = {
+        'startup': bench_startup(artifact_path, args.repeats),
+        'decode': bench_decode(artifact_path, args, rng)
+    }
+    if not args.skip_chain:
+        results['chain'] = bench_chain(args)
+
+    logger.info("=" * 60)
+    startup = results['startup']
+    logger.info(f"Startup: artifact ({startup['artifact_bytes'] / 1e3:.0f} kB) {startup['artifact_parse_ms']}ms, "
+                f"schema cache {startup['schema_cache_load_ms']}ms")
+    decode = results['decode']
+    logger.info(f"Decode {decode['logs']} logs: web3 {decode['web3_process_log_per_sec']}/s, "
+                f"raw {decode['raw_decoder_per_sec']}/s ({decode['speedup']}x)")
+    for name, row in results.get('chain', {}).items():
+        logger.info(f"{name} get_logs ({row['logs']} logs): web3 {row['web3_get_logs_per_sec']}/s, "
+                    f"raw {row['raw_get_logs_per_sec']}/s ({row['speedup']}x)")
+    logger.info("=" * 60)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark the precomputed prediction lookup table.
+
+Trains a RandomForest on a bounded feature domain, builds a LookupTable over
+its quantization grid and reports build time, table memory and per-request
+latency of a table hit versus the live path (InferenceModel on a cold
+cache), for grid inputs parsed the way the bridges parse them. Every sampled
+hit is checked against the integers the live path would have submitted.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.ai.inference import InferenceModel
+from src.ai.lookup_table import LookupTable
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def train_model(path, features, estimators, seed):
+    from sklearn.ensemble import RandomForestClassifier
+
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(0, 1, size=(2000, features))
+    y = (X.sum(axis=1) + rng.normal(0, 0.2, len(X)) > features / 2).astype(int)
+    joblib.dump(RandomForestClassifier(n_estimators=estimators, random_state=seed).fit(X, y), path)
+    return path
+
+
+def live_answer(model, input_values):
+    """What the bridges submit without a table"""
+    model.prediction_cache.clear()
+    prediction, confidence = model.predict_with_confidence(input_values)
+    return int(prediction[0] * 1000), int(confidence)
+
+
+def time_per_call(fn, inputs):
+    start = time.perf_counter()
+    for input_values in inputs:
+        fn(input_values)
+    return (time.perf_counter() - start) / len(inputs) * 1e6
+
+
+def run_benchmark(args):
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        model = InferenceModel(train_model(os.path.join(tmp, 'model.pkl'), args.features, args.estimators, args.seed))
+        step = 1.0 / (args.points - 1)
+        table = LookupTable([0.0] * args.features, [1.0] * args.features, step).build(model, args.batch_size)
+
+        # Requests as decoded from JSON: Python floats on the grid, rounded like a client would send them
+        cells = rng.integers(0, table.n_cells, size=args.requests)
+        inputs = [json.loads(json.dumps(np.round(row, 6).tolist())) for row in table.grid_points(cells)]
+        off_grid = [[value + step / 3 for value in row] for row in inputs]
+
+        mismatches = sum(table.lookup(row) != live_answer(model, row) for row in inputs[:args.verify])
+        live_us = time_per_call(lambda row: live_answer(model, row), inputs[:args.live_requests])
+        hit_us = time_per_call(table.lookup, inputs)
+        miss_us = time_per_call(table.lookup, off_grid)
+
+    return {
+        'features': args.features,
+        'points_per_feature': args.points,
+        'cells': table.n_cells,
+        'build_seconds': round(table.build_seconds, 3),
+        'build_cells_per_sec': round(table.n_cells / table.build_seconds, 1),
+        'memory_mb': round(table.nbytes / 1e6, 3),
+        'live_us': round(live_us, 2),
+        'lookup_hit_us': round(hit_us, 2),
+        'lookup_miss_us': round(miss_us, 2),
+        'speedup': round(live_us / hit_us, 1),
+        'verified': min(args.verify, len(inputs)),
+        'mismatches': int(mismatches)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the prediction lookup table')
+    parser.add_argument('--features', type=int, default=3)
+    parser.add_argument('--points', type=int, default=21, help='Grid points per feature over [0, 1]')
+    parser.add_argument('--estimators', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=65536)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--live-requests', type=int, default=200)
+    parser.add_argument('--verify', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_results/lookup_table.json')
+    args = parser.parse_args()
+
+    logging.getLogger('src.ai.inference').setLevel(logging.WARNING)
+    results = run_benchmark(args)
+
+    logger.info("=" * 60)
+    logger.info(f"Grid {results['points_per_feature']}^{results['features']} = {results['cells']} cells: "
+                f"built in {results['build_seconds']}s, {results['memory_mb']} MB")
+    logger.info(f"Live path {results['live_us']}us, table hit {results['lookup_hit_us']}us "
+                f"({results['speedup']}x), miss {results['lookup_miss_us']}us")
+    logger.info(f"Mismatches vs live path: {results['mismatches']}/{results['verified']}")
+    logger.info("=" * 60)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
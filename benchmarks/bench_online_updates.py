@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark IncrementalTrainer refresh latency against a full refit, on a
+stream of labeled outcomes whose labelling rule shifts halfway through.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from demo import create_sample_data
+from src.ai.model import AIModel
+from src.ai.online_learning import IncrementalTrainer
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def outcome_stream(n_batches, batch_size, seed=7):
+    """Yield labeled batches; the volume threshold moves from 500 to 650 midway"""
+    rng = np.random.default_rng(seed)
+    for i in range(n_batches):
+        X = rng.random((batch_size, 3)) * np.array([100, 1000, 10])
+        threshold = 500 if i < n_batches // 2 else 650
+        y = ((X[:, 1] > threshold) & (X[:, 2] < 5)).astype(int)
+        yield X, y
+
+
+class ScaledSGD:
+    """SGD classifier behind a scaler frozen after the initial fit"""
+
+    def __init__(self, scaler, sgd):
+        self.scaler, self.sgd = scaler, sgd
+        self.n_features_in_ = scaler.n_features_in_
+        self.classes_ = sgd.classes_
+
+    def predict(self, X):
+        return self.sgd.predict(self.scaler.transform(X))
+
+    def predict_proba(self, X):
+        return self.sgd.predict_proba(self.scaler.transform(X))
+
+    def partial_fit(self, X, y, **kwargs):
+        self.sgd.partial_fit(self.scaler.transform(X), y, **kwargs)
+        return self
+
+
+def run_sklearn(X, y, args, output_dir):
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler().fit(X)
+    model = SGDClassifier(loss='log_loss', random_state=0).fit(scaler.transform(X), y)
+
+    start = time.perf_counter()
+    make_pipeline(StandardScaler(), SGDClassifier(loss='log_loss', random_state=0)).fit(X, y)
+    full_refit = time.perf_counter() - start
+
+    trainer = IncrementalTrainer(ScaledSGD(scaler, model), output_dir=output_dir)
+    if not trainer.is_classifier:
+        raise RuntimeError("IncrementalTrainer does not see ScaledSGD as a classifier")
+    for X_batch, y_batch in outcome_stream(args.batches, args.batch_size):
+        trainer.update(X_batch, y_batch)
+    return full_refit, trainer
+
+
+def run_keras(X, y, args, output_dir):
+    model = AIModel(input_dim=3, output_dim=1, model_type='classification',
+                    preprocessing=[{'op': 'standardize'}])
+
+    start = time.perf_counter()
+    model.train(X, y, epochs=args.full_epochs, batch_size=32, checkpoint_path=None, verbose=0)
+    full_refit = time.perf_counter() - start
+
+    trainer = IncrementalTrainer(model, output_dir=output_dir, fine_tune_epochs=2)
+    for X_batch, y_batch in outcome_stream(args.batches, args.batch_size):
+        trainer.update(X_batch, y_batch)
+    return full_refit, trainer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--batches', type=int, default=20)
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--full-epochs', type=int, default=20)
+    parser.add_argument('--output', help='Optional JSON results file')
+    args = parser.parse_args()
+
+    X, y = create_sample_data()
+    results = {}
+
+    for name, runner in (('sklearn', run_sklearn), ('tensorflow', run_keras)):
+        with tempfile.TemporaryDirectory() as tmp:
+            full_refit, trainer = runner(X, y, args, tmp)
+        stats = trainer.get_stats()
+        results[name] = {
+            'full_refit_seconds': round(full_refit, 3),
+            'mean_refresh_seconds': round(stats['mean_refresh_seconds'], 3),
+            'max_refresh_seconds': round(stats['max_refresh_seconds'], 3),
+            'score_by_update': [u['score_before_update'] for u in trainer.updates],
+            'drift_by_update': [u['drift'] for u in trainer.updates]
+        }
+        logger.info(f"{name}: full refit {full_refit:.2f}s, incremental refresh "
+                    f"{stats['mean_refresh_seconds']:.3f}s mean / {stats['max_refresh_seconds']:.3f}s max")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
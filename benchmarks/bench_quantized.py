@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Benchmark fixed-point quantized inference against the float path.
+
+For a forest classifier, a forest regressor and AIModel MLPs (classifier and
+regressor) this reports, on held-out data, how often the quantized integers
+equal the ones the float path submits (prediction * 1000 and confidence),
+the largest prediction difference and class agreement, model memory, and
+p50/p99 latency of both paths across batch sizes. Reproducibility is checked
+by scoring every row alone and inside a shuffled batch: the quantized
+outputs must be bit-identical.
+"""
+
+import argparse
+import json
+import logging
+import os
+import pickle
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.ai.quantized import quantize_model
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def make_data(n, features, task, rng):
+    X = rng.uniform(-1, 1, size=(n, features)).astype(np.float32)
+    signal = X @ np.linspace(1, 0.2, features) + rng.normal(0, 0.2, n)
+    return X, ((signal > 0).astype(int) if task == 'classification' else signal.astype(np.float32))
+
+
+def latency(fn, repeats):
+    fn()  # warmup
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1e3)
+    return {'p50_ms': round(float(np.percentile(timings, 50)), 3), 'p99_ms': round(float(np.percentile(timings, 99)), 3)}
+
+
+def float_forest(model, task):
+    def scaled(X):
+        predictions = model.predict(X).astype(np.float64)
+        confidences = model.predict_proba(X).max(axis=1) * 100 if task == 'classification' else np.full(len(X), 85.0)
+        return np.trunc(predictions * 1000).astype(np.int64), np.trunc(confidences).astype(np.int64)
+    return scaled
+
+
+def float_keras(model):
+    def scaled(X):
+        # What InferenceModel does for a TensorFlow model
+        predictions = model.predict(X, verbose=0)
+        confidences = predictions.max(axis=1) * 100 if predictions.shape[1] > 1 else np.full(len(X), 90.0)
+        return np.trunc(predictions[:, 0].astype(np.float64) * 1000).astype(np.int64), np.trunc(confidences).astype(np.int64)
+    return scaled
+
+
+def compare(name, task, float_fn, quantized, float_bytes, X_test, args, rng):
+    float_predictions, float_confidences = float_fn(X_test)
+    predictions, confidences = quantized.predict_scaled(X_test)
+
+    # Bit-reproducibility: each row alone vs inside a shuffled batch
+    order = rng.permutation(len(X_test))
+    shuffled = np.empty_like(predictions)
+    shuffled[order] = quantized.predict_scaled(X_test[order])[0]
+    single = np.concatenate([quantized.predict_scaled(X_test[i:i + 1])[0] for i in range(args.reproducibility_rows)])
+
+    row = {
+        'task': task,
+        'exact_prediction_match': round(float((predictions == float_predictions).mean()), 4),
+        'exact_confidence_match': round(float((confidences == float_confidences).mean()), 4),
+        'max_abs_prediction_diff': int(np.abs(predictions - float_predictions).max()),
+        'mean_abs_prediction_diff': round(float(np.abs(predictions - float_predictions).mean()), 3),
+        'float_bytes': int(float_bytes),
+        'quantized_bytes': int(quantized.nbytes),
+        'memory_ratio': round(float_bytes / quantized.nbytes, 1),
+        'reproducible': bool(np.array_equal(shuffled, predictions)
+                             and np.array_equal(single, predictions[:args.reproducibility_rows]))
+    }
+    if task == 'classification':
+        # MLP predictions are sigmoid probabilities * 1000, forest predictions are class labels * 1000
+        if name.startswith('mlp'):
+            agree = (predictions > 500) == (float_predictions > 500)
+        else:
+            agree = predictions == float_predictions
+        row['class_agreement'] = round(float(agree.mean()), 4)
+
+    for batch_size in args.batch_sizes:
+        batch = X_test[:batch_size]
+        row[f'batch_{batch_size}'] = {
+            'float': latency(lambda: float_fn(batch), args.repeats),
+            'quantized': latency(lambda: quantized.predict_scaled(batch), args.repeats)
+        }
+    logger.info(f"{name}: {row}")
+    return row
+
+
+def bench_forests(args, rng):
+    from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+
+    results = {}
+    for task, cls in [('classification', RandomForestClassifier), ('regression', RandomForestRegressor)]:
+        X, y = make_data(args.samples, args.features, task, rng)
+        n_train = int(len(X) * 0.8)
+        model = cls(n_estimators=args.estimators, random_state=args.seed, n_jobs=1).fit(X[:n_train], y[:n_train])
+        quantized = quantize_model(model)
+        results[f'forest_{task}'] = compare(f'forest_{task}', task, float_forest(model, task), quantized,
+                                            len(pickle.dumps(model)), X[n_train:], args, rng)
+    return results
+
+
+def bench_mlps(args, rng):
+    from src.ai.model import AIModel
+
+    results = {}
+    for task in ('classification', 'regression'):
+        X, y = make_data(args.samples, args.features, task, rng)
+        n_train, n_val = int(len(X) * 0.6), int(len(X) * 0.8)
+        ai_model = AIModel(args.features, 1, model_type=task, hidden_units=(64, 32), dropout_rates=0.2)
+        ai_model.train(X[:n_train], y[:n_train], X[n_train:n_val], y[n_train:n_val], epochs=args.epochs,
+                       checkpoint_path=None, verbose=0)
+        for bits in args.bits:
+            quantized = quantize_model(ai_model.model, X[:n_train], bits=bits, task=task)
+            name = f'mlp_{task}_int{bits}'
+            results[name] = compare(name, task, float_keras(ai_model.model), quantized,
+                                    ai_model.model.count_params() * 4, X[n_val:], args, rng)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark quantized inference')
+    parser.add_argument('--samples', type=int, default=5000)
+    parser.add_argument('--features', type=int, default=8)
+    parser.add_argument('--estimators', type=int, default=100)
+    parser.add_argument('--epochs', type=int, default=20)
+    parser.add_argument('--bits', type=int, nargs='+', default=[8, 16])
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 32, 256])
+    parser.add_argument('--repeats', type=int, default=100)
+    parser.add_argument('--reproducibility-rows', type=int, default=50)
+    parser.add_argument('--skip-keras', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_results/quantized.json')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    results = bench_forests(args, rng)
+    if not args.skip_keras:
+        results.update(bench_mlps(args, rng))
+
+    logger.info("=" * 60)
+    for name, row in results.items():
+        logger.info(f"{name}: exact prediction match {row['exact_prediction_match']}, "
+                    f"max diff {row['max_abs_prediction_diff']}, "
+                    + (f"class agreement {row['class_agreement']}, " if 'class_agreement' in row else "")
+                    + f"memory {row['float_bytes'] / 1e3:.1f} kB -> {row['quantized_bytes'] / 1e3:.1f} kB, "
+                    f"reproducible {row['reproducible']}")
+        for batch_size in args.batch_sizes:
+            timings = row[f'batch_{batch_size}']
+            logger.info(f"  batch {batch_size:4d}: " + ", ".join(
+                f"{path} p50 {t['p50_ms']}ms p99 {t['p99_ms']}ms" for path, t in timings.items()))
+    logger.info("=" * 60)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({'config': vars(args), 'results': results}, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
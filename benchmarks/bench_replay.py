@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Benchmark historical replay of oracle traffic through candidate models.
+
+Two parts:
+  - extraction: requests are sent to a locally deployed oracle and fulfilled
+    with the production model's answers, then pulled back with
+    extract_history() and checked against what was submitted;
+  - scoring: a synthetic history of --rows requests (answered by the
+    production model) is replayed through the production model itself
+    (which must agree exactly) and a candidate, single-process and over a
+    process pool, reporting rows/sec and the projected time for a million
+    requests.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+from web3.logs import DISCARD
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).parent))
+
+from local_chain import connect, deploy_contracts, send_transaction
+from src.ai.replay import History, ReplayEngine, extract_history
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def train_models(tmp, features, seed):
+    from sklearn.ensemble import RandomForestClassifier
+
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(0, 10, size=(5000, features))
+    y = (X.sum(axis=1) + rng.normal(0, 1.5, len(X)) > 5 * features).astype(int)
+    paths = {}
+    for name, params in (('production', dict(n_estimators=100, random_state=seed)),
+                         ('candidate', dict(n_estimators=50, max_depth=8, random_state=seed + 1))):
+        paths[name] = os.path.join(tmp, f'{name}.pkl')
+        joblib.dump(RandomForestClassifier(n_jobs=1, **params).fit(X, y), paths[name])
+    return paths
+
+
+def production_answers(model_path, inputs):
+    from src.ai.inference import InferenceModel
+
+    model = InferenceModel(model_path)
+    return model.predict_scaled_batch(model.preprocessing.transform(inputs.astype(np.float32)))
+
+
+def bench_extraction(args, paths, rng):
+    w3, keys = connect(args.rpc_url, args.private_keys)
+    oracle, ai_contract = deploy_contracts(w3, keys[0])
+    fee = ai_contract.functions.predictionFee().call()
+    from_block = w3.eth.block_number + 1
+
+    inputs = np.round(rng.uniform(0, 10, size=(args.chain_requests, args.features)), 3)
+    predictions, confidences = production_answers(paths['production'], inputs)
+    for i, row in enumerate(inputs):
+        receipt = send_transaction(w3, ai_contract.functions.requestPrediction(json.dumps(row.tolist()).encode()),
+                                   keys[1], value=fee)
+        event = oracle.events.PredictionRequested().process_receipt(receipt, errors=DISCARD)[0]
+        request_id = event['args']['requestId']
+        if i % 5:  # Leave every fifth request unanswered
+            send_transaction(w3, oracle.functions.fulfillPrediction(
+                request_id, int(predictions[i]), int(confidences[i])), keys[0])
+
+    start = time.perf_counter()
+    history = extract_history(w3, oracle.address, from_block, w3.eth.block_number, oracle.abi, chunk_blocks=50)
+    seconds = time.perf_counter() - start
+
+    answered = np.arange(len(inputs)) % 5 != 0
+    ok = (len(history) == len(inputs)
+          and np.array_equal(history['fulfilled'], answered)
+          and np.array_equal(history['prediction'][answered], predictions[answered])
+          and np.allclose(history['inputs'], inputs))
+    if not ok:
+        raise RuntimeError("Extracted history does not match the submitted requests")
+    report = ReplayEngine({'production': {'path': paths['production']}}).run(history)['production']
+    return {'requests': len(history), 'fulfilled': int(history['fulfilled'].sum()),
+            'extract_seconds': round(seconds, 3), 'production_exact_agreement': report['exact_agreement']}
+
+
+def synthetic_history(path, rows, features, model_path, rng):
+    inputs = np.round(rng.uniform(0, 10, size=(rows, features)), 3)
+    payloads = [json.dumps(row).encode() for row in inputs.tolist()]
+    offsets = np.zeros(rows + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(p) for p in payloads])
+    predictions, confidences = production_answers(model_path, inputs)
+    fulfilled = rng.uniform(size=rows) < 0.98
+    History({
+        'request_id': np.frombuffer(rng.bytes(32 * rows), dtype=np.uint8).reshape(rows, 32),
+        'request_block': np.arange(rows, dtype=np.int64) // 10,
+        'input_offsets': offsets,
+        'input_blob': np.frombuffer(b''.join(payloads), dtype=np.uint8),
+        'inputs': inputs,
+        'fulfilled': fulfilled,
+        'prediction': np.where(fulfilled, predictions, 0),
+        'confidence': np.where(fulfilled, confidences, 0),
+        'fulfilled_block': np.where(fulfilled, np.arange(rows) // 10 + 1, -1)
+    }, {'synthetic': True}).save(path)
+    return path
+
+
+def bench_scoring(args, paths, tmp, rng):
+    history_path = synthetic_history(os.path.join(tmp, 'history.npz'), args.rows, args.features,
+                                     paths['production'], rng)
+    start = time.perf_counter()
+    history = History.load(history_path)
+    load_seconds = time.perf_counter() - start
+
+    candidates = {name: {'path': path, 'type': 'sklearn'} for name, path in paths.items()}
+    results = {'rows': len(history), 'file_mb': round(os.path.getsize(history_path) / 1e6, 1),
+               'load_seconds': round(load_seconds, 3)}
+    for workers in sorted({1, args.workers}):
+        start = time.perf_counter()
+        engine = ReplayEngine(candidates, batch_size=args.batch_size, workers=workers, tolerance=args.tolerance)
+        report = engine.run(history)
+        seconds = time.perf_counter() - start
+        results[f'workers_{workers}'] = {
+            'seconds': round(seconds, 2),
+            'rows_per_sec': round(len(history) * len(candidates) / seconds),
+            'projected_minutes_per_million': round(seconds / len(history) * 1e6 / 60, 2),
+            'report': report
+        }
+    if results['workers_1']['report']['production']['exact_agreement'] != 1.0:
+        raise RuntimeError("Replaying the production model did not reproduce its own answers")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark historical replay')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--features', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=65536)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--tolerance', type=int, default=0)
+    parser.add_argument('--chain-requests', type=int, default=50)
+    parser.add_argument('--rpc-url', default=None, help='JSON-RPC dev node (default: in-process eth-tester)')
+    parser.add_argument('--private-keys', nargs='*', default=None)
+    parser.add_argument('--skip-chain', action='store_true')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_results/replay.json')
+    args = parser.parse_args()
+
+    logging.getLogger('src.ai.inference').setLevel(logging.WARNING)
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = train_models(tmp, args.features, args.seed)
+        results = {'scoring': bench_scoring(args, paths, tmp, rng)}
+        if not args.skip_chain:
+            results['extraction'] = bench_extraction(args, paths, rng)
+
+    logger.info("=" * 60)
+    scoring = results['scoring']
+    logger.info(f"History: {scoring['rows']} rows, {scoring['file_mb']} MB, loaded in {scoring['load_seconds']}s")
+    for key in (k for k in scoring if k.startswith('workers_')):
+        row = scoring[key]
+        logger.info(f"{key}: {row['seconds']}s, {row['rows_per_sec']} rows/s, "
+                    f"{row['projected_minutes_per_million']} min per million requests")
+        for name, report in row['report'].items():
+            logger.info(f"  {name}: exact agreement {report['exact_agreement']:.4f}, "
+                        f"mean |diff| {report['mean_abs_diff']:.1f}, "
+                        f"confidence shift {report['mean_confidence_shift']:+.2f}, "
+                        f"{report['us_per_row']:.2f}us/row")
+    if 'extraction' in results:
+        extraction = results['extraction']
+        logger.info(f"Extraction: {extraction['requests']} requests ({extraction['fulfilled']} fulfilled) "
+                    f"in {extraction['extract_seconds']}s, production agreement "
+                    f"{extraction['production_exact_agreement']}")
+    logger.info("=" * 60)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({'config': vars(args), 'results': results}, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark priority scheduling under overload.
+
+Requests arrive as a Poisson stream at --load times the bridge's capacity,
+with --high-value-share of them paying --high-value-multiple times the base
+fee. Workers run the real model (InferenceModel.predict_scaled) and then hold
+their slot for a simulated submission (--submit-ms, log-normal), as bridge
+workers do while a fulfillment is signed, sent and mined.
+
+The same arrival trace is run through arrival-order scheduling (an unbounded
+queue, every request ranked equally) and through PriorityScheduler with a
+bounded queue, a reserved slot for high-value requests and a maximum age.
+Reports queue-to-completion p50/p99 latency for high-value and other
+requests, and how many requests each policy shed.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).parent))
+
+from local_chain import train_demo_model
+from src.ai.inference import InferenceModel
+from src.ai.scheduler import PriorityScheduler
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BASE_FEE = 10 ** 16  # AIContract's default predictionFee (0.01 ETH)
+
+
+def measure_capacity(model, args):
+    """Requests/sec the workers sustain: inference runs on the event loop, submissions overlap"""
+    # Distinct inputs, so the model's prediction cache doesn't flatter the estimate
+    inputs = np.random.default_rng(args.seed + 1).uniform(0, 10, size=(20, 3)).tolist()
+    start = time.perf_counter()
+    for features in inputs:
+        model.predict_scaled(features)
+    inference = (time.perf_counter() - start) / len(inputs)
+    return min(1 / inference, args.max_in_flight / (inference + args.submit_ms / 1e3))
+
+
+def make_trace(args, capacity, rng):
+    """(arrival offset seconds, fee, input) for every request"""
+    gaps = rng.exponential(1 / (capacity * args.load), args.requests)
+    high = rng.uniform(size=args.requests) < args.high_value_share
+    fees = np.where(high, BASE_FEE * args.high_value_multiple, BASE_FEE)
+    inputs = np.round(rng.uniform(0, 10, size=(args.requests, 3)), 3)
+    return list(zip(np.cumsum(gaps), fees.tolist(), inputs.tolist()))
+
+
+def percentiles(seconds):
+    if not seconds:
+        return None
+    ms = np.array(seconds) * 1e3
+    return {'p50_ms': round(float(np.percentile(ms, 50)), 1), 'p99_ms': round(float(np.percentile(ms, 99)), 1),
+            'completed': len(ms)}
+
+
+async def run_policy(scheduler, trace, model, args, by_fee=True):
+    """Replay the trace through `scheduler`; without by_fee every request is ranked at the base fee"""
+    model.clear_cache()
+    rng = np.random.default_rng(args.seed)
+    submit_seconds = rng.lognormal(np.log(args.submit_ms / 1e3), 0.3, len(trace))
+    high_value_fee = BASE_FEE * args.high_value_multiple
+    latencies = {True: [], False: []}
+
+    async def worker():
+        while True:
+            job = await scheduler.get()
+            try:
+                model.predict_scaled(job['input'])
+                await asyncio.sleep(submit_seconds[job['index']])
+            finally:
+                await scheduler.done(job)
+            offset, fee, _ = trace[job['index']]
+            latencies[fee >= high_value_fee].append(time.perf_counter() - start - offset)
+
+    workers = [asyncio.create_task(worker()) for _ in range(args.max_in_flight)]
+    start = time.perf_counter()
+    for i, (offset, fee, features) in enumerate(trace):
+        delay = start + offset - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        await scheduler.put(i.to_bytes(32, 'big'), b'', fee=fee if by_fee else BASE_FEE, index=i, input=features)
+    while len(scheduler) or scheduler.in_flight:
+        await asyncio.sleep(0.01)
+    seconds = time.perf_counter() - start
+    for task in workers:
+        task.cancel()
+
+    stats = scheduler.get_stats()
+    return {
+        'seconds': round(seconds, 2),
+        'high_value_latency': percentiles(latencies[True]),
+        'other_latency': percentiles(latencies[False]),
+        'shed_overflow': stats['shed_overflow'],
+        'shed_expired': stats['shed_expired'],
+        'deferred': stats['deferred']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark priority scheduling under overload')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--load', type=float, default=2.0, help='Arrival rate as a multiple of capacity')
+    parser.add_argument('--high-value-share', type=float, default=0.1)
+    parser.add_argument('--high-value-multiple', type=int, default=5)
+    parser.add_argument('--max-in-flight', type=int, default=4)
+    parser.add_argument('--reserved-slots', type=int, default=1)
+    parser.add_argument('--max-pending', type=int, default=200)
+    parser.add_argument('--max-age', type=float, default=5.0)
+    parser.add_argument('--submit-ms', type=float, default=20.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_results/scheduler.json')
+    args = parser.parse_args()
+
+    logging.getLogger('src.ai.inference').setLevel(logging.WARNING)
+    logging.getLogger('src.ai.scheduler').setLevel(logging.ERROR)
+    with tempfile.TemporaryDirectory() as tmp:
+        model = InferenceModel(train_demo_model(os.path.join(tmp, 'model.pkl')))
+    capacity = measure_capacity(model, args)
+    trace = make_trace(args, capacity, np.random.default_rng(args.seed))
+
+    results = {'capacity_per_sec': round(capacity), 'arrivals_per_sec': round(capacity * args.load)}
+    # Arrival order: every request ranked equally, nothing shed
+    fifo = PriorityScheduler(max_pending=len(trace), max_in_flight=args.max_in_flight, reserved_slots=0)
+    results['arrival_order'] = asyncio.run(run_policy(fifo, trace, model, args, by_fee=False))
+
+    priority = PriorityScheduler(max_pending=args.max_pending, max_in_flight=args.max_in_flight,
+                                 reserved_slots=args.reserved_slots,
+                                 high_value_fee=BASE_FEE * args.high_value_multiple,
+                                 max_age=args.max_age)
+    results['priority'] = asyncio.run(run_policy(priority, trace, model, args))
+
+    logger.info("=" * 60)
+    logger.info(f"Capacity ~{results['capacity_per_sec']}/s, arrivals {results['arrivals_per_sec']}/s "
+                f"({args.requests} requests, {args.high_value_share:.0%} high-value)")
+    for name in ('arrival_order', 'priority'):
+        row = results[name]
+        for label, key in (('high-value', 'high_value_latency'), ('other', 'other_latency')):
+            latency = row[key] or {'p50_ms': None, 'p99_ms': None, 'completed': 0}
+            logger.info(f"{name} {label}: p50 {latency['p50_ms']}ms, p99 {latency['p99_ms']}ms "
+                        f"({latency['completed']} completed)")
+        logger.info(f"{name}: shed {row['shed_overflow']} (queue full) + {row['shed_expired']} (expired) "
+                    f"in {row['seconds']}s")
+    logger.info("=" * 60)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({'config': vars(args), 'results': results}, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
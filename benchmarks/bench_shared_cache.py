@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shared cross-process prediction cache.
+
+--processes replicas each load the model and serve --requests requests
+drawn from a Zipf distribution over --distinct feature vectors, as callers
+resending popular inputs do. Three runs:
+  - per-process cache only (every replica starts cold and warms alone);
+  - per-process cache backed by the shared SQLite cache;
+  - a restart: fresh replicas on the shared cache file left by the previous
+    run.
+Reports the combined hit rate, request throughput, p50/p99 latency of all
+requests and of shared-cache hits, and raw SharedPredictionCache.get
+latency while the other replicas are writing.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).parent))
+
+from local_chain import train_demo_model
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def percentiles(seconds):
+    if not seconds:
+        return None
+    us = np.array(seconds) * 1e6
+    return {'p50_us': round(float(np.percentile(us, 50)), 1), 'p99_us': round(float(np.percentile(us, 99)), 1)}
+
+
+def replica(model_path, cache_config, vectors, requests, zipf, seed, start_at):
+    """One serving process; returns its counters and latency samples"""
+    from src.ai.inference import InferenceModel
+
+    logging.getLogger('src.ai.inference').setLevel(logging.WARNING)
+    model = InferenceModel(model_path, shared_cache=cache_config)
+    rng = np.random.default_rng(seed)
+    order = (rng.zipf(zipf, requests) - 1) % len(vectors)
+
+    while time.time() < start_at:  # Start together so replicas overlap
+        time.sleep(0.001)
+    seen = set()
+    latencies, shared_hit_latencies = [], []
+    local_hits = 0
+    start = time.perf_counter()
+    for index in order:
+        shared_hits = model.shared_cache.hits if model.shared_cache is not None else 0
+        local_hits += index in seen
+        seen.add(index)
+        t = time.perf_counter()
+        model.predict_with_confidence(vectors[index])
+        latencies.append(time.perf_counter() - t)
+        if model.shared_cache is not None and model.shared_cache.hits > shared_hits:
+            shared_hit_latencies.append(latencies[-1])
+    seconds = time.perf_counter() - start
+
+    get_latencies = []
+    if model.shared_cache is not None:
+        for index in rng.integers(0, len(vectors), 500):
+            t = time.perf_counter()
+            model.shared_cache.get(vectors[index])
+            get_latencies.append(time.perf_counter() - t)
+    return {'seconds': seconds, 'local_hits': local_hits,
+            'shared_hits': len(shared_hit_latencies), 'latencies': latencies,
+            'shared_hit_latencies': shared_hit_latencies, 'get_latencies': get_latencies}
+
+
+def run(args, model_path, cache_config, vectors, seed):
+    start_at = time.time() + 3 + 0.5 * args.processes  # Time for every replica to load the model
+    jobs = [(model_path, cache_config, vectors, args.requests, args.zipf, seed + i, start_at)
+            for i in range(args.processes)]
+    with multiprocessing.get_context('spawn').Pool(args.processes) as pool:
+        replicas = pool.starmap(replica, jobs)
+
+    total = args.requests * args.processes
+    local = sum(r['local_hits'] for r in replicas)
+    shared = sum(r['shared_hits'] for r in replicas)
+    return {
+        'requests': total,
+        'local_hit_rate': round(local / total, 4),
+        'shared_hit_rate': round(shared / total, 4),
+        'hit_rate': round((local + shared) / total, 4),
+        'requests_per_sec': round(total / max(r['seconds'] for r in replicas)),
+        'latency': percentiles([s for r in replicas for s in r['latencies']]),
+        'shared_hit_latency': percentiles([s for r in replicas for s in r['shared_hit_latencies']]),
+        'shared_get_latency': percentiles([s for r in replicas for s in r['get_latencies']])
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the shared cross-process prediction cache')
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per process')
+    parser.add_argument('--distinct', type=int, default=5000, help='Distinct feature vectors callers send')
+    parser.add_argument('--zipf', type=float, default=1.2)
+    parser.add_argument('--max-entries', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_results/shared_cache.json')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vectors = np.round(rng.uniform(0, 10, size=(args.distinct, 3)), 3).tolist()
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = train_demo_model(os.path.join(tmp, 'model.pkl'))
+        cache_config = {'enabled': True, 'db_path': os.path.join(tmp, 'predictions.db'),
+                        'max_entries': args.max_entries}
+        results = {
+            'local_only': run(args, model_path, None, vectors, args.seed),
+            'shared': run(args, model_path, cache_config, vectors, args.seed),
+            # New replicas, same traffic pattern, cache file left by the previous run
+            'restart': run(args, model_path, cache_config, vectors, args.seed + 1000)
+        }
+        results['shared_db_mb'] = round(os.path.getsize(cache_config['db_path']) / 1e6, 2)
+
+    logger.info("=" * 60)
+    logger.info(f"{args.processes} processes x {args.requests} requests over {args.distinct} distinct inputs "
+                f"(zipf {args.zipf})")
+    for name in ('local_only', 'shared', 'restart'):
+        row = results[name]
+        logger.info(f"{name}: hit rate {row['hit_rate']:.1%} (local {row['local_hit_rate']:.1%}, "
+                    f"shared {row['shared_hit_rate']:.1%}), {row['requests_per_sec']} req/s, "
+                    f"p50 {row['latency']['p50_us']}us, p99 {row['latency']['p99_us']}us")
+        if row['shared_get_latency']:
+            logger.info(f"  shared hit p50 {row['shared_hit_latency']['p50_us']}us; "
+                        f"SharedPredictionCache.get p50 {row['shared_get_latency']['p50_us']}us, "
+                        f"p99 {row['shared_get_latency']['p99_us']}us")
+    logger.info("=" * 60)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({'config': vars(args), 'results': results}, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
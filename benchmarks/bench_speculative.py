@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Benchmark speculative inference on pending requests.
+
+An in-process chain mines a block every --block-time seconds. Requesters
+send requestPrediction transactions at random times. Some are replaced by a
+same-nonce transfer before they are mined (dropped), and some pay too
+little and revert. A fulfiller answers every request that lands:
+  - baseline: like the bridge, it polls the oracle's PredictionRequested
+    logs every --poll-interval seconds, then predicts and submits;
+  - speculative: SpeculativeExecutor predicts while requests are pending
+    and submits as soon as the mined log shows up. The baseline poll still
+    runs for anything it missed.
+Reports request-to-fulfillment latency (request sent -> block carrying the
+fulfillment) and mined-to-signed latency (request mined -> fulfillment
+signed), and checks that dropped and reverted requests were discarded.
+
+eth-tester only mines pending transactions with EIP-1559 fees on its chain
+id and admits one pending transaction per sender, so requests are spread
+over freshly funded accounts. The shipped AIOracle artifact only accepts
+fulfillments from the owner, so fulfillments are signed as the bridge would
+sign them and counted as landing in the first block mined afterwards.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).parent))
+
+from local_chain import connect, deploy_contracts, train_demo_model
+from src.ai.inference import InferenceModel
+from src.ai.log_decoder import LogDecoder, schemas_from_abi
+from src.ai.speculative import SpeculativeExecutor
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class Chain:
+    """eth-tester mining a block every block_time, with requester accounts that each have at most one pending transaction"""
+
+    def __init__(self, w3, funder_keys, requesters):
+        self.w3 = w3
+        self.tester = w3.provider.ethereum_tester
+        self.block_mined_at = {}
+        # eth-tester validates pending transactions against the head state,
+        # so an account can only have one transaction in each block
+        self.accounts = [w3.eth.account.create() for _ in range(requesters)]
+        for i, account in enumerate(self.accounts):
+            funder = w3.eth.account.from_key(funder_keys[i % len(funder_keys)])
+            tx = {'to': account.address, 'value': 10 ** 20, 'gas': 21000, 'gasPrice': w3.eth.gas_price,
+                  'nonce': w3.eth.get_transaction_count(funder.address), 'chainId': w3.eth.chain_id}
+            w3.eth.wait_for_transaction_receipt(w3.eth.send_raw_transaction(funder.sign_transaction(tx).raw_transaction))
+        self.nonces = {account.address: 0 for account in self.accounts}
+        self.sent_in_block = {account.address: -1 for account in self.accounts}
+        self.tester.disable_auto_mine_transactions()
+
+    async def free_account(self):
+        while True:
+            head = self.w3.eth.block_number
+            for account in self.accounts:
+                if self.sent_in_block[account.address] < head:
+                    return account
+            await asyncio.sleep(0.01)
+
+    def send(self, account, tx, value=0, nonce=None, tip=10 ** 9):
+        # Type-2 fees: eth-tester rejects pending legacy transactions on its chain id
+        nonce = self.nonces[account.address] if nonce is None else nonce
+        tx = dict(tx, nonce=nonce, value=value, chainId=self.w3.eth.chain_id,
+                  maxFeePerGas=10 * tip, maxPriorityFeePerGas=tip)
+        tx_hash = self.w3.eth.send_raw_transaction(account.sign_transaction(tx).raw_transaction)
+        self.nonces[account.address] = nonce + 1
+        self.sent_in_block[account.address] = self.w3.eth.block_number
+        return bytes(tx_hash), nonce
+
+    def replace(self, account, nonce):
+        """Drop a pending transaction by sending a pricier transfer with its nonce"""
+        self.send(account, {'to': account.address, 'gas': 21000}, nonce=nonce, tip=2 * 10 ** 9)
+
+    def next_block_after(self, moment):
+        return min((block for block, mined in self.block_mined_at.items() if mined >= moment), default=None)
+
+    async def mine(self, block_time):
+        while True:
+            await asyncio.sleep(block_time)
+            self.tester.mine_blocks(1)
+            self.block_mined_at[self.w3.eth.block_number] = time.perf_counter()
+            # eth-tester keeps every hash a pending filter ever reported and
+            # re-reads all of them on each send; the block took them all
+            for pending_filter in self.tester._pending_transaction_filters.values():
+                pending_filter.values.clear()
+
+
+def percentiles(seconds):
+    ms = np.array(seconds) * 1e3
+    return {'p50_ms': round(float(np.percentile(ms, 50)), 1), 'p99_ms': round(float(np.percentile(ms, 99)), 1)}
+
+
+async def run_mode(args, model_path, speculative):
+    w3, keys = connect()
+    oracle, ai_contract = deploy_contracts(w3, keys[0])
+    fee = ai_contract.functions.predictionFee().call()
+    chain = Chain(w3, keys[1:], args.requesters)
+
+    model = InferenceModel(model_path)
+    predict = lambda input_data: model.predict_scaled(json.loads(input_data))
+    request_logs = LogDecoder([schemas_from_abi(oracle.abi)['PredictionRequested']])
+    owner = w3.eth.account.from_key(keys[0])
+    owner_nonce = w3.eth.get_transaction_count(owner.address)
+    signed_at = {}
+
+    def submit(event, result):
+        # Signed exactly as the bridge would; only the owner may fulfill with the
+        # shipped artifacts, so it lands in the next block instead of being sent
+        nonlocal owner_nonce
+        request_id = bytes(event['args']['requestId'])
+        tx = oracle.functions.fulfillPrediction(request_id, *result).build_transaction({
+            'from': owner.address, 'gas': 300000, 'maxFeePerGas': 10 ** 10, 'maxPriorityFeePerGas': 10 ** 9,
+            'nonce': owner_nonce, 'chainId': w3.eth.chain_id})
+        owner.sign_transaction(tx)
+        owner_nonce += 1
+        signed_at[request_id] = time.perf_counter()
+
+    executor = None
+    if speculative:
+        executor = SpeculativeExecutor(w3, ai_contract.address, oracle.address, request_logs, predict,
+                                       drop_check_interval=0.5)
+
+        async def release(event, result):
+            submit(event, result)
+
+    async def regular_path():
+        last_block = w3.eth.block_number
+        # Out of phase with the miner, as the bridge's timer would be on average
+        await asyncio.sleep(args.poll_interval / 2)
+        while True:
+            await asyncio.sleep(args.poll_interval)
+            head = w3.eth.block_number
+            if head > last_block:
+                events = request_logs.get_logs(w3, oracle.address, last_block + 1, head)
+                if executor is not None:
+                    events = executor.unreleased(events)
+                for event in events:
+                    submit(event, predict(bytes(event['args']['inputData'])))
+                last_block = head
+
+    rng = np.random.default_rng(args.seed)
+    model.clear_cache()
+    tasks = [asyncio.create_task(chain.mine(args.block_time)), asyncio.create_task(regular_path())]
+    if executor is not None:
+        tasks.append(asyncio.create_task(executor.run(release, args.speculative_poll_interval)))
+
+    kinds = np.array(['ok'] * args.requests, dtype=object)
+    kinds[:round(args.underpaid_share * args.requests)] = 'underpaid'
+    kinds[-round(args.drop_share * args.requests):] = 'dropped'
+    rng.shuffle(kinds)
+
+    sent_at, replaced, underpaid = {}, 0, 0
+    for kind in kinds:
+        await asyncio.sleep(rng.exponential(args.interarrival))
+        account = await chain.free_account()
+        payload = json.dumps(np.round(rng.uniform(0, 10, 3), 3).tolist()).encode()
+        call = ai_contract.functions.requestPrediction(payload).build_transaction(
+            {'from': account.address, 'gas': 500000, 'maxFeePerGas': 10 ** 10, 'maxPriorityFeePerGas': 10 ** 9})
+        if kind == 'underpaid':
+            chain.send(account, {'to': call['to'], 'data': call['data'], 'gas': 500000}, value=0)
+            underpaid += 1
+        elif kind == 'dropped':
+            mined = w3.eth.block_number
+            _, nonce = chain.send(account, {'to': call['to'], 'data': call['data'], 'gas': 500000}, value=fee)
+            # Let the watcher stage it, then replace it if it is still pending
+            await asyncio.sleep(args.speculative_poll_interval * 2)
+            if w3.eth.block_number == mined:
+                chain.replace(account, nonce)
+                replaced += 1
+        else:
+            tx_hash, _ = chain.send(account, {'to': call['to'], 'data': call['data'], 'gas': 500000}, value=fee)
+            sent_at[tx_hash] = time.perf_counter()
+
+    await asyncio.sleep(args.block_time * 2 + args.poll_interval * 2)
+    for task in tasks:
+        task.cancel()
+
+    requests = {bytes(e['transactionHash']): e
+                for e in request_logs.get_logs(w3, oracle.address, 1, w3.eth.block_number)}
+    end_to_end, reaction = [], []
+    for tx_hash, sent in sent_at.items():
+        event = requests.get(tx_hash)
+        if event is None or bytes(event['args']['requestId']) not in signed_at:
+            continue
+        signed = signed_at[bytes(event['args']['requestId'])]
+        block = chain.next_block_after(signed)
+        if block is None:
+            continue
+        end_to_end.append(chain.block_mined_at[block] - sent)
+        reaction.append(signed - chain.block_mined_at[event['blockNumber']])
+
+    return {
+        'requests': len(sent_at),
+        'fulfilled': len(end_to_end),
+        'replaced': replaced,
+        'underpaid': underpaid,
+        'request_to_fulfillment': percentiles(end_to_end),
+        'mined_to_signed': percentiles(reaction),
+        'speculative': executor.get_stats() if executor is not None else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark speculative inference on pending requests')
+    parser.add_argument('--requests', type=int, default=120)
+    parser.add_argument('--interarrival', type=float, default=0.15, help='Mean seconds between requests')
+    parser.add_argument('--block-time', type=float, default=2.0)
+    parser.add_argument('--poll-interval', type=float, default=5.0, help="The bridge's log polling interval")
+    parser.add_argument('--speculative-poll-interval', type=float, default=0.25)
+    parser.add_argument('--requesters', type=int, default=32, help='Funded requester accounts')
+    parser.add_argument('--drop-share', type=float, default=0.05)
+    parser.add_argument('--underpaid-share', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_results/speculative.json')
+    args = parser.parse_args()
+
+    logging.getLogger('src.ai.inference').setLevel(logging.WARNING)
+    logging.getLogger('src.ai.speculative').setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmp:
+        model_path = train_demo_model(os.path.join(tmp, 'model.pkl'))
+        results = {
+            'baseline': asyncio.run(run_mode(args, model_path, speculative=False)),
+            'speculative': asyncio.run(run_mode(args, model_path, speculative=True))
+        }
+
+    stats = results['speculative']['speculative']
+    # Requests mined before the watcher saw them are never staged, so every
+    # staged result must have been released, taken or discarded by now
+    if stats['staged'] or stats['expired']:
+        raise RuntimeError(f"Speculative results for dropped/reverted requests were not discarded: {stats}")
+
+    logger.info("=" * 60)
+    logger.info(f"Block time {args.block_time}s, bridge poll interval {args.poll_interval}s")
+    for name in ('baseline', 'speculative'):
+        row = results[name]
+        logger.info(f"{name}: {row['fulfilled']}/{row['requests']} fulfilled; request->fulfillment "
+                    f"p50 {row['request_to_fulfillment']['p50_ms']}ms p99 {row['request_to_fulfillment']['p99_ms']}ms; "
+                    f"mined->signed p50 {row['mined_to_signed']['p50_ms']}ms "
+                    f"p99 {row['mined_to_signed']['p99_ms']}ms")
+    logger.info(f"Speculative: {stats['released']} released, {stats['dropped']} dropped and "
+                f"{stats['reverted']} reverted discarded, {stats['overtaken']} taken by the regular path")
+    logger.info("=" * 60)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({'config': vars(args), 'results': results}, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark in-memory AIModel.train against tf.data streaming training.
+Reports training steps/sec for both paths on the same synthetic data.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+import tensorflow as tf
+
+from demo import create_sample_shards
+from src.ai.data_pipeline import StreamingDataset
+from src.ai.model import AIModel
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class StepTimer(tf.keras.callbacks.Callback):
+    """Counts training steps and wall time spent inside fit()"""
+
+    def on_train_begin(self, logs=None):
+        self.steps = 0
+        self.start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        self.steps += 1
+
+    def on_train_end(self, logs=None):
+        self.elapsed = time.perf_counter() - self.start
+
+    @property
+    def steps_per_sec(self):
+        return self.steps / self.elapsed if self.elapsed else 0.0
+
+
+def run_in_memory(shard_paths, epochs, batch_size):
+    """Load every shard into RAM and train with the existing path"""
+    # write_shards stores features with the label as the last column
+    data = np.concatenate([np.load(p) for p in shard_paths])
+    X, y = data[:, :-1], data[:, -1]
+
+    model = AIModel(input_dim=3, output_dim=1, model_type='classification')
+    timer = StepTimer()
+    model._build_callbacks = lambda *args, **kwargs: [timer]
+    model.train(X, y, epochs=epochs, batch_size=batch_size)
+    return timer
+
+
+def run_streaming(shard_paths, epochs, batch_size, shuffle_buffer):
+    """Stream the same shards through the tf.data pipeline"""
+    dataset = StreamingDataset.from_shards(shard_paths, input_dim=3, shuffle_buffer=shuffle_buffer)
+
+    model = AIModel(input_dim=3, output_dim=1, model_type='classification')
+    timer = StepTimer()
+    model._build_callbacks = lambda *args, **kwargs: [timer]
+    model.train_streaming(dataset, epochs=epochs, batch_size=batch_size)
+    return timer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--shards', type=int, default=8)
+    parser.add_argument('--samples-per-shard', type=int, default=50000)
+    parser.add_argument('--epochs', type=int, default=2)
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--shuffle-buffer', type=int, default=10000)
+    parser.add_argument('--output', help='Optional JSON results file')
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        shard_paths = create_sample_shards(tmp, args.shards, args.samples_per_shard)
+        os.chdir(tmp)
+        try:
+            in_memory = run_in_memory(shard_paths, args.epochs, args.batch_size)
+            streaming = run_streaming(shard_paths, args.epochs, args.batch_size, args.shuffle_buffer)
+        finally:
+            os.chdir(cwd)
+
+    results = {
+        'rows': args.shards * args.samples_per_shard,
+        'epochs': args.epochs,
+        'batch_size': args.batch_size,
+        'in_memory_steps_per_sec': round(in_memory.steps_per_sec, 2),
+        'streaming_steps_per_sec': round(streaming.steps_per_sec, 2),
+        'streaming_relative': round(streaming.steps_per_sec / in_memory.steps_per_sec, 3)
+    }
+
+    logger.info("=" * 60)
+    logger.info(f"In-memory: {results['in_memory_steps_per_sec']} steps/sec")
+    logger.info(f"Streaming: {results['streaming_steps_per_sec']} steps/sec "
+                f"({results['streaming_relative']}x)")
+    logger.info("=" * 60)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
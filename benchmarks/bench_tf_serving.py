@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Benchmark the traced TensorFlow serving path against Keras `model.predict`.
+
+Reports:
+  - start-up: loading the saved model and answering the first request with
+    `model.predict` (which traces on that request), versus building
+    TracedKerasModel (tracing and warming every bucket) and its first request;
+  - per batch size, median latency of `model.predict` and of the traced
+    buckets (with zero padding to the nearest bucket), and the largest
+    difference between their outputs;
+  - InferenceModel.predict_with_confidence on cache misses with the serving
+    path enabled and disabled.
+
+Thread pools are sized from --intra-op-threads/--inter-op-threads before
+TensorFlow starts, as InferenceModel does from config['model']['tf_serving'].
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.ai.tf_serving import DEFAULT_BUCKETS, TracedKerasModel, configure_threads
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def median_seconds(fn, min_time=0.5, min_repeats=10, max_repeats=2000):
+    timings = []
+    deadline = time.perf_counter() + min_time
+    while len(timings) < min_repeats or (time.perf_counter() < deadline and len(timings) < max_repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def build_model(path, features, seed):
+    from src.ai.model import AIModel
+
+    rng = np.random.default_rng(seed)
+    X = rng.random((2000, features)).astype(np.float32)
+    y = (X[:, 0] + X[:, -1] > 1).astype(int)
+    model = AIModel(input_dim=features, output_dim=1, model_type='classification')
+    model.train(X, y, epochs=1, batch_size=64, checkpoint_path=None, verbose=0)
+    model.save_model(path)
+    return path
+
+
+def bench_startup(path, buckets, features):
+    from tensorflow.keras.models import load_model
+
+    row = np.random.default_rng(1).random((1, features)).astype(np.float32)
+    start = time.perf_counter()
+    model = load_model(path)
+    loaded = time.perf_counter()
+    load_seconds = loaded - start
+    model.predict(row, verbose=0)
+    keras_first = time.perf_counter() - loaded
+
+    model = load_model(path)
+    start = time.perf_counter()
+    serving = TracedKerasModel(model, buckets)
+    warmed = time.perf_counter()
+    serving.predict(row)
+    traced_first = time.perf_counter() - warmed
+    return {
+        'load_seconds': round(load_seconds, 3),
+        'keras_first_request_ms': round(keras_first * 1e3, 2),
+        'trace_and_warmup_seconds': round(warmed - start, 3),
+        'traced_first_request_ms': round(traced_first * 1e3, 2)
+    }, model, serving
+
+
+def bench_batches(model, serving, batch_sizes, features, rng):
+    results = {}
+    for batch_size in batch_sizes:
+        X = rng.random((batch_size, features)).astype(np.float32)
+        max_diff = float(np.abs(model.predict(X, verbose=0) - serving.predict(X)).max())
+        keras = median_seconds(lambda: model.predict(X, verbose=0))
+        traced = median_seconds(lambda: serving.predict(X))
+        results[batch_size] = {
+            'keras_predict_ms': round(keras * 1e3, 3),
+            'traced_ms': round(traced * 1e3, 3),
+            'speedup': round(keras / traced, 1),
+            'max_abs_diff': max_diff
+        }
+    return results
+
+
+def bench_inference_model(path, buckets, features, rng):
+    from src.ai.inference import InferenceModel
+
+    results = {}
+    for name, tf_serving in (('keras_predict', {'enabled': False}), ('traced', {'buckets': buckets})):
+        inference = InferenceModel(path, 'tensorflow', tf_serving=tf_serving)
+        rows = iter(rng.random((100000, features)).round(6).tolist())
+        results[name] = round(median_seconds(lambda: inference.predict_with_confidence(next(rows))) * 1e3, 3)
+    results['speedup'] = round(results['keras_predict'] / results['traced'], 1)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark traced TensorFlow serving against model.predict')
+    parser.add_argument('--features', type=int, default=8)
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32, 64, 200])
+    parser.add_argument('--buckets', type=int, nargs='+', default=list(DEFAULT_BUCKETS))
+    parser.add_argument('--intra-op-threads', type=int, default=None)
+    parser.add_argument('--inter-op-threads', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='bench_results/tf_serving.json')
+    args = parser.parse_args()
+
+    configure_threads(args.intra_op_threads, args.inter_op_threads)
+    logging.getLogger('src.ai.inference').setLevel(logging.WARNING)
+    rng = np.random.default_rng(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = build_model(os.path.join(tmp, 'model.h5'), args.features, args.seed)
+        startup, model, serving = bench_startup(path, args.buckets, args.features)
+        results = {
+            'startup': startup,
+            'batches': bench_batches(model, serving, args.batch_sizes, args.features, rng),
+            'inference_model_ms': bench_inference_model(path, args.buckets, args.features, rng),
+            'serving_stats': serving.get_stats()
+        }
+
+    logger.info("=" * 60)
+    startup = results['startup']
+    logger.info(f"First request: model.predict {startup['keras_first_request_ms']}ms; traced "
+                f"{startup['traced_first_request_ms']}ms after {startup['trace_and_warmup_seconds']}s of warmup")
+    for batch_size, row in results['batches'].items():
+        logger.info(f"batch {batch_size:>4}: model.predict {row['keras_predict_ms']}ms, traced {row['traced_ms']}ms "
+                    f"({row['speedup']}x, max |diff| {row['max_abs_diff']:.1e})")
+    end_to_end = results['inference_model_ms']
+    logger.info(f"InferenceModel.predict_with_confidence (cache miss): model.predict "
+                f"{end_to_end['keras_predict']}ms, traced {end_to_end['traced']}ms ({end_to_end['speedup']}x)")
+    logger.info("=" * 60)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({'config': vars(args), 'results': results}, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark transaction signing throughput: inline signing on one thread
+versus TransactionSigner's worker pool at increasing worker counts, reported
+as transactions/sec and transactions/sec per core. With --chain the signer
+also submits fulfillPrediction-sized transactions to an in-process EVM and
+the run checks that every one is mined in nonce order.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+from eth_account import Account
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).parent))
+
+from src.ai.tx_signer import TransactionSigner, _sign, create_executor
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PRIVATE_KEY = '0x' + '11' * 32
+# fulfillPrediction(bytes32,int256,uint256) calldata size
+CALLDATA = '0x' + 'ab' * (4 + 32 * 3)
+
+
+def make_transactions(n, chain_id=1):
+    sender, to = Account.from_key(PRIVATE_KEY).address, Account.from_key('0x' + '22' * 32).address
+    return [{
+        'from': sender,
+        'to': to,
+        'value': 0,
+        'gas': 300000,
+        'gasPrice': 20000000000,
+        'nonce': nonce,
+        'chainId': chain_id,
+        'data': CALLDATA
+    } for nonce in range(n)]
+
+
+def bench_inline(transactions):
+    account = Account.from_key(PRIVATE_KEY)
+    start = time.perf_counter()
+    for transaction in transactions:
+        _sign(transaction, account)
+    return len(transactions) / (time.perf_counter() - start)
+
+
+def bench_pool(transactions, workers, pool):
+    executor = create_executor([PRIVATE_KEY], workers, pool)
+    args = (Account.from_key(PRIVATE_KEY),) if pool == 'thread' else ()
+
+    with executor:
+        # Warm every worker before timing
+        list(executor.map(_sign, transactions[:workers], *([a] * workers for a in args)))
+
+        start = time.perf_counter()
+        chunksize = max(1, len(transactions) // (workers * 8))
+        list(executor.map(_sign, transactions, *([a] * len(transactions) for a in args), chunksize=chunksize))
+        return len(transactions) / (time.perf_counter() - start)
+
+
+async def bench_chain(n, workers, pool):
+    """Submit `n` transactions through TransactionSigner and check nonce ordering on chain"""
+    from local_chain import connect
+
+    w3, keys = connect()
+    signer = TransactionSigner(w3, keys[0], workers=workers, pool=pool)
+    await signer.start()
+
+    transactions = [{
+        'from': signer.address, 'to': Account.from_key(keys[1]).address, 'value': 0, 'gas': 30000,
+        'gasPrice': w3.eth.gas_price, 'chainId': w3.eth.chain_id, 'data': CALLDATA
+    } for _ in range(n)]
+
+    start = time.perf_counter()
+    tx_hashes = await asyncio.gather(*(signer.submit(transaction) for transaction in transactions))
+    elapsed = time.perf_counter() - start
+    await signer.close()
+
+    nonces = [w3.eth.get_transaction(tx_hash)['nonce'] for tx_hash in tx_hashes]
+    in_order = nonces == sorted(nonces) and len(set(nonces)) == n
+    return {'submitted_per_sec': round(n / elapsed, 1), 'nonces_in_order': in_order, **signer.get_stats()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--transactions', type=int, default=2000)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, os.cpu_count() or 1}))
+    parser.add_argument('--pool', choices=['process', 'thread'], default='process')
+    parser.add_argument('--chain', action='store_true', help='Also submit through TransactionSigner to eth-tester')
+    parser.add_argument('--output', help='Optional JSON results file')
+    args = parser.parse_args()
+
+    transactions = make_transactions(args.transactions)
+    inline = bench_inline(transactions)
+    results = {'inline_per_sec': round(inline, 1), 'pool': args.pool, 'workers': {}}
+
+    logger.info("=" * 60)
+    logger.info(f"Inline:        {inline:>10.1f} tx/s")
+    for workers in args.workers:
+        throughput = bench_pool(transactions, workers, args.pool)
+        results['workers'][workers] = {
+            'per_sec': round(throughput, 1),
+            'per_core_per_sec': round(throughput / min(workers, os.cpu_count() or 1), 1),
+            'speedup_vs_inline': round(throughput / inline, 2)
+        }
+        logger.info(f"{workers:>2} worker(s):  {throughput:>10.1f} tx/s "
+                    f"({results['workers'][workers]['speedup_vs_inline']}x inline)")
+
+    if args.chain:
+        results['chain'] = asyncio.run(bench_chain(min(args.transactions, 200), max(args.workers), args.pool))
+        logger.info(f"Chain submit:  {results['chain']['submitted_per_sec']:>10.1f} tx/s, "
+                    f"nonces in order: {results['chain']['nonces_in_order']}")
+    logger.info("=" * 60)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
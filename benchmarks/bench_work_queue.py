@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark WorkQueue throughput: enqueue one request per commit versus one
+commit per scanned block range, then lease + ack through the queue one job
+at a time (as bridge workers do) and in batches, at each SQLite synchronous
+level.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent
+sys.path.append(str(project_root))
+
+from src.ai.work_queue import WorkQueue
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# A JSON feature vector about the size bridges receive
+INPUT_DATA = json.dumps([1.2345678] * 8).encode()
+
+
+def make_items(n, offset=0):
+    return [((offset + i).to_bytes(32, 'big'), INPUT_DATA, (offset + i) // 10) for i in range(n)]
+
+
+def bench_enqueue(queue, items, batch_size):
+    start = time.perf_counter()
+    if batch_size == 1:
+        for item in items:
+            queue.enqueue(*item)
+    else:
+        for i in range(0, len(items), batch_size):
+            queue.enqueue_many(items[i:i + batch_size], cursor=items[i][2])
+    return len(items) / (time.perf_counter() - start)
+
+
+def bench_drain(queue, n, batch_size):
+    start = time.perf_counter()
+    done = 0
+    while done < n:
+        jobs = queue.dequeue(batch_size)
+        if not jobs:
+            break
+        for job in jobs:
+            queue.ack(job['request_id'])
+        done += len(jobs)
+    return done / (time.perf_counter() - start)
+
+
+def run_benchmark(args):
+    results = {}
+    for synchronous in args.synchronous:
+        with tempfile.TemporaryDirectory() as tmp:
+            queue = WorkQueue(os.path.join(tmp, 'queue.db'), synchronous=synchronous)
+            row = {}
+            offset = 0
+            for batch_size in args.enqueue_batch:
+                items = make_items(args.requests, offset)
+                offset += args.requests
+                row[f'enqueue_batch_{batch_size}'] = round(bench_enqueue(queue, items, batch_size), 1)
+                logger.info(f"synchronous={synchronous} enqueue batch={batch_size}: "
+                            f"{row[f'enqueue_batch_{batch_size}']:.0f} req/s")
+
+            for batch_size in args.dequeue_batch:
+                row[f'dequeue_ack_batch_{batch_size}'] = round(bench_drain(queue, args.requests, batch_size), 1)
+                logger.info(f"synchronous={synchronous} dequeue+ack batch={batch_size}: "
+                            f"{row[f'dequeue_ack_batch_{batch_size}']:.0f} req/s")
+            queue.close()
+            results[synchronous] = row
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the durable work queue')
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--enqueue-batch', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--dequeue-batch', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--synchronous', nargs='+', default=['NORMAL', 'FULL'])
+    parser.add_argument('--output', default='bench_results/work_queue.json')
+    args = parser.parse_args()
+
+    results = run_benchmark(args)
+
+    logger.info("=" * 60)
+    for synchronous, row in results.items():
+        logger.info(f"{synchronous:8s} " + "  ".join(f"{name}={rate:.0f}/s" for name, rate in row.items()))
+    logger.info("=" * 60)
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump({'requests': args.requests, 'results': results}, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Local chain helpers for benchmarks: an in-process eth-tester EVM (or any
+JSON-RPC dev node) with AIOracle/AIContract deployed from the compiled
+artifacts in contracts/contracts/.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from web3 import Web3
+
+logger = logging.getLogger(__name__)
+
+SOURCES_DIR = Path(__file__).parent.parent / 'contracts'
+ARTIFACTS_DIR = SOURCES_DIR / 'contracts'
+ZERO_ADDRESS = '0x' + '00' * 20
+
+
+def load_artifact(name: str, artifacts_dir: Path = ARTIFACTS_DIR) -> dict:
+    """Load abi/bytecode from a Truffle artifact"""
+    with open(Path(artifacts_dir) / f"{name}.json", 'r') as f:
+        artifact = json.load(f)
+    return {'abi': artifact['abi'], 'bytecode': artifact['bytecode']}
+
+
+def artifact_is_current(name: str, artifacts_dir: Path = ARTIFACTS_DIR, sources_dir: Path = SOURCES_DIR) -> bool:
+    """Whether a Truffle artifact was compiled from the Solidity source now in the tree"""
+    source_path = Path(sources_dir) / f"{name}.sol"
+    with open(Path(artifacts_dir) / f"{name}.json", 'r') as f:
+        built = json.load(f).get('source')
+    if built is None or not source_path.exists():
+        return True
+    # Truffle keeps the source as it was on disk, line endings included
+    return built.replace('\r\n', '\n') == source_path.read_text().replace('\r\n', '\n')
+
+
+def connect(rpc_url: Optional[str] = None, private_keys: Optional[List[str]] = None) -> Tuple[Web3, List[str]]:
+    """Connect to `rpc_url`, or start an in-process eth-tester chain.
+
+    Returns the Web3 instance and hex private keys of funded accounts. For
+    an external node the keys must be supplied (e.g. anvil's dev keys).
+    """
+    if rpc_url:
+        w3 = Web3(Web3.HTTPProvider(rpc_url))
+        if not w3.is_connected():
+            raise ConnectionError(f"Failed to connect to {rpc_url}")
+        if not private_keys:
+            raise ValueError("Private keys are required when benchmarking against an external node")
+        return w3, list(private_keys)
+
+    try:
+        from web3 import EthereumTesterProvider
+        provider = EthereumTesterProvider()
+    except ImportError:
+        raise ImportError("The in-process chain requires eth-tester: pip install 'eth-tester[py-evm]'")
+
+    w3 = Web3(provider)
+    keys = [key.to_hex() for key in provider.ethereum_tester.backend.account_keys]
+    logger.info(f"Started in-process EVM (chain id {w3.eth.chain_id}) with {len(keys)} funded accounts")
+    return w3, keys
+
+
+def send_transaction(w3: Web3, function, private_key: str, value: int = 0, nonce: Optional[int] = None):
+    """Sign and send a contract call from `private_key`; returns the receipt"""
+    account = w3.eth.account.from_key(private_key)
+    transaction = function.build_transaction({
+        'from': account.address,
+        'value': value,
+        'gasPrice': w3.eth.gas_price,
+        'nonce': nonce if nonce is not None else w3.eth.get_transaction_count(account.address),
+        'chainId': w3.eth.chain_id
+    })
+    signed = account.sign_transaction(transaction)
+    tx_hash = w3.eth.send_raw_transaction(signed.raw_transaction)
+    return w3.eth.wait_for_transaction_receipt(tx_hash)
+
+
+def deploy(w3: Web3, name: str, private_key: str, *args, artifacts_dir: Path = ARTIFACTS_DIR):
+    """Deploy a contract from its artifact and return the contract instance"""
+    artifact = load_artifact(name, artifacts_dir)
+    factory = w3.eth.contract(abi=artifact['abi'], bytecode=artifact['bytecode'])
+    receipt = send_transaction(w3, factory.constructor(*args), private_key)
+    if receipt.status != 1:
+        raise RuntimeError(f"Deployment of {name} failed")
+    return w3.eth.contract(address=receipt.contractAddress, abi=artifact['abi'])
+
+
+def deploy_contracts(w3: Web3, owner_key: str, model_name: str = "AI Prediction Model v1.0",
+                     artifacts_dir: Path = ARTIFACTS_DIR):
+    """Deploy AIOracle and AIContract and wire them together, as scripts/deploy.js does"""
+    for name in ('AIOracle', 'AIContract'):
+        if not artifact_is_current(name, artifacts_dir):
+            logger.warning(f"{name} artifact in {artifacts_dir} was built from an older {name}.sol; "
+                           f"rebuild it with `truffle compile`")
+    oracle = deploy(w3, 'AIOracle', owner_key, ZERO_ADDRESS, artifacts_dir=artifacts_dir)
+    ai_contract = deploy(w3, 'AIContract', owner_key, model_name, oracle.address, artifacts_dir=artifacts_dir)
+    send_transaction(w3, oracle.functions.setAIContract(ai_contract.address), owner_key)
+    logger.info(f"Deployed AIOracle at {oracle.address}, AIContract at {ai_contract.address}")
+    return oracle, ai_contract
+
+
+def authorize_fulfillers(w3: Web3, oracle, owner_key: str, private_keys: List[str]) -> List[str]:
+    """Authorize extra fulfiller accounts on the oracle; returns their addresses.
+
+    The AIOracle in contracts/ only lets its owner fulfill, so this fails
+    unless the deployed oracle also accepts authorized callers.
+    """
+    addresses = [w3.eth.account.from_key(key).address for key in private_keys]
+    for address in addresses:
+        send_transaction(w3, oracle.functions.authorizeCaller(address), owner_key)
+        try:
+            oracle.functions.fulfillPrediction(b'\x00' * 32, 0, 0).call({'from': address})
+        except Exception as e:
+            # Past the access check, an unknown request id is the only reason to revert
+            if 'Request does not exist' not in str(e):
+                raise RuntimeError(f"{address} can't fulfill on the deployed AIOracle "
+                                   f"(owner-only fulfillment?): {e}") from e
+    return addresses
+
+
+def bridge_config(w3: Web3, oracle, model_path: str, model_type: str = 'sklearn',
+                  poll_interval: float = 0.05) -> dict:
+    """Bridge configuration pointing at the locally deployed oracle"""
+    return {
+        'blockchain': {
+            'rpc_url': None,
+            'chain_id': w3.eth.chain_id,
+            'oracle_address': oracle.address,
+            'oracle_abi': oracle.abi
+        },
+        'model': {
+            'path': model_path,
+            'type': model_type
+        },
+        'bridge': {
+            'poll_interval': poll_interval,
+            'gas_limit': 500000,
+            'gas_price': w3.eth.gas_price
+        }
+    }
+
+
+def train_demo_model(path: str) -> str:
+    """Train the demo RandomForest so benchmarks don't depend on pickled artifacts"""
+    import joblib
+    from sklearn.ensemble import RandomForestClassifier
+
+    from demo import create_sample_data
+
+    X, y = create_sample_data()
+    joblib.dump(RandomForestClassifier(n_estimators=100, random_state=42).fit(X, y), path)
+    return path
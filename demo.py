@@ -32,6 +32,25 @@ def create_sample_data():
     
     return X, y
 
+def create_sample_shards(output_dir, n_shards=10, samples_per_shard=100000):
+    """Write sample training data as on-disk shards for streaming training"""
+    from src.ai.data_pipeline import write_shards
+    
+    logger.info(f"Generating {n_shards} sample shard(s) in {output_dir}...")
+    
+    def chunks():
+        rng = np.random.default_rng(42)
+        for _ in range(n_shards):
+            # Same features and labelling rule as create_sample_data
+            X = rng.random((samples_per_shard, 3))
+            X[:, 0] = X[:, 0] * 100
+            X[:, 1] = X[:, 1] * 1000
+            X[:, 2] = X[:, 2] * 10
+            y = ((X[:, 1] > 500) & (X[:, 2] < 5)).astype(int)
+            yield X, y
+    
+    return write_shards(chunks(), output_dir)
+
 def train_demo_model():
     """Train a simple demo model"""
     try:
@@ -106,6 +125,10 @@ def demo_inference():
         joblib.dump(rf_model, model_path)
         logger.info(f"Sklearn model saved to {model_path}")
         
+        # Calibrate confidence on the held-out split; InferenceModel picks the sidecar up
+        from src.ai.confidence import ConfidenceEstimator
+        ConfidenceEstimator('classification').fit(rf_model, X_test, y_test).save(f"{model_path}_confidence.json")
+        
         # Test inference module
         from src.ai.inference import InferenceModel
         
@@ -21,6 +21,9 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.append(str(project_root))
 
 from src.ai.inference import InferenceModel
+from src.ai.log_decoder import LogDecoder, load_event_schemas
+from src.ai.lookup_table import LookupTable
+from src.ai.replay import ShadowEvaluator
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -52,10 +55,20 @@ class SimpleOraculeBridge:
         # Setup AI model
         self.ai_model = InferenceModel(
             model_path=self.config['model']['path'],
-            model_type=self.config['model']['type']
+            model_type=self.config['model']['type'],
+            quantized=self.config['model'].get('quantized', False),
+            tf_serving=self.config['model'].get('tf_serving'),
+            shared_cache=self.config['model'].get('shared_cache')
         )
         logger.info("AI model loaded successfully")
         
+        # Optional precomputed answers for quantized inputs
+        lookup_config = self.config.get('lookup_table', {})
+        self.lookup_table = LookupTable.from_config(lookup_config, self.ai_model) if lookup_config.get('enabled') else None
+        
+        # Optional candidate models scored beside production, never submitted
+        self.shadow = ShadowEvaluator.from_config(self.config.get('shadow', {}))
+        
         self.is_running = False
         self.last_processed_block = self.w3.eth.block_number
         
@@ -69,18 +82,17 @@ class SimpleOraculeBridge:
             abi=oracle_abi
         )
         
-        # AI contract (for events)
-        with open('build/contracts/AIContract.json', 'r') as f:
-            ai_contract_data = json.load(f)
-        
-        ai_address = self.config['blockchain']['ai_contract_address']
-        self.ai_contract = self.w3.eth.contract(
-            address=ai_address,
-            abi=ai_contract_data['abi']
+        # AI contract events, decoded from raw logs; the schema cache spares re-parsing the artifact
+        decoder_config = self.config.get('log_decoder', {})
+        schemas = load_event_schemas(
+            decoder_config.get('ai_contract_artifact', 'build/contracts/AIContract.json'),
+            cache_path=decoder_config.get('schema_cache')
         )
+        self.request_logs = LogDecoder([schemas['PredictionRequested']])
+        self.ai_address = self.config['blockchain']['ai_contract_address']
         
         logger.info(f"Oracle contract: {oracle_address}")
-        logger.info(f"AI contract: {ai_address}")
+        logger.info(f"AI contract: {self.ai_address}")
     
     async def start_bridge(self):
         """Start the oracle bridge service"""
@@ -110,10 +122,7 @@ class SimpleOraculeBridge:
     async def process_new_events(self, from_block: int, to_block: int):
         """Process new prediction request events"""
         try:            # Get PredictionRequested events from AI contract
-            events = self.ai_contract.events.PredictionRequested.get_logs(
-                from_block=from_block,
-                to_block=to_block
-            )
+            events = self.request_logs.get_logs(self.w3, self.ai_address, from_block, to_block)
             
             if events:
                 logger.info(f"🎯 Found {len(events)} prediction request(s)")
@@ -147,15 +156,19 @@ class SimpleOraculeBridge:
             
             logger.info(f"🧮 Parsed input: {input_values}")
             
-            # Make prediction
-            prediction, confidence = self.ai_model.predict_with_confidence(input_values)
-            
-            # Convert to integers for blockchain
-            prediction_int = int(prediction[0] * 1000)  # Scale by 1000
-            confidence_int = int(confidence)
+            hit = self.lookup_table.lookup(input_values) if self.lookup_table is not None else None
+            if hit is not None:
+                prediction_int, confidence_int = hit
+                logger.info(f"📇 Lookup table hit (scaled: {prediction_int}, confidence: {confidence_int}%)")
+            else:
+                # Make prediction, as integers for blockchain (scaled by 1000)
+                prediction_int, confidence_int = self.ai_model.predict_scaled(input_values)
+                
+                logger.info(f"🤖 AI Prediction: {prediction_int / 1000:.3f} (scaled: {prediction_int})")
+                logger.info(f"📊 Confidence: {confidence_int}%")
             
-            logger.info(f"🤖 AI Prediction: {prediction[0]:.3f} (scaled: {prediction_int})")
-            logger.info(f"📊 Confidence: {confidence}%")
+            if self.shadow is not None:
+                self.shadow.submit(input_values, (prediction_int, confidence_int), request_id)
             
             # Submit prediction to oracle
             await self.submit_prediction(request_id, prediction_int, confidence_int)
@@ -219,6 +232,8 @@ class SimpleOraculeBridge:
         """Stop the bridge service"""
         logger.info("🛑 Stopping Oracle Bridge...")
         self.is_running = False
+        if self.shadow is not None:
+            self.shadow.close()
 
 async def main():
     """Main function"""